@@ -2,38 +2,85 @@
 from fastapi import FastAPI, Request, Depends
 from fastapi.middleware.cors import CORSMiddleware
 
+from sqlalchemy.orm import Session
+from models.database import SessionLocal, get_db, engine, Base, READ_PRIMARY_HEADER
+from models.contests import Contest
 from models.bookmarks import Bookmark
-from routers import contests, bookmarks, users
-
-
+from models.users import User
+from routers import contests, bookmarks, users, calendar, jobs, stats, export, recommendations, digests
+from scrapers.codeforces import CodeForcesScraper
+from scrapers.leetcode import LeetCodeScraper
+from utils.ingestion import add_listener, contest_summary
+from utils.contest_events import broadcaster, transitions
+from utils.change_log import compact_change_log
+from utils import calendar_feed
+from utils.search_index import search_index
+from utils.recommendations import recommender
+from utils.retention import archive_past_contests
+from utils.contest_snapshot import contest_snapshots
+from utils.circuit_breaker import breakers
+from utils.enrichment import run_enrichment
+from utils.jobs import enqueue_scrape, enqueue_full_history, enqueue_digests, job_response, job_queue
+from utils.digests import DIGEST_HOUR_UTC
+from utils.contest_history import FULL_HISTORY_ENABLED
+from utils.rate_limit import rate_limit
+from utils.stats import check_stats
+from utils.static_snapshots import static_snapshots, StaticSnapshotApp
+from apscheduler.schedulers.background import BackgroundScheduler
 from sqlalchemy import and_
 from contextlib import contextmanager
 from datetime import datetime
+import asyncio
+import logging
 
 
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
 
 
+Base.metadata.create_all(bind=engine)
 
-
-
-
+app = FastAPI(
+    title="Coding Contests API",
+    description="API for tracking coding contests from Codeforces, CodeChef and LeetCode",
     version="1.0.0"
 )
 
-
+app.add_middleware(
     CORSMiddleware,
+    allow_origins=["*"],
+    allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Lets browser clients read the read-after-write deadline and send it back
+    expose_headers=[READ_PRIMARY_HEADER],
 )
 
 
 app.include_router(contests.router)
 app.include_router(bookmarks.router)
-
+app.include_router(users.router)
+app.include_router(calendar.router)
+app.include_router(jobs.router)
+app.include_router(stats.router)
+app.include_router(export.router)
+app.include_router(recommendations.router)
+app.include_router(digests.router)
+# Pre-rendered GET /contests bodies, served without the database
+app.mount("/static/contests", StaticSnapshotApp())
+
+
+add_listener(broadcaster.on_contests_changed)
+add_listener(transitions.on_contests_changed)
+add_listener(calendar_feed.on_contests_changed)
+add_listener(search_index.on_contests_changed)
+add_listener(recommender.on_contests_changed)
+add_listener(contest_snapshots.on_contests_changed)
+add_listener(static_snapshots.on_contests_changed)
 
 
 @contextmanager
-
+def get_db_context():
     db = SessionLocal()
     try:
         yield db
@@ -43,65 +90,129 @@ app.include_router(bookmarks.router)
 
 def scrape_all_contests():
     logger.info("Running scheduled scraping job")
-    
+    # Runs on the job queue, so a manual scrape in flight is joined rather than repeated
+    for platform in ("codeforces", "leetcode"):
+        enqueue_scrape(platform, refresh_status=True)
+
+
+scheduler = BackgroundScheduler(daemon=True)
+scheduler.add_job(
+    scrape_all_contests,
+    trigger="interval",
+    weeks=1,
+    id="scrape_contests_weekly",
+    name="Scrape contests from all platforms weekly",
+    misfire_grace_time=3600  
+)
+
+if FULL_HISTORY_ENABLED:
+    scheduler.add_job(
+        enqueue_full_history,
+        trigger="interval",
+        days=1,
+        # Also right away, which resumes a run interrupted by a restart
+        next_run_time=datetime.now(),
+        id="ingest_codeforces_history",
+        name="Ingest the full Codeforces contest and gym history",
+        misfire_grace_time=3600
+    )
+
+def compact_changes():
     try:
+        with get_db_context() as db:
+            compact_change_log(db)
+    except Exception as e:
+        logger.error(f"Error compacting contest change log: {e}")
 
+
+scheduler.add_job(
+    compact_changes,
+    trigger="interval",
+    hours=6,
+    id="compact_contest_changes",
+    name="Compact and truncate the contest change log",
+    misfire_grace_time=3600
+)
+
+def archive_contests():
+    try:
         with get_db_context() as db:
+            archive_past_contests(db)
+    except Exception as e:
+        logger.error(f"Error archiving past contests: {e}")
 
-            codeforces_scraper = CodeForcesScraper()
-
-            
-
-            leetcode_scraper = LeetCodeScraper()
-            leetcode_contests = leetcode_scraper.get_contests()
-            
-
-            all_contests = codeforces_contests + leetcode_contests
-            
-
-            now = datetime.utcnow()
-            
-
-            db_contests = db.query(Contest).all()
-            for contest in db_contests:
-                if contest.start_time > now:
-                    contest.status = "upcoming"
-                elif contest.end_time > now:
-                    contest.status = "ongoing"
-                else:
-                    contest.status = "past"
-            
-
-            for contest_data in all_contests:
-
-                existing_contest = db.query(Contest).filter(
-                    and_(
-                        Contest.platform == contest_data["platform"],
-                        Contest.contest_id == contest_data["contest_id"]
-                    )
-                ).first()
-                
-                if existing_contest:
-
-                    for key, value in contest_data.items():
-                        setattr(existing_contest, key, value)
-                else:
-
-*contest_data)
-                    db.add(new_contest)
-            
-            db.commit()
-            logger.info(f"Successfully scraped and stored {len(all_contests)} contests")
+
+scheduler.add_job(
+    archive_contests,
+    trigger="interval",
+    days=1,
+    id="archive_past_contests",
+    name="Move old past contests to the archive table",
+    misfire_grace_time=3600
+)
+
+def enrich_contests():
+    try:
+        with get_db_context() as db:
+            run_enrichment(db)
     except Exception as e:
-        logger.error(f"Error in scheduled scraping job: {e}")
+        logger.error(f"Error enriching Codeforces contests: {e}")
 
 
-scheduler = BackgroundScheduler(daemon=True)
 scheduler.add_job(
+    enrich_contests,
+    trigger="interval",
+    minutes=10,
+    id="enrich_codeforces_contests",
+    name="Fetch problem and participant data for Codeforces contests",
+    misfire_grace_time=600
+)
 
-    id="scrape_contests_weekly",
-    name="Scrape contests from all platforms weekly",
-    misfire_grace_time=3600  
+def check_contest_stats():
+    try:
+        with get_db_context() as db:
+            check_stats(db, repair=True)
+    except Exception as e:
+        logger.error(f"Error checking contest statistics: {e}")
+
+
+scheduler.add_job(
+    check_contest_stats,
+    trigger="interval",
+    days=1,
+    # Also right away, which backfills the tables on first deploy
+    next_run_time=datetime.now(),
+    id="check_contest_stats",
+    name="Rebuild contest statistics and repair drift",
+    misfire_grace_time=3600
+)
+
+scheduler.add_job(
+    enqueue_digests,
+    trigger="cron",
+    hour=DIGEST_HOUR_UTC,
+    timezone="UTC",
+    id="send_daily_digests",
+    name="Deliver daily contest digests",
+    misfire_grace_time=3600
+)
+
+def render_static_snapshots():
+    try:
+        static_snapshots.refresh()
+    except Exception as e:
+        logger.error(f"Error rendering static contest snapshots: {e}")
+
+
+scheduler.add_job(
+    render_static_snapshots,
+    trigger="interval",
+    minutes=15,
+    # Also right away, so the files exist before the first ingestion
+    next_run_time=datetime.now(),
+    id="render_static_snapshots",
+    name="Re-render static contest snapshots",
+    misfire_grace_time=900
 )
 
 @app.on_event("startup")
@@ -118,98 +229,66 @@ def start_scheduler():
         else:
             logger.info(f"Database already contains {contest_count} contests, skipping initial scrape")
 
+@app.on_event("startup")
+async def start_contest_events():
+    broadcaster.bind(asyncio.get_running_loop())
+    with get_db_context() as db:
+        pending = db.query(Contest).filter(Contest.end_time > datetime.utcnow()).all()
+        transitions.start([contest_summary(contest) for contest in pending])
+    logger.info(f"Tracking status transitions for {len(pending)} contests")
+
 @app.on_event("shutdown")
 def shutdown_scheduler():
     scheduler.shutdown()
+    transitions.stop()
+    job_queue.shutdown()
     logger.info("Shut down background scheduler")
 
-@app.get("/scrape-codeforces")
-async def scrape_codeforces(db: Session = Depends(get_db)):
+@app.get("/scrape-codeforces", status_code=202, dependencies=[Depends(rate_limit("scrape"))])
+async def scrape_codeforces():
     """
-    Directly scrape Codeforces contests and store them in the database
+    Queue a scrape of Codeforces contests
+    
+    Poll the returned status_url for the result.
     """
-    try:
-        logger.info("Scraping Codeforces contests...")
-        scraper = CodeForcesScraper()
-        contests = scraper.get_contests()
-        
-
-        for contest_data in contests:
-
-            existing_contest = db.query(Contest).filter(
-                and_(
-                    Contest.platform == contest_data["platform"],
-                    Contest.contest_id == contest_data["contest_id"]
-                )
-            ).first()
-            
-            if existing_contest:
-
-                for key, value in contest_data.items():
-                    setattr(existing_contest, key, value)
-            else:
-
-                new_contest = Contest(**contest_data)
-                db.add(new_contest)
-        
-        db.commit()
-        
-        return {
-            "message": f"Successfully scraped and stored {len(contests)} Codeforces contests",
-            "contests": contests
-        }
-    except Exception as e:
-        db.rollback()
-        logger.error(f"Failed to scrape Codeforces contests: {e}")
-        return {"error": str(e)}
+    job, joined = enqueue_scrape("codeforces")
+    return job_response(job, joined)
 
-@app.get("/scrape-leetcode")
-async def scrape_leetcode(db: Session = Depends(get_db)):
+@app.get("/scrape-leetcode", status_code=202, dependencies=[Depends(rate_limit("scrape"))])
+async def scrape_leetcode():
     """
-    Directly scrape LeetCode contests and store them in the database
+    Queue a scrape of LeetCode contests
+    
+    Poll the returned status_url for the result.
     """
-    try:
-        logger.info("Scraping LeetCode contests...")
-        scraper = LeetCodeScraper()
-        contests = scraper.get_contests()
-        
-
-        for contest_data in contests:
-
-            existing_contest = db.query(Contest).filter(
-                and_(
-                    Contest.platform == contest_data["platform"],
-                    Contest.contest_id == contest_data["contest_id"]
-                )
-            ).first()
-            
-            if existing_contest:
-
-                for key, value in contest_data.items():
-                    setattr(existing_contest, key, value)
-            else:
-
-                new_contest = Contest(**contest_data)
-                db.add(new_contest)
-        
-        db.commit()
-        
-        return {
-            "message": f"Successfully scraped and stored {len(contests)} LeetCode contests",
-            "contests": contests
-        }
-    except Exception as e:
-        db.rollback()
-        logger.error(f"Failed to scrape LeetCode contests: {e}")
-        return {"error": str(e)}
+    job, joined = enqueue_scrape("leetcode")
+    return job_response(job, joined)
+
+@app.get("/scrape-status")
+async def scrape_status():
+    """
+    Circuit breaker state of each platform scraper
+    """
+    return {platform: breaker.snapshot() for platform, breaker in breakers.items()}
 
 @app.get("/")
 async def root():
     return {
         "message": "Coding Contests API",
+        "endpoints": {
+            "/contests": "List contests with optional platform and status filters",
+            "/contests/stream": "Server-Sent Events stream of contest changes",
+            "/contests/changes": "Cursor-based change feed for delta sync",
+            "/contests/search": "Search contests by name",
+            "/contests/archive": "Browse archived past contests",
+            "/calendar/{token}.ics": "iCalendar feed of a user's bookmarked contests",
             "/bookmarks": "Manage bookmarked contests",
-            "/scrape-codeforces": "Directly scrape Codeforces contests",
-            "/scrape-leetcode": "Directly scrape LeetCode contests"
+            "/scrape-codeforces": "Queue a scrape of Codeforces contests",
+            "/scrape-leetcode": "Queue a scrape of LeetCode contests",
+            "/jobs/{job_id}": "Status and result of a queued scrape",
+            "/stats": "Contest and bookmark statistics",
+            "/export/{table}": "Stream contests, archived contests or bookmarks as Parquet, Arrow or NDJSON",
+            "/scrape-status": "Circuit breaker state of each platform scraper"
         }
     }
 
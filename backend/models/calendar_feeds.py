@@ -0,0 +1,18 @@
+# models/calendar_feeds.py
+from sqlalchemy import Column, Integer, String, DateTime, Text
+from .database import Base
+from datetime import datetime
+import uuid
+
+class CalendarFeed(Base):
+    __tablename__ = "calendar_feeds"
+    
+    token = Column(String, primary_key=True, default=lambda: uuid.uuid4().hex)
+    user_id = Column(String, unique=True, nullable=False)  # Clerk user ID
+    body = Column(Text, nullable=True)  # Pre-rendered ICS, null when it needs regenerating
+    # Bumped on every invalidation, so a render only stores its body if
+    # nothing changed since it read the bookmarks
+    generation = Column(Integer, nullable=False, default=0)
+    etag = Column(String, nullable=True)
+    rendered_at = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
@@ -0,0 +1,19 @@
+# models/contest_changes.py
+from sqlalchemy import Column, Integer, String, DateTime, Text, Index
+from .database import Base
+from datetime import datetime
+
+class ContestChange(Base):
+    __tablename__ = "contest_changes"
+    
+    # Monotonic id doubling as the change feed cursor
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    contest_id = Column(String, nullable=True)  # Contest.id, null for truncation markers
+    change_type = Column(String, nullable=False)  # created, updated, status, solution, archived, truncated
+    payload = Column(Text, nullable=True)  # JSON snapshot of the contest after the change
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    
+    __table_args__ = (
+        Index("ix_contest_changes_contest_id", "contest_id", "id"),
+        Index("ix_contest_changes_created_at", "created_at"),
+    )
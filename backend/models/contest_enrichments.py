@@ -0,0 +1,19 @@
+# models/contest_enrichments.py
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text
+from sqlalchemy.orm import relationship
+from .database import Base
+from datetime import datetime
+
+class ContestEnrichment(Base):
+    __tablename__ = "contest_enrichments"
+    
+    contest_id = Column(String, ForeignKey("contests.id", ondelete="CASCADE"), primary_key=True)
+    status = Column(String, nullable=False)  # Contest status the data was fetched for
+    problem_count = Column(Integer, nullable=True)
+    problem_tags = Column(Text, nullable=True)  # JSON list of distinct tags
+    participant_count = Column(Integer, nullable=True)
+    last_error = Column(String, nullable=True)
+    attempts = Column(Integer, default=0, nullable=False)
+    enriched_at = Column(DateTime, default=datetime.utcnow)
+    
+    contest = relationship("Contest")
@@ -0,0 +1,22 @@
+# models/contest_stats.py
+from sqlalchemy import Column, Integer, String, DateTime, Index
+from .database import Base
+
+class PlatformWeekStat(Base):
+    __tablename__ = "platform_week_stats"
+
+    platform = Column(String, primary_key=True)
+    week_start = Column(DateTime, primary_key=True)  # Monday 00:00 of the week the contests start in
+    contest_count = Column(Integer, nullable=False, default=0)
+    total_duration = Column(Integer, nullable=False, default=0)  # in minutes, summed over the contests
+
+
+class ContestBookmarkCount(Base):
+    __tablename__ = "contest_bookmark_counts"
+
+    contest_id = Column(String, primary_key=True)  # Contest.id
+    bookmark_count = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        Index("ix_contest_bookmark_counts_count", "bookmark_count"),
+    )
@@ -1,5 +1,5 @@
 # models/contests.py
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Text, Index
 from sqlalchemy.orm import relationship
 from .database import Base
 from datetime import datetime
@@ -24,4 +24,32 @@ class Contest(Base):
     
     # Relationship with bookmarks
     bookmarks = relationship("Bookmark", back_populates="contest", cascade="all, delete-orphan")
+    
+    __table_args__ = (
+        # Ingestion looks contests up by their platform id
+        Index("ix_contests_platform_contest_id", "platform", "contest_id"),
+    )
+
 
+class ArchivedContest(Base):
+    __tablename__ = "contests_archive"
+    
+    # Same columns as Contest so rows can be moved with INSERT ... SELECT
+    id = Column(String, primary_key=True)
+    platform = Column(String, nullable=False)
+    contest_id = Column(String, nullable=False)
+    name = Column(String, nullable=False)
+    url = Column(String, nullable=False)
+    start_time = Column(DateTime, nullable=False, index=True)
+    end_time = Column(DateTime, nullable=False)
+    duration = Column(Integer, nullable=False)
+    status = Column(String, nullable=False)
+    description = Column(Text, nullable=True)
+    solution_url = Column(String, nullable=True)
+    created_at = Column(DateTime)
+    updated_at = Column(DateTime)
+    archived_at = Column(DateTime, default=datetime.utcnow, index=True)
+    
+    __table_args__ = (
+        Index("ix_contests_archive_platform_contest_id", "platform", "contest_id", unique=True),
+    )
@@ -1,24 +1,152 @@
 # models/database.py
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from fastapi import Request, Response
 import os
+import threading
+import time
 from dotenv import load_dotenv
 
 load_dotenv()
 
-# Get database URL from environment variables
-DATABASE_URL = os.getenv("DATABASE_URL")
+# Get database URL from environment variables; without one an embedded SQLite file is used
+DATABASE_URL = os.getenv("DATABASE_URL") or f"sqlite:///{os.getenv('SQLITE_PATH', 'contests.db')}"
+# Optional read replica; reads go to the primary when unset
+READ_DATABASE_URL = os.getenv("READ_DATABASE_URL")
+# How long a user's reads stay on the primary after they wrote
+READ_AFTER_WRITE_SECONDS = float(os.getenv("READ_AFTER_WRITE_SECONDS", "5"))
+
+IS_SQLITE = DATABASE_URL.startswith("sqlite")
+
+# SQLite tuning, applied to every connection
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    # With WAL, NORMAL only risks the last transactions on power loss, never corruption
+    "synchronous": os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"),
+    # Negative values are KiB
+    "cache_size": -int(os.getenv("SQLITE_CACHE_SIZE_KB", "65536")),
+    "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024))),
+    "busy_timeout": 30000,
+    "temp_store": "MEMORY",
+    "foreign_keys": "ON",
+}
+
+
+def _create_sqlite_engine(url: str, writer: bool):
+    """
+    Create a SQLite engine with WAL and the tuning pragmas
+
+    The writer engine has a single pooled connection, so writers queue for it
+    in the pool rather than racing for the database lock, and each of its
+    transactions starts with BEGIN IMMEDIATE so it holds the write lock up
+    front instead of failing with "database is locked" when upgrading from a
+    read. Readers get their own pool and never wait on the writer under WAL.
+
+    A writer session therefore blocks every other writer from its first
+    query until it commits or closes: read-only routes must use get_read_db,
+    and code must not keep a writer transaction open across network calls.
+    """
+    options = {"connect_args": {"check_same_thread": False, "timeout": 30}}
+    if writer:
+        options.update(pool_size=1, max_overflow=0, pool_timeout=60)
+    sqlite_engine = create_engine(url, **options)
+
+    @event.listens_for(sqlite_engine, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        # Let SQLAlchemy emit BEGIN itself, see on_begin
+        dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        for pragma, value in SQLITE_PRAGMAS.items():
+            cursor.execute(f"PRAGMA {pragma}={value}")
+        cursor.close()
+
+    @event.listens_for(sqlite_engine, "begin")
+    def on_begin(connection):
+        connection.exec_driver_sql("BEGIN IMMEDIATE" if writer else "BEGIN")
+
+    return sqlite_engine
+
 
 # Create SQLAlchemy engine and session
-engine = create_engine(DATABASE_URL)
+if IS_SQLITE:
+    engine = _create_sqlite_engine(DATABASE_URL, writer=True)
+else:
+    engine = create_engine(DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+if READ_DATABASE_URL:
+    read_engine = create_engine(READ_DATABASE_URL)
+elif IS_SQLITE:
+    # Same file, separate connections, so reads are not queued behind the writer
+    read_engine = _create_sqlite_engine(DATABASE_URL, writer=False)
+else:
+    read_engine = engine
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+
+# Response header carrying the read-after-write deadline, in POSIX seconds.
+# Clients send it back on their next requests so any worker routes them to
+# the primary; the in-process map below only covers the worker that wrote.
+READ_PRIMARY_HEADER = "X-Read-Primary-Until"
+
+# user id -> monotonic time until which the user's reads use the primary
+_sticky_users = {}
+_sticky_lock = threading.Lock()
+
 # Database dependency
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+def mark_primary_sticky(response: Response, user_id: str) -> None:
+    """
+    Route the user's reads to the primary for a short while after a write
+
+    Sets READ_PRIMARY_HEADER on the response for the client to echo, and
+    remembers the user in this process for clients that do not.
+    """
+    if not READ_DATABASE_URL:
+        return
+    response.headers[READ_PRIMARY_HEADER] = f"{time.time() + READ_AFTER_WRITE_SECONDS:.3f}"
+    now = time.monotonic()
+    with _sticky_lock:
+        _sticky_users[user_id] = now + READ_AFTER_WRITE_SECONDS
+        # Drop expired entries once the dict grows
+        if len(_sticky_users) > 1000:
+            for key in [key for key, until in _sticky_users.items() if until <= now]:
+                del _sticky_users[key]
+
+
+def _is_sticky(request: Request) -> bool:
+    deadline = request.headers.get(READ_PRIMARY_HEADER)
+    if deadline:
+        # Not signed, so a deadline further out than one window is ignored;
+        # otherwise a client could pin all its reads to the primary. The
+        # extra second covers rounding and clock skew between workers.
+        try:
+            remaining = float(deadline) - time.time()
+        except ValueError:
+            remaining = 0.0
+        if 0 < remaining <= READ_AFTER_WRITE_SECONDS + 1:
+            return True
+    user_id = request.headers.get("user-id")
+    if not user_id:
+        return False
+    with _sticky_lock:
+        until = _sticky_users.get(user_id)
+    return until is not None and until > time.monotonic()
+
+# Read-only database dependency, served by the replica when one is configured
+def get_read_db(request: Request):
+    if READ_DATABASE_URL and _is_sticky(request):
+        db = SessionLocal()
+    else:
+        db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
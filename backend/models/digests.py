@@ -0,0 +1,25 @@
+# models/digests.py
+from sqlalchemy import Column, String, DateTime, Date, Boolean, Text
+from .database import Base
+from datetime import datetime
+
+class DigestSubscription(Base):
+    __tablename__ = "digest_subscriptions"
+    
+    user_id = Column(String, primary_key=True)  # Clerk user ID
+    enabled = Column(Boolean, nullable=False, default=True)
+    platforms = Column(String, nullable=True)  # Comma separated; all platforms when empty
+    delivery = Column(String, nullable=False, default="email")  # email or json
+    last_sent_on = Column(Date, nullable=True)  # Date of the last delivered digest, so reruns skip the user
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class UserDigest(Base):
+    __tablename__ = "user_digests"
+    
+    # Latest JSON digest of users with json delivery
+    user_id = Column(String, primary_key=True)  # Clerk user ID
+    digest_date = Column(Date, nullable=False)
+    body = Column(Text, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
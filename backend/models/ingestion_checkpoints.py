@@ -0,0 +1,13 @@
+# models/ingestion_checkpoints.py
+from sqlalchemy import Column, Integer, String, DateTime
+from .database import Base
+from datetime import datetime
+
+class IngestionCheckpoint(Base):
+    __tablename__ = "ingestion_checkpoints"
+    
+    name = Column(String, primary_key=True)  # e.g. codeforces-history
+    position = Column(Integer, nullable=False, default=0)  # Feed items committed by the current run
+    started_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    completed_at = Column(DateTime, nullable=True)  # Set when the run reached the end of the feed
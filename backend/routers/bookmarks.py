@@ -1,17 +1,22 @@
 # routers/bookmarks.py
-from fastapi import APIRouter, Depends, HTTPException, Header
+from fastapi import APIRouter, Depends, HTTPException, Header, Response
 from sqlalchemy.orm import Session
 from typing import List, Optional
-from models.database import get_db
+from models.database import get_db, get_read_db, mark_primary_sticky
 from models.contests import Contest
 from models.bookmarks import Bookmark
+from utils.calendar_feed import invalidate_user_feeds
+from utils.retention import restore_contest
+from utils.ingestion import commit_changes
+from utils.rate_limit import rate_limit
+from utils.stats import apply_bookmark_delta
 from sqlalchemy import and_
 
 router = APIRouter(prefix="/bookmarks", tags=["bookmarks"])
 
-@router.get("/")
+@router.get("/", dependencies=[Depends(rate_limit("bookmarks_read"))])
 async def get_user_bookmarks(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     user_id: str = Header(..., description="Clerk user ID")
 ):
     """
@@ -26,9 +31,10 @@ async def get_user_bookmarks(
     
     return bookmarked_contests
 
-@router.post("/{contest_id}")
+@router.post("/{contest_id}", dependencies=[Depends(rate_limit("bookmarks_write"))])
 async def bookmark_contest(
     contest_id: str,
+    response: Response,
     db: Session = Depends(get_db),
     user_id: str = Header(..., description="Clerk user ID")
 ):
@@ -37,6 +43,11 @@ async def bookmark_contest(
     """
     # Check if contest exists
     contest = db.query(Contest).filter(Contest.id == contest_id).first()
+    restored = False
+    if not contest:
+        # Archived contests move back to the contests table once bookmarked
+        contest = restore_contest(db, contest_id)
+        restored = contest is not None
     if not contest:
         raise HTTPException(status_code=404, detail="Contest not found")
     
@@ -58,14 +69,21 @@ async def bookmark_contest(
     )
     
     db.add(bookmark)
-    db.commit()
+    invalidate_user_feeds(db, [user_id])
+    apply_bookmark_delta(db, contest_id, 1)
+    if restored:
+        commit_changes(db, [{"type": "ingest", "created": True, "restored": True, "contest": contest}])
+    else:
+        db.commit()
+    mark_primary_sticky(response, user_id)
     db.refresh(bookmark)
     
     return {"message": "Contest bookmarked successfully"}
 
-@router.delete("/{contest_id}")
+@router.delete("/{contest_id}", dependencies=[Depends(rate_limit("bookmarks_write"))])
 async def remove_bookmark(
     contest_id: str,
+    response: Response,
     db: Session = Depends(get_db),
     user_id: str = Header(..., description="Clerk user ID")
 ):
@@ -85,6 +103,9 @@ async def remove_bookmark(
     
     # Delete the bookmark
     db.delete(bookmark)
+    invalidate_user_feeds(db, [user_id])
+    apply_bookmark_delta(db, contest_id, -1)
     db.commit()
+    mark_primary_sticky(response, user_id)
     
     return {"message": "Bookmark removed successfully"}
\ No newline at end of file
@@ -0,0 +1,108 @@
+# routers/calendar.py
+from fastapi import APIRouter, Depends, HTTPException, Header, Request, Response
+from sqlalchemy.orm import Session
+from typing import Optional
+from email.utils import format_datetime, parsedate_to_datetime
+from datetime import timezone
+from models.database import get_db, get_read_db
+from models.calendar_feeds import CalendarFeed
+from utils.calendar_feed import render_feed
+
+router = APIRouter(prefix="/calendar", tags=["calendar"])
+
+@router.post("/token")
+async def get_calendar_token(
+    request: Request,
+    rotate: bool = False,
+    db: Session = Depends(get_db),
+    user_id: str = Header(..., description="Clerk user ID")
+):
+    """
+    Get (or rotate) the secret token for the user's bookmarks calendar feed
+    """
+    feed = db.query(CalendarFeed).filter(CalendarFeed.user_id == user_id).first()
+    
+    if feed and rotate:
+        db.delete(feed)
+        db.flush()
+        feed = None
+    
+    if not feed:
+        feed = CalendarFeed(user_id=user_id)
+        db.add(feed)
+        db.commit()
+        db.refresh(feed)
+    
+    return {
+        "token": feed.token,
+        "url": str(request.url_for("get_calendar_feed", token=feed.token))
+    }
+
+def _not_modified(etag: str, last_modified, if_none_match: Optional[str], if_modified_since: Optional[str]) -> bool:
+    """Evaluate conditional request headers, If-None-Match taking precedence"""
+    if if_none_match is not None:
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return f'"{etag}"' in tags or "*" in tags
+    if if_modified_since:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        return since.tzinfo is not None and last_modified <= since
+    return False
+
+def _utc(moment):
+    return moment.replace(tzinfo=timezone.utc)
+
+def _validators(etag: str, rendered_at) -> dict:
+    return {
+        "ETag": f'"{etag}"',
+        "Last-Modified": format_datetime(_utc(rendered_at), usegmt=True),
+        "Cache-Control": "private, max-age=300"
+    }
+
+def _render(write_db: Session, token: str):
+    """Render the feed on the primary; write_db connects on first use"""
+    feed = write_db.query(CalendarFeed).filter(CalendarFeed.token == token).first()
+    if not feed:
+        raise HTTPException(status_code=404, detail="Calendar feed not found")
+    return render_feed(write_db, feed)
+
+@router.get("/{token}.ics")
+async def get_calendar_feed(
+    token: str,
+    db: Session = Depends(get_read_db),
+    write_db: Session = Depends(get_db),
+    if_none_match: Optional[str] = Header(None),
+    if_modified_since: Optional[str] = Header(None)
+):
+    """
+    Serve the pre-rendered iCalendar feed of a user's bookmarked contests
+    """
+    # Only the validators are loaded first, so an unchanged poll is a primary key lookup
+    cached = db.query(CalendarFeed.etag, CalendarFeed.rendered_at, CalendarFeed.body.isnot(None)).filter(
+        CalendarFeed.token == token
+    ).first()
+    if not cached:
+        raise HTTPException(status_code=404, detail="Calendar feed not found")
+    
+    etag, rendered_at, is_rendered = cached
+    body = None
+    if not is_rendered:
+        # Bookmarks or contests changed since the last render. Only the
+        # render paths touch the primary.
+        etag, rendered_at, body = _render(write_db, token)
+    
+    if _not_modified(etag, _utc(rendered_at), if_none_match, if_modified_since):
+        return Response(status_code=304, headers=_validators(etag, rendered_at))
+    
+    if body is None:
+        # Validators are loaded again with the body: the feed may have been
+        # re-rendered or invalidated since the first query
+        etag, rendered_at, body = db.query(
+            CalendarFeed.etag, CalendarFeed.rendered_at, CalendarFeed.body
+        ).filter(CalendarFeed.token == token).first() or (None, None, None)
+        if body is None:
+            etag, rendered_at, body = _render(write_db, token)
+    
+    return Response(content=body, media_type="text/calendar", headers=_validators(etag, rendered_at))
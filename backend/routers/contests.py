@@ -1,21 +1,33 @@
 # routers/contests.py
-from fastapi import APIRouter, Depends, HTTPException, Query
+import codecs
+from fastapi import APIRouter, Depends, HTTPException, Query, Header, Request
+from fastapi.responses import StreamingResponse, Response
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import datetime, timedelta
-from models.database import get_db
-from models.contests import Contest
+from models.database import get_db, get_read_db
+from models.contests import Contest, ArchivedContest
 from scrapers.codeforces import CodeForcesScraper
 from scrapers.codechef import CodeChefScraper
 from scrapers.leetcode import LeetCodeScraper
 from sqlalchemy import and_, or_, func
 from pydantic import BaseModel
+from utils.ingestion import ingest_contests, commit_changes
+from utils.contest_events import broadcaster
+from utils.change_log import get_changes, CursorExpiredError
+from utils.search_index import search_index, query_tokens, QueryTooLongError
+from utils.contest_snapshot import contest_snapshots
+from utils.jobs import enqueue_scrape, job_response
+from utils.rate_limit import rate_limit
+from models.contest_enrichments import ContestEnrichment
+from utils.enrichment import enrichment_record
+from utils.solution_import import SolutionRowParser, InvalidHeaderError, import_solution_urls, MAX_IMPORT_ROWS, MAX_IMPORT_LINE_LENGTH
 
 router = APIRouter(prefix="/contests", tags=["contests"])
 
 @router.get("/")
 async def get_contests(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     platform: Optional[str] = Query(None, description="Filter by platform (codeforces, codechef, leetcode)"),
     status: Optional[str] = Query(None, description="Filter by status (upcoming, ongoing, past)"),
     past_days: Optional[int] = Query(7, description="Get past contests from last N days")
@@ -23,91 +35,116 @@ async def get_contests(
     """
     Get all contests with optional filters
     """
-    query = db.query(Contest)
+    # Served from the in-memory snapshot; the database is only consulted to
+    # build it or to check whether another worker has written newer data
+    snapshot = contest_snapshots.get(db)
+    body = snapshot.query(
+        platforms=platform.split(",") if platform else None,
+        status=status,
+        past_days=past_days
+    )
     
-    # Apply platform filter
-    if platform:
-        platforms = platform.split(",")
-        query = query.filter(Contest.platform.in_(platforms))
-    
-    # Apply status filter
-    if status:
-        if status == "past":
-            # Only include past contests from the last N days
-            cutoff_date = datetime.utcnow() - timedelta(days=past_days)
-            query = query.filter(and_(
-                Contest.status == "past",
-                Contest.end_time >= cutoff_date
-            ))
-        else:
-            query = query.filter(Contest.status == status)
-    
-    # Sort by start time
-    # Upcoming and ongoing contests should appear first (sorted by start time ascending)
-    # Past contests should appear last (sorted by end time descending - most recent first)
-    query = query.order_by(
-        # First criteria: status (upcoming and ongoing come before past)
-        Contest.status != "past",
-        # Second criteria: for upcoming/ongoing sort by start time ascending, for past sort by end time descending
-        Contest.start_time.asc() if not status or status != "past" else Contest.end_time.desc()
+    return Response(
+        content=body,
+        media_type="application/json",
+        headers={"X-Snapshot-Version": str(snapshot.version)}
     )
+
+@router.get("/stream")
+async def stream_contest_events(
+    last_event_id: Optional[str] = Header(None, description="Resume after this event id"),
+    since: Optional[int] = Query(None, description="Resume after this event id (for clients that cannot set headers)")
+):
+    """
+    Server-Sent Events stream of contest status transitions, ingestion and solution updates
+    """
+    resume_from = since
+    if resume_from is None and last_event_id and last_event_id.isdigit():
+        resume_from = int(last_event_id)
     
-    return query.all()
+    return StreamingResponse(
+        broadcaster.subscribe(resume_from),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",
+        }
+    )
 
-@router.post("/refresh")
-async def refresh_contests(db: Session = Depends(get_db)):
+@router.get("/archive")
+async def get_archived_contests(
+    db: Session = Depends(get_read_db),
+    platform: Optional[str] = Query(None, description="Filter by platform (codeforces, codechef, leetcode)"),
+    before: Optional[datetime] = Query(None, description="Only contests starting before this time"),
+    limit: int = Query(100, ge=1, le=1000, description="Maximum number of contests to return")
+):
     """
-    Refresh contests data from all platforms
+    Get archived contests, most recent first
     """
+    query = db.query(ArchivedContest)
+    
+    if platform:
+        query = query.filter(ArchivedContest.platform.in_(platform.split(",")))
+    if before:
+        query = query.filter(ArchivedContest.start_time < before)
+    
+    return query.order_by(ArchivedContest.start_time.desc()).limit(limit).all()
+
+@router.get("/search")
+async def search_contests(
+    db: Session = Depends(get_read_db),
+    q: str = Query(..., min_length=1, max_length=200, description="Contest name, e.g. \"Div. 2\" or \"Weekly Contest 44\""),
+    platform: Optional[str] = Query(None, description="Filter by platform (codeforces, codechef, leetcode)"),
+    limit: int = Query(20, ge=1, le=100, description="Maximum number of results")
+):
+    """
+    Search current and archived contests by name with prefix and fuzzy matching
+    """
+    # Checked before syncing, so over-long queries cost nothing
     try:
-        codeforces_scraper = CodeForcesScraper()
-        # codechef_scraper = CodeChefScraper()
-        # leetcode_scraper = LeetCodeScraper()
-        
-        # Fetch contests from all platforms
-        codeforces_contests = codeforces_scraper.get_contests()
-        # codechef_contests = codechef_scraper.get_contests()
-        # leetcode_contests = leetcode_scraper.get_contests()
-        
-        all_contests = codeforces_contests
-        
-        # Update contest statuses
-        now = datetime.utcnow()
-        
-        # First, update statuses of existing contests
-        db_contests = db.query(Contest).all()
-        for contest in db_contests:
-            if contest.start_time > now:
-                contest.status = "upcoming"
-            elif contest.end_time > now:
-                contest.status = "ongoing"
-            else:
-                contest.status = "past"
-        
-        # Then, upsert fetched contests
-        for contest_data in all_contests:
-            # Check if contest already exists
-            existing_contest = db.query(Contest).filter(
-                and_(
-                    Contest.platform == contest_data["platform"],
-                    Contest.contest_id == contest_data["contest_id"]
-                )
-            ).first()
-            
-            if existing_contest:
-                # Update existing contest
-                for key, value in contest_data.items():
-                    setattr(existing_contest, key, value)
-            else:
-                # Create new contest
-                new_contest = Contest(**contest_data)
-                db.add(new_contest)
-        
-        db.commit()
-        return {"message": "Contests refreshed successfully"}
-    except Exception as e:
-        db.rollback()
-        raise HTTPException(status_code=500, detail=f"Failed to refresh contests: {str(e)}")
+        query_tokens(q)
+    except QueryTooLongError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    search_index.sync(db)
+    results = search_index.search(q, platforms=platform.split(",") if platform else None, limit=limit)
+    if not results:
+        return []
+    
+    doc_ids = [doc_id for doc_id, _ in results]
+    contests = {contest.id: contest for contest in db.query(Contest).filter(Contest.id.in_(doc_ids))}
+    missing = [doc_id for doc_id in doc_ids if doc_id not in contests]
+    if missing:
+        contests.update(
+            (contest.id, contest)
+            for contest in db.query(ArchivedContest).filter(ArchivedContest.id.in_(missing))
+        )
+    return [contests[doc_id] for doc_id in doc_ids if doc_id in contests]
+
+@router.get("/changes")
+async def get_contest_changes(
+    db: Session = Depends(get_read_db),
+    since: Optional[int] = Query(None, ge=0, description="Cursor returned by the previous call; omit to get the current cursor"),
+    limit: int = Query(500, ge=1, le=5000, description="Maximum number of changes to return")
+):
+    """
+    Get contest changes after a cursor for delta sync
+    """
+    try:
+        return get_changes(db, since=since, limit=limit)
+    except CursorExpiredError as e:
+        raise HTTPException(status_code=410, detail=f"{e}; fetch a new cursor, then refetch /contests")
+
+@router.post("/refresh", status_code=202, dependencies=[Depends(rate_limit("scrape"))])
+async def refresh_contests():
+    """
+    Queue a refresh of contest data and statuses
+    
+    Returns a job to poll at /jobs/{job_id}; a refresh that is already running
+    is joined instead of starting another one.
+    """
+    job, joined = enqueue_scrape("codeforces", refresh_status=True)
+    return job_response(job, joined)
 
 class SolutionUpdate(BaseModel):
     solution_url: str
@@ -126,6 +163,105 @@ async def update_solution_url(
         raise HTTPException(status_code=404, detail="Contest not found")
     
     contest.solution_url = solution.solution_url
-    db.commit()
+    commit_changes(db, [{"type": "solution", "contest": contest}])
     db.refresh(contest)
-    return contest
\ No newline at end of file
+    return contest
+
+@router.post("/solutions/import")
+async def import_solutions(
+    request: Request,
+    format: Optional[str] = Query(None, description="csv or ndjson; defaults to the Content-Type"),
+    db: Session = Depends(get_db)
+):
+    """
+    Set YouTube solution URLs for many contests at once
+    
+    The body is CSV (with a header row) or NDJSON, one contest per row, keyed
+    by platform and contest_id or by contest name. All matched rows are applied
+    in a single transaction; rows that could not be parsed or matched are
+    reported back.
+    """
+    if format is None:
+        content_type = request.headers.get("content-type", "")
+        format = "ndjson" if "json" in content_type else "csv"
+    try:
+        parser = SolutionRowParser(format)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    rows = []
+    invalid = []
+    line_number = 0
+    
+    def parse_line(line: str) -> None:
+        nonlocal line_number
+        line_number += 1
+        try:
+            row = parser.parse(line)
+        except InvalidHeaderError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        except ValueError as e:
+            invalid.append({"line": line_number, "reason": str(e)})
+            return
+        if row is not None:
+            row["line"] = line_number
+            rows.append(row)
+            if len(rows) > MAX_IMPORT_ROWS:
+                raise HTTPException(status_code=413, detail=f"Imports are limited to {MAX_IMPORT_ROWS} rows")
+    
+    def take_line(line: str) -> None:
+        if len(line) > MAX_IMPORT_LINE_LENGTH:
+            raise HTTPException(
+                status_code=413,
+                detail=f"Line {line_number + 1} is longer than {MAX_IMPORT_LINE_LENGTH} characters"
+            )
+        parse_line(line.rstrip("\r"))
+    
+    # Parse the body as it arrives instead of buffering it whole. Only the
+    # new chunk is searched for line breaks; the start of an unfinished line
+    # is kept in pieces and bounded by the line length limit.
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending: List[str] = []
+    pending_length = 0
+    try:
+        async for chunk in request.stream():
+            *lines, tail = decoder.decode(chunk).split("\n")
+            if lines:
+                pending.append(lines[0])
+                lines[0] = "".join(pending)
+                pending, pending_length = [], 0
+                for line in lines:
+                    take_line(line)
+            pending.append(tail)
+            pending_length += len(tail)
+            if pending_length > MAX_IMPORT_LINE_LENGTH:
+                take_line("".join(pending))
+        pending.append(decoder.decode(b"", final=True))
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="Import body must be UTF-8")
+    last = "".join(pending)
+    if last:
+        take_line(last)
+    
+    try:
+        result = import_solution_urls(db, rows)
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"Failed to import solution URLs: {str(e)}")
+    
+    result["invalid"] = invalid
+    return result
+
+@router.get("/{contest_id}/enrichment")
+async def get_contest_enrichment(
+    contest_id: str,
+    db: Session = Depends(get_read_db)
+):
+    """
+    Get problem count, problem tags and participant count for a contest
+    """
+    enrichment = db.query(ContestEnrichment).filter(ContestEnrichment.contest_id == contest_id).first()
+    if not enrichment:
+        raise HTTPException(status_code=404, detail="Contest has not been enriched yet")
+    
+    return enrichment_record(enrichment)
\ No newline at end of file
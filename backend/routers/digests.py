@@ -0,0 +1,75 @@
+# routers/digests.py
+from fastapi import APIRouter, Depends, HTTPException, Header
+from fastapi.responses import Response
+from sqlalchemy.orm import Session
+from pydantic import BaseModel
+from typing import List, Optional
+from datetime import datetime
+from models.database import get_db, get_read_db
+from models.digests import DigestSubscription, UserDigest
+from utils.digests import DELIVERIES
+from utils.rate_limit import rate_limit
+from utils.upsert import upsert
+
+router = APIRouter(prefix="/digests", tags=["digests"])
+
+class DigestSettings(BaseModel):
+    enabled: bool = True
+    platforms: Optional[List[str]] = None  # All platforms when empty
+    delivery: str = "email"
+
+def _settings_response(subscription: Optional[DigestSubscription]):
+    if not subscription:
+        return {"enabled": False, "platforms": None, "delivery": "email", "last_sent_on": None}
+    return {
+        "enabled": subscription.enabled,
+        "platforms": subscription.platforms.split(",") if subscription.platforms else None,
+        "delivery": subscription.delivery,
+        "last_sent_on": subscription.last_sent_on.isoformat() if subscription.last_sent_on else None,
+    }
+
+@router.get("/settings", dependencies=[Depends(rate_limit("digests"))])
+async def get_digest_settings(
+    db: Session = Depends(get_read_db),
+    user_id: str = Header(..., description="Clerk user ID")
+):
+    """
+    Get the user's daily digest settings
+    """
+    return _settings_response(db.get(DigestSubscription, user_id))
+
+@router.put("/settings", dependencies=[Depends(rate_limit("digests"))])
+async def update_digest_settings(
+    settings: DigestSettings,
+    db: Session = Depends(get_db),
+    user_id: str = Header(..., description="Clerk user ID")
+):
+    """
+    Subscribe to, change or disable the daily digest
+    """
+    if settings.delivery not in DELIVERIES:
+        raise HTTPException(status_code=400, detail=f"delivery must be one of {', '.join(DELIVERIES)}")
+    
+    upsert(db, DigestSubscription, {"user_id": user_id}, {
+        "enabled": settings.enabled,
+        "platforms": ",".join(settings.platforms) if settings.platforms else None,
+        "delivery": settings.delivery,
+        "updated_at": datetime.utcnow(),
+    })
+    db.commit()
+    
+    return _settings_response(db.get(DigestSubscription, user_id))
+
+@router.get("/latest", dependencies=[Depends(rate_limit("digests"))])
+async def get_latest_digest(
+    db: Session = Depends(get_read_db),
+    user_id: str = Header(..., description="Clerk user ID")
+):
+    """
+    Get the user's most recent JSON digest
+    """
+    digest = db.get(UserDigest, user_id)
+    if not digest:
+        raise HTTPException(status_code=404, detail="No digest yet")
+    
+    return Response(content=digest.body, media_type="application/json")
@@ -0,0 +1,48 @@
+# routers/export.py
+from fastapi import APIRouter, Header, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from typing import Iterator, Optional
+from datetime import datetime
+from models.database import ReadSessionLocal
+from utils.export import export_table, ExportError, FORMATS, PRIVATE_TABLES
+from utils.admin import is_admin
+
+router = APIRouter(prefix="/export", tags=["export"])
+
+@router.get("/{table}")
+async def export(
+    table: str,
+    format: str = Query("ndjson", description="parquet, arrow or ndjson"),
+    columns: Optional[str] = Query(None, description="Comma separated column names (default: all)"),
+    since: Optional[datetime] = Query(None, description="Inclusive lower bound on start_time (created_at for bookmarks)"),
+    until: Optional[datetime] = Query(None, description="Exclusive upper bound on start_time (created_at for bookmarks)"),
+    x_admin_token: Optional[str] = Header(None, description="Required for bookmarks")
+):
+    """
+    Stream contests, archived contests or bookmarks as Parquet, Arrow IPC or NDJSON
+    
+    Bookmarks include user ids and are only exported to admins.
+    """
+    if table in PRIVATE_TABLES and not is_admin(x_admin_token):
+        raise HTTPException(status_code=403, detail=f"Exporting {table} requires the admin token")
+    
+    # The session must outlive this handler, so the stream owns it
+    db = ReadSessionLocal()
+    try:
+        chunks = export_table(db, table, format, columns.split(",") if columns else None, since, until)
+    except ExportError as e:
+        db.close()
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    def stream() -> Iterator[bytes]:
+        try:
+            yield from chunks
+        finally:
+            db.close()
+    
+    extension = {"parquet": "parquet", "arrow": "arrows", "ndjson": "ndjson"}[format]
+    return StreamingResponse(
+        stream(),
+        media_type=FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="{table}.{extension}"'}
+    )
@@ -0,0 +1,16 @@
+# routers/jobs.py
+from fastapi import APIRouter, HTTPException
+from utils.jobs import job_queue
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+@router.get("/{job_id}")
+async def get_job(job_id: str):
+    """
+    Get the status and result of a background job
+    """
+    job = job_queue.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    return job.to_dict()
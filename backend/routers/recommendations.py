@@ -0,0 +1,36 @@
+# routers/recommendations.py
+from fastapi import APIRouter, Depends, Header, Query
+from sqlalchemy.orm import Session
+from models.database import get_read_db
+from models.contests import Contest
+from models.bookmarks import Bookmark
+from utils.rate_limit import rate_limit
+from utils.recommendations import recommender
+
+router = APIRouter(prefix="/recommendations", tags=["recommendations"])
+
+@router.get("/", dependencies=[Depends(rate_limit("recommendations"))])
+async def get_recommendations(
+    db: Session = Depends(get_read_db),
+    user_id: str = Header(..., description="Clerk user ID"),
+    limit: int = Query(10, ge=1, le=50, description="Maximum number of contests to return")
+):
+    """
+    Upcoming contests ranked by similarity to the user's bookmarks
+    
+    Users without bookmarks get the soonest upcoming contests.
+    """
+    recommender.sync(db)
+    bookmarked = [row[0] for row in db.query(Bookmark.contest_id).filter(Bookmark.user_id == user_id)]
+    ranked = recommender.recommend([bookmarked], limit=limit)[0]
+    if not ranked:
+        return []
+    
+    contests = {
+        contest.id: contest
+        for contest in db.query(Contest).filter(Contest.id.in_([contest_id for contest_id, _ in ranked]))
+    }
+    return [
+        {"contest": contests[contest_id], "score": round(score, 4)}
+        for contest_id, score in ranked if contest_id in contests
+    ]
@@ -0,0 +1,107 @@
+# routers/stats.py
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from sqlalchemy import func
+from typing import Optional
+from datetime import datetime, timedelta
+from models.database import get_read_db
+from models.contests import Contest
+from models.contest_stats import PlatformWeekStat, ContestBookmarkCount
+from utils.stats import week_start, check_stats
+from utils.admin import require_admin
+from utils.rate_limit import rate_limit
+
+router = APIRouter(prefix="/stats", tags=["stats"])
+
+@router.get("/platforms")
+async def get_platform_stats(
+    db: Session = Depends(get_read_db),
+    weeks: int = Query(12, ge=1, le=520, description="Number of weeks back from the current one"),
+    platform: Optional[str] = Query(None, description="Filter by platform")
+):
+    """
+    Contests per platform per week with their average duration
+    """
+    since = week_start(datetime.utcnow()) - timedelta(weeks=weeks - 1)
+    query = db.query(PlatformWeekStat).filter(PlatformWeekStat.week_start >= since)
+    if platform:
+        query = query.filter(PlatformWeekStat.platform == platform)
+
+    return [
+        {
+            "platform": row.platform,
+            "week_start": row.week_start.date().isoformat(),
+            "contest_count": row.contest_count,
+            "average_duration": row.total_duration / row.contest_count,
+        }
+        for row in query.order_by(PlatformWeekStat.week_start.asc(), PlatformWeekStat.platform.asc())
+    ]
+
+@router.get("/durations")
+async def get_duration_stats(db: Session = Depends(get_read_db)):
+    """
+    Contest count and average duration (in minutes) per platform over all time
+    """
+    rows = db.query(
+        PlatformWeekStat.platform,
+        func.sum(PlatformWeekStat.contest_count),
+        func.sum(PlatformWeekStat.total_duration)
+    ).group_by(PlatformWeekStat.platform).all()
+
+    return {
+        platform: {"contest_count": count, "average_duration": total / count}
+        for platform, count, total in rows
+    }
+
+@router.get("/bookmarks/top")
+async def get_most_bookmarked(
+    db: Session = Depends(get_read_db),
+    limit: int = Query(10, ge=1, le=100),
+    status: str = Query("upcoming", description="Contest status to rank")
+):
+    """
+    Most bookmarked contests with the given status
+    """
+    rows = db.query(Contest, ContestBookmarkCount.bookmark_count).join(
+        ContestBookmarkCount, ContestBookmarkCount.contest_id == Contest.id
+    ).filter(
+        Contest.status == status
+    ).order_by(
+        ContestBookmarkCount.bookmark_count.desc(), Contest.start_time.asc()
+    ).limit(limit).all()
+
+    return [
+        {
+            "id": contest.id,
+            "platform": contest.platform,
+            "name": contest.name,
+            "start_time": contest.start_time.isoformat(),
+            "bookmark_count": count,
+        }
+        for contest, count in rows
+    ]
+
+@router.get("/bookmarks/{contest_id}")
+async def get_bookmark_count(
+    contest_id: str,
+    db: Session = Depends(get_read_db)
+):
+    """
+    Number of users who bookmarked a contest
+    """
+    count = db.query(ContestBookmarkCount.bookmark_count).filter(
+        ContestBookmarkCount.contest_id == contest_id
+    ).scalar()
+    if count is None and not db.query(Contest.id).filter(Contest.id == contest_id).first():
+        raise HTTPException(status_code=404, detail="Contest not found")
+
+    return {"contest_id": contest_id, "bookmark_count": count or 0}
+
+@router.get("/check", dependencies=[Depends(rate_limit("stats_check")), Depends(require_admin)])
+async def check_stats_consistency(db: Session = Depends(get_read_db)):
+    """
+    Rebuild the statistics from the base tables and report differences
+
+    Operator-only: requires the X-Admin-Token header.
+    """
+    return check_stats(db)
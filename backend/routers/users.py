@@ -1,10 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException, Header
+from fastapi import APIRouter, Depends, HTTPException, Header, Response
 from sqlalchemy.orm import Session
-from models.database import get_db
+from models.database import get_db, get_read_db, mark_primary_sticky
 from models.users import User
 from pydantic import BaseModel
 from typing import Optional
 from datetime import datetime
+from utils.rate_limit import rate_limit
+from utils.upsert import upsert
 
 router = APIRouter(prefix="/users", tags=["users"])
 
@@ -16,40 +18,27 @@ class UserCreate(BaseModel):
     last_name: Optional[str] = None
     image_url: Optional[str] = None
 
-@router.post("/")
+@router.post("/", dependencies=[Depends(rate_limit("users"))])
 async def create_or_update_user(
     user_data: UserCreate,
+    response: Response,
     db: Session = Depends(get_db)
 ):
     """
     Create a new user or update existing user
     """
-    # Check if user already exists
-    existing_user = db.query(User).filter(User.clerk_id == user_data.clerk_id).first()
-    
-    if existing_user:
-        # Update existing user
-        for key, value in user_data.dict().items():
-            setattr(existing_user, key, value)
-        existing_user.updated_at = datetime.utcnow()
-    else:
-        # Create new user
-        new_user = User(**user_data.dict())
-        db.add(new_user)
-    
+    # Insert or update in one statement, so concurrent calls cannot both insert
+    values = user_data.dict()
+    clerk_id = values.pop("clerk_id")
+    upsert(db, User, {"clerk_id": clerk_id}, {**values, "updated_at": datetime.utcnow()})
     db.commit()
+    mark_primary_sticky(response, clerk_id)
     
-    if existing_user:
-        db.refresh(existing_user)
-        return existing_user
-    else:
-        # Get the newly created user
-        user = db.query(User).filter(User.clerk_id == user_data.clerk_id).first()
-        return user
+    return db.query(User).filter(User.clerk_id == clerk_id).first()
 
 @router.get("/me")
 async def get_current_user(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     user_id: str = Header(..., description="Clerk user ID")
 ):
     """
@@ -60,7 +49,7 @@ async def get_current_user(
         raise HTTPException(status_code=404, detail="User not found")
     return user
 
-@router.post("/sync")
+@router.post("/sync", dependencies=[Depends(rate_limit("users"))])
 async def sync_user(user_data: dict, db: Session = Depends(get_db)):
     """
     Sync user data from Clerk to our database
@@ -78,28 +67,15 @@ async def sync_user(user_data: dict, db: Session = Depends(get_db)):
     if not user_id:
         raise HTTPException(status_code=400, detail="User ID is required")
     
-    # Find or create user
-    db_user = db.query(User).filter(User.clerk_id == user_id).first()
-    
-    if db_user:
-        # Update existing user
-        db_user.email = email
-        db_user.first_name = first_name
-        db_user.last_name = last_name
-        db_user.updated_at = datetime.utcnow()
-    else:
-        # Create new user
-        db_user = User(
-            clerk_id=user_id,
-            email=email,
-            first_name=first_name,
-            last_name=last_name
-        )
-        db.add(db_user)
-    
     try:
+        # Find or create user
+        upsert(db, User, {"clerk_id": user_id}, {
+            "email": email,
+            "first_name": first_name,
+            "last_name": last_name,
+            "updated_at": datetime.utcnow()
+        })
         db.commit()
-        db.refresh(db_user)
         return {"status": "success", "user_id": user_id}
     except Exception as e:
         db.rollback()
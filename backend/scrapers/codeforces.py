@@ -1,20 +1,36 @@
 # scrapers/codeforces.py
 import requests
 import time
+import logging
 import hashlib
 import random
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterator, Optional
 import os
 from dotenv import load_dotenv
+from utils.token_bucket import TokenBucket
+from utils.json_stream import iter_array_items
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+# Codeforces allows roughly one API call every two seconds; shared by every caller in the process
+api_limiter = TokenBucket(rate=0.5, capacity=1)
+# Participant counts are narrowed down by probing standings positions, and
+# the final gap of at most this many rows is counted from a single page
+STANDINGS_PAGE_ROWS = 2000
+
+class CodeforcesAPIError(Exception):
+    """Raised when the Codeforces API answers with status FAILED"""
+
 class CodeForcesScraper:
     def __init__(self):
         self.base_url = "https://codeforces.com/api"
         self.api_key = os.getenv("CODEFORCES_API_KEY")
         self.api_secret = os.getenv("CODEFORCES_API_SECRET")
+        # (connect, read) timeout in seconds for API calls
+        self.timeout = (5, 30)
         
     def _generate_auth_params(self, method_name, params=None):
         """Generate authentication parameters for Codeforces API"""
@@ -45,6 +61,28 @@ class CodeForcesScraper:
         params["apiSig"] = f"{rand}{hash_value}"
         
         return params
+    
+    def call_api(self, method_name: str, params: Dict[str, Any] = None) -> Any:
+        """
+        Call a Codeforces API method, waiting for the shared rate limiter
+        
+        Returns:
+            Any: The "result" field of the response
+        """
+        api_limiter.acquire()
+        params = self._generate_auth_params(method_name, dict(params or {}))
+        
+        response = requests.get(f"{self.base_url}/{method_name}", params=params, timeout=self.timeout)
+        # Failed calls come back as 400 with a JSON comment explaining why
+        if response.status_code == 400:
+            data = response.json()
+            raise CodeforcesAPIError(data.get("comment", "Bad request"))
+        response.raise_for_status()
+        data = response.json()
+        
+        if data["status"] != "OK":
+            raise CodeforcesAPIError(f"Codeforces API returned {data['status']}: {data.get('comment', '')}")
+        return data["result"]
         
     def get_contests(self) -> List[Dict[str, Any]]:
         """
@@ -54,54 +92,152 @@ class CodeForcesScraper:
             List[Dict[str, Any]]: List of contests with standardized format
         """
         try:
-            method_name = "contest.list"
-            params = self._generate_auth_params(method_name)
-            
-            response = requests.get(f"{self.base_url}/{method_name}", params=params)
-            response.raise_for_status()
-            data = response.json()
-            
-            if data["status"] != "OK":
-                return []
-                
-            contests = []
-            current_time = datetime.now().timestamp()
-            one_week_ago = current_time - (7 * 24 * 60 * 60)  
+            return self.fetch_contests()
+        except Exception as e:
+            print(f"Error fetching Codeforces contests: {e}")
+            return []
+    
+    def fetch_contests(self) -> List[Dict[str, Any]]:
+        """
+        Fetch all contests from Codeforces API, raising on request or API errors
+        
+        Returns:
+            List[Dict[str, Any]]: List of contests with standardized format
+        """
+        result = self.call_api("contest.list")
             
-            for contest in data["result"]:
+        contests = []
+        current_time = datetime.now().timestamp()
+        one_week_ago = current_time - (7 * 24 * 60 * 60)  
+        
+        for contest in result:
 
-                if contest.get("phase") == "FINISHED" and contest.get("gym", False):
-                    continue
-                
-                start_time = datetime.fromtimestamp(contest["startTimeSeconds"])
-                duration_seconds = contest["durationSeconds"]
-                end_time = datetime.fromtimestamp(contest["startTimeSeconds"] + duration_seconds)
-                
-                # Determine contest status
-                if contest["phase"] == "BEFORE":
-                    status = "upcoming"
-                elif contest["phase"] == "CODING":
-                    status = "ongoing"
-                else:
-                    status = "past"
-                
-                # Skip past contests older than 1 week
-                if contest["startTimeSeconds"] < one_week_ago and status == "past":
-                    continue
-                
-                contests.append({
-                    "platform": "codeforces",
-                    "contest_id": str(contest["id"]),
-                    "name": contest["name"],
-                    "url": f"https://codeforces.com/contest/{contest['id']}",
-                    "start_time": start_time,
-                    "end_time": end_time,
-                    "duration": duration_seconds // 60,  
-                    "status": status,
-                    "description": contest.get("description", "")
-                })
+            if contest.get("phase") == "FINISHED" and contest.get("gym", False):
+                continue
             
-            return contests
-        except Exception as e:
-            print(f"Error fetching Codeforces contests: {e}")
-            return []
\ No newline at end of file
+            # Skip past contests older than 1 week
+            if contest["startTimeSeconds"] < one_week_ago and contest["phase"] not in ("BEFORE", "CODING"):
+                continue
+            
+            contests.append(self.parse_contest(contest))
+        
+        return contests
+    
+    def parse_contest(self, contest: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Convert a contest.list entry to the standardized format
+        
+        Returns:
+            Dict[str, Any]: Contest with standardized fields
+        """
+        start_time = datetime.fromtimestamp(contest["startTimeSeconds"])
+        duration_seconds = contest["durationSeconds"]
+        end_time = datetime.fromtimestamp(contest["startTimeSeconds"] + duration_seconds)
+        
+        # Determine contest status
+        if contest["phase"] == "BEFORE":
+            status = "upcoming"
+        elif contest["phase"] == "CODING":
+            status = "ongoing"
+        else:
+            status = "past"
+        
+        section = "gym" if contest.get("gym", False) else "contest"
+        return {
+            "platform": "codeforces",
+            "contest_id": str(contest["id"]),
+            "name": contest["name"],
+            "url": f"https://codeforces.com/{section}/{contest['id']}",
+            "start_time": start_time,
+            "end_time": end_time,
+            "duration": duration_seconds // 60,  
+            "status": status,
+            "description": contest.get("description", "")
+        }
+    
+    def stream_contests(self, gym: bool = True) -> Iterator[Optional[Dict[str, Any]]]:
+        """
+        Stream the full contest.list in standardized format
+        
+        The response is parsed incrementally, so memory use does not grow with
+        the size of the list. Gym contests without a start time are yielded as
+        None, keeping positions in the stream stable for resuming.
+        
+        Raises:
+            CodeforcesAPIError: When the API answers with an error
+            ValueError: When the response body is not a contest list
+        """
+        api_limiter.acquire()
+        params = self._generate_auth_params("contest.list", {"gym": str(gym).lower()})
+        
+        with requests.get(
+            f"{self.base_url}/contest.list", params=params, timeout=self.timeout, stream=True
+        ) as response:
+            if response.status_code == 400:
+                raise CodeforcesAPIError(response.json().get("comment", "Bad request"))
+            response.raise_for_status()
+            for contest in iter_array_items(response.iter_content(chunk_size=64 * 1024), "result"):
+                yield self.parse_contest(contest) if "startTimeSeconds" in contest else None
+    
+    def get_contest_details(self, contest_id: str) -> Dict[str, Any]:
+        """
+        Fetch problem and participant information for a contest
+        
+        Problems are only visible once a contest has started, and participant
+        counts are only taken once it has finished, when the standings no
+        longer change. Unavailable values are returned as None.
+        
+        Returns:
+            Dict[str, Any]: problem_count, problem_tags and participant_count
+        """
+        details = {"problem_count": None, "problem_tags": None, "participant_count": None}
+        
+        try:
+            standings = self.call_api("contest.standings", {"contestId": contest_id, "from": 1, "count": 1})
+            problems = standings.get("problems", [])
+            details["problem_count"] = len(problems)
+            details["problem_tags"] = sorted({tag for problem in problems for tag in problem.get("tags", [])})
+        except CodeforcesAPIError as e:
+            if "has not started" not in str(e):
+                raise
+            return details
+        
+        if standings.get("contest", {}).get("phase") == "FINISHED":
+            details["participant_count"] = self.count_participants(contest_id) if standings.get("rows") else 0
+        
+        return details
+    
+    def _standings_rows(self, contest_id: str, start: int, count: int) -> int:
+        """Number of official standings rows returned from position start (1-based)"""
+        standings = self.call_api("contest.standings", {
+            "contestId": contest_id, "from": start, "count": count, "showUnofficial": "false"
+        })
+        return len(standings.get("rows", []))
+    
+    def count_participants(self, contest_id: str) -> int:
+        """
+        Count the official standings rows of a contest without downloading them
+        
+        Single-row pages tell whether a position exists. Positions are probed
+        at growing steps until one is past the end, the gap is halved down to
+        STANDINGS_PAGE_ROWS, and the rest is counted from one page. A contest
+        with n participants costs about 2 * log2(n / STANDINGS_PAGE_ROWS) + 2
+        small calls instead of the whole contest.ratingChanges list, which
+        runs to megabytes for large rounds and only covers rated contests.
+        """
+        # Position low is known to exist (0 when none is), high is not
+        low, high = 0, STANDINGS_PAGE_ROWS
+        calls = 1
+        while self._standings_rows(contest_id, high, 1):
+            low, high = high, high * 4
+            calls += 1
+        while high - low > STANDINGS_PAGE_ROWS:
+            middle = (low + high) // 2
+            if self._standings_rows(contest_id, middle, 1):
+                low = middle
+            else:
+                high = middle
+            calls += 1
+        count = low + self._standings_rows(contest_id, low + 1, high - low - 1)
+        logger.info(f"Counted {count} participants of Codeforces contest {contest_id} in {calls + 1} calls")
+        return count
@@ -0,0 +1,31 @@
+# tests/conftest.py
+import os
+import sys
+import tempfile
+
+import pytest
+
+# Modules are imported the way main.py imports them, relative to backend/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Keep tests away from any configured database, including one set in .env
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'test.db')}"
+os.environ["READ_DATABASE_URL"] = ""
+# Rendered static snapshots go to a temporary directory, not backend/static
+os.environ["STATIC_SNAPSHOT_DIR"] = os.path.join(tempfile.mkdtemp(), "contests")
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+@pytest.fixture
+def db():
+    """A session on a freshly created SQLite database"""
+    from models.database import Base, engine, SessionLocal
+    import models.users, models.contests, models.bookmarks, models.contest_changes, models.contest_stats, models.digests, models.calendar_feeds  # noqa: F401
+
+    Base.metadata.create_all(bind=engine)
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+        Base.metadata.drop_all(bind=engine)
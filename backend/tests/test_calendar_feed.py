@@ -0,0 +1,95 @@
+# tests/test_calendar_feed.py
+from datetime import datetime, timedelta
+
+from models.bookmarks import Bookmark
+from models.calendar_feeds import CalendarFeed
+from models.contests import Contest
+from utils import calendar_feed
+
+NOW = datetime(2025, 3, 10, 6, 0)
+
+
+def _feed_with_bookmark(db):
+    contest = Contest(
+        platform="codeforces", contest_id="1", name="Round 1", url="https://codeforces.com/contest/1",
+        start_time=NOW + timedelta(days=1), end_time=NOW + timedelta(days=1, hours=2),
+        duration=120, status="upcoming"
+    )
+    db.add(contest)
+    db.flush()
+    db.add(Bookmark(user_id="user-1", contest_id=contest.id))
+    feed = CalendarFeed(user_id="user-1")
+    db.add(feed)
+    db.commit()
+    return feed
+
+
+def test_render_stores_body(db):
+    feed = _feed_with_bookmark(db)
+
+    etag, _, body = calendar_feed.render_feed(db, feed)
+
+    stored = db.query(CalendarFeed).one()
+    assert "SUMMARY:Round 1" in body
+    assert (stored.etag, stored.body) == (etag, body)
+
+
+def test_render_does_not_overwrite_a_newer_invalidation(db, monkeypatch):
+    feed = _feed_with_bookmark(db)
+    render_calendar = calendar_feed.render_calendar
+
+    def invalidated_while_rendering(contests, stamp):
+        # A bookmark change committed between the bookmark query and the write
+        calendar_feed.invalidate_user_feeds(db, ["user-1"])
+        return render_calendar(contests, stamp)
+
+    monkeypatch.setattr(calendar_feed, "render_calendar", invalidated_while_rendering)
+    _, _, body = calendar_feed.render_feed(db, feed)
+
+    stored = db.query(CalendarFeed).one()
+    assert "SUMMARY:Round 1" in body
+    assert stored.body is None
+    assert stored.generation == 1
+
+
+def test_feed_invalidated_between_queries_is_rendered_not_served_empty(db, monkeypatch):
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from models.database import get_db, get_read_db
+    from routers import calendar
+
+    feed = _feed_with_bookmark(db)
+    token = feed.token
+    calendar_feed.render_feed(db, feed)
+    app = FastAPI()
+    app.include_router(calendar.router)
+    app.dependency_overrides[get_read_db] = lambda: db
+    app.dependency_overrides[get_db] = lambda: db
+
+    # Invalidate right after the validators were read
+    query = db.query
+    calls = []
+
+    class InvalidateAfterFirst:
+        def __init__(self, wrapped):
+            self.wrapped = wrapped
+
+        def filter(self, *criteria):
+            return InvalidateAfterFirst(self.wrapped.filter(*criteria))
+
+        def first(self):
+            row = self.wrapped.first()
+            calendar_feed.invalidate_user_feeds(db, ["user-1"])
+            db.commit()
+            return row
+
+    def query_then_invalidate(*entities):
+        calls.append(entities)
+        return InvalidateAfterFirst(query(*entities)) if len(calls) == 1 else query(*entities)
+
+    monkeypatch.setattr(db, "query", query_then_invalidate)
+    response = TestClient(app).get(f"/calendar/{token}.ics")
+
+    assert response.status_code == 200
+    assert "SUMMARY:Round 1" in response.text
+    assert response.headers["etag"] == f'"{db.query(CalendarFeed.etag).scalar()}"'
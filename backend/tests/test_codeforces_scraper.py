@@ -0,0 +1,47 @@
+# tests/test_codeforces_scraper.py
+import pytest
+
+from scrapers.codeforces import CodeForcesScraper, CodeforcesAPIError
+
+
+class FakeStandings(CodeForcesScraper):
+    """Answers contest.standings from a contest with a given number of official rows"""
+
+    def __init__(self, participants: int, phase: str = "FINISHED"):
+        super().__init__()
+        self.participants = participants
+        self.phase = phase
+        self.calls = []
+
+    def call_api(self, method_name, params=None):
+        assert method_name == "contest.standings"
+        self.calls.append(params)
+        if self.phase == "BEFORE":
+            raise CodeforcesAPIError("contestId: Contest with id 1 has not started")
+        first = params["from"]
+        last = min(first + params["count"] - 1, self.participants)
+        return {
+            "contest": {"id": 1, "phase": self.phase},
+            "problems": [{"index": "A", "tags": ["math", "greedy"]}, {"index": "B", "tags": ["math"]}],
+            "rows": [{"rank": position} for position in range(first, last + 1)],
+        }
+
+
+@pytest.mark.parametrize("participants", [0, 1, 1999, 2000, 2001, 8000, 45678, 200000])
+def test_participants_are_counted_from_standings_positions(participants):
+    scraper = FakeStandings(participants)
+
+    details = scraper.get_contest_details("1")
+
+    assert details == {"problem_count": 2, "problem_tags": ["greedy", "math"], "participant_count": participants}
+    # Every call but the final page asks for a single row
+    assert all(params["count"] == 1 for params in scraper.calls[:-1])
+    assert scraper.calls[-1]["count"] <= 2000
+    assert len(scraper.calls) <= 20
+
+
+def test_unfinished_contests_have_no_participant_count():
+    assert FakeStandings(500, phase="CODING").get_contest_details("1")["participant_count"] is None
+    assert FakeStandings(0, phase="BEFORE").get_contest_details("1") == {
+        "problem_count": None, "problem_tags": None, "participant_count": None
+    }
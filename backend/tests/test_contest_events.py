@@ -0,0 +1,24 @@
+# tests/test_contest_events.py
+import time
+
+from utils.contest_events import ContestEventBroadcaster
+
+MAX_SAFE_INTEGER = 2 ** 53 - 1
+
+
+def test_event_ids_are_safe_javascript_integers():
+    broadcaster = ContestEventBroadcaster()
+    assert broadcaster.publish("ingest", {}) <= MAX_SAFE_INTEGER
+
+
+def test_ids_from_an_earlier_process_get_a_reset(monkeypatch):
+    earlier = ContestEventBroadcaster()
+    old_id = earlier.publish("ingest", {})
+    restarted_at = time.time() + 60
+    monkeypatch.setattr("utils.contest_events.time.time", lambda: restarted_at)
+    later = ContestEventBroadcaster()
+    later.publish("ingest", {})
+
+    events, reset_id = later._events_after(old_id)
+
+    assert reset_id is not None and len(events) == 1
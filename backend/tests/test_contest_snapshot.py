@@ -0,0 +1,37 @@
+# tests/test_contest_snapshot.py
+import json
+from datetime import datetime, timedelta
+
+from models.contests import Contest
+from utils.contest_snapshot import ContestSnapshot, _mask_of
+
+NOW = datetime(2025, 3, 10, 12, 0)
+
+
+def _contest(i, platform, ended_days_ago):
+    end = NOW - timedelta(days=ended_days_ago)
+    return Contest(
+        id=f"id-{i}", platform=platform, contest_id=str(i), name=f"Round {i}", url=f"https://example.com/{i}",
+        start_time=end - timedelta(hours=2), end_time=end, duration=120,
+        status="past" if ended_days_ago > 0 else "upcoming"
+    )
+
+
+def test_mask_of_matches_bitwise_or():
+    positions = [0, 3, 8, 9, 64, 1000]
+    expected = 0
+    for i in positions:
+        expected |= 1 << i
+    assert _mask_of(positions, 1001) == expected
+    assert _mask_of([], 10) == 0
+
+
+def test_past_query_keeps_the_window_and_orders_by_end():
+    contests = [_contest(i, "codeforces" if i % 2 else "leetcode", ended_days_ago=i - 2) for i in range(40)]
+    snapshot = ContestSnapshot(contests, version=1)
+
+    past = json.loads(snapshot.query(status="past", past_days=10, now=NOW))
+    assert [row["contest_id"] for row in past] == [str(i) for i in range(3, 13)]
+
+    leetcode = json.loads(snapshot.query(platforms=["leetcode"], status="past", past_days=10, now=NOW))
+    assert [row["contest_id"] for row in leetcode] == [str(i) for i in range(4, 13, 2)]
@@ -0,0 +1,71 @@
+# tests/test_digests.py
+import email
+import random
+from datetime import datetime
+
+from models.digests import DigestSubscription, UserDigest
+from utils.digest_benchmark import MailSink, run, seed
+from utils.digests import run_digests
+from utils.mailer import MailerPool
+
+NOW = datetime(2025, 3, 10, 6, 0)
+
+
+def test_digests_are_delivered_to_a_local_mail_sink(db):
+    random.seed(1)
+    seed(db, users=600, contests=60, now=NOW, batch_size=250)
+
+    with MailSink() as sink:
+        first = run(db, sink, NOW, pool_size=2)
+        rerun = run(db, sink, NOW, pool_size=2)
+
+    json_users = db.query(DigestSubscription).filter(DigestSubscription.delivery == "json").count()
+    assert first["failed"] == 0
+    assert first["stored"] == json_users == db.query(UserDigest).count()
+    assert first["emailed"] + first["stored"] + first["empty"] == 600
+    assert sink.counts["messages"] == first["emailed"]
+    assert sink.counts["connections"] <= 2 * 2
+    # One subscriber and one bookmark query per chunk, however many users
+    assert first["queries"] < 30
+    # Everyone was marked, so a same-day rerun sends nothing
+    assert rerun["emailed"] == rerun["stored"] == 0
+    assert rerun["queries"] <= 3
+
+
+def test_digest_emails_are_valid_multipart_messages(db):
+    random.seed(2)
+    seed(db, users=5, contests=10, now=NOW, json_share=0.0)
+    received = []
+
+    class RecordingPool(MailerPool):
+        def submit(self, key, to, message):
+            received.append(message)
+            super().submit(key, to, message)
+
+    with MailSink() as sink, RecordingPool("127.0.0.1", sink.port, pool_size=1, username=None, starttls=False) as mailer:
+        totals = run_digests(db, mailer, now=NOW)
+
+    assert totals["emailed"] == len(received) == 5
+    message = email.message_from_bytes(received[0])
+    assert message.is_multipart()
+    assert message["Subject"] == "Your contests for 2025-03-10"
+    text, body = (part.get_payload(decode=True).decode("utf-8") for part in message.get_payload())
+    assert "Hi User" in text and "https://example.com/contest/" in text
+    assert body.startswith("<html>")
+
+
+def test_no_transaction_is_open_while_mail_is_delivered(db):
+    random.seed(3)
+    seed(db, users=40, contests=10, now=NOW, json_share=0.5)
+    open_during_drain = []
+
+    class CheckingPool(MailerPool):
+        def drain(self):
+            open_during_drain.append(db.in_transaction())
+            return super().drain()
+
+    with MailSink() as sink, CheckingPool("127.0.0.1", sink.port, pool_size=1, username=None, starttls=False) as mailer:
+        totals = run_digests(db, mailer, now=NOW, chunk_size=10)
+
+    assert totals["stored"] and totals["emailed"]
+    assert open_during_drain and not any(open_during_drain)
@@ -0,0 +1,34 @@
+# tests/test_jobs.py
+import threading
+import time
+
+from utils import jobs
+
+
+def test_refresh_and_plain_scrape_of_a_platform_store_one_at_a_time(monkeypatch):
+    active = []
+    overlaps = []
+    lock = threading.Lock()
+
+    def ingest_contests(db, contests, refresh_status):
+        with lock:
+            active.append(refresh_status)
+            overlaps.append(len(active))
+        time.sleep(0.05)
+        with lock:
+            active.remove(refresh_status)
+        return []
+
+    monkeypatch.setattr(jobs, "fetch_platform", lambda platform, fetch: [])
+    monkeypatch.setattr(jobs, "ingest_contests", ingest_contests)
+
+    threads = [
+        threading.Thread(target=jobs.scrape_platform, args=("codeforces", refresh_status))
+        for refresh_status in (True, False, True, False)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert overlaps and max(overlaps) == 1
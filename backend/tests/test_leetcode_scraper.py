@@ -0,0 +1,159 @@
+# tests/test_leetcode_scraper.py
+import json
+import os
+from datetime import datetime
+
+import pytest
+import requests
+
+from conftest import FIXTURES
+from scrapers.leetcode import LeetCodeScraper
+from utils.ingestion import upsert_contests, remove_missing_contests
+
+# The fixtures follow the response shape of LeetCode's contests GraphQL query
+NOW = datetime(2025, 3, 10, 12, 0)
+
+
+def load(name):
+    with open(os.path.join(FIXTURES, "leetcode", name)) as f:
+        return json.load(f)
+
+
+class FakeResponse:
+    def __init__(self, payload, status_code=200):
+        self.payload = payload
+        self.status_code = status_code
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.exceptions.HTTPError(f"{self.status_code} Server Error")
+
+    def json(self):
+        return self.payload
+
+
+def test_parse_contests_uses_slugs_and_keeps_the_last_week():
+    contests = LeetCodeScraper().parse_contests(load("contests.json"), now=NOW)
+
+    assert [c["contest_id"] for c in contests] == [
+        "weekly-contest-440",
+        "warm-up-contest",
+        "biweekly-contest-152",
+        "weekly-contest-441",
+    ]
+    by_id = {c["contest_id"]: c for c in contests}
+    assert by_id["weekly-contest-440"]["status"] == "past"
+    assert by_id["warm-up-contest"]["status"] == "ongoing"
+    assert by_id["weekly-contest-441"]["status"] == "upcoming"
+    assert by_id["weekly-contest-441"]["start_time"] == datetime(2025, 3, 16, 2, 30)
+    assert by_id["weekly-contest-441"]["duration"] == 90
+    assert by_id["weekly-contest-441"]["url"] == "https://leetcode.com/contest/weekly-contest-441"
+    assert by_id["biweekly-contest-152"]["description"] == "LeetCode Biweekly Contest"
+    assert by_id["warm-up-contest"]["description"] == ""
+
+
+def test_parse_contests_merges_top_two_contests():
+    payload = load("contests.json")
+    # biweekly-contest-152 is only listed in topTwoContests
+    assert "biweekly-contest-152" not in {c["titleSlug"] for c in payload["data"]["allContests"]}
+
+    contests = LeetCodeScraper().parse_contests(payload, now=NOW)
+
+    assert sum(c["contest_id"] == "weekly-contest-441" for c in contests) == 1
+    assert any(c["contest_id"] == "biweekly-contest-152" for c in contests)
+
+
+def test_parse_contests_does_not_depend_on_feed_order():
+    payload = load("contests.json")
+    shuffled = load("contests.json")
+    shuffled["data"]["allContests"].reverse()
+    shuffled["data"]["topTwoContests"].reverse()
+
+    scraper = LeetCodeScraper()
+    assert scraper.parse_contests(payload, now=NOW) == scraper.parse_contests(shuffled, now=NOW)
+
+
+@pytest.mark.parametrize("fixture", ["contests_errors.json", "contests_empty.json"])
+def test_parse_contests_rejects_payloads_without_contests(fixture):
+    with pytest.raises(ValueError):
+        LeetCodeScraper().parse_contests(load(fixture), now=NOW)
+
+
+def test_fetch_contests_posts_the_contests_query(monkeypatch):
+    calls = []
+
+    def post(url, json=None, **kwargs):
+        calls.append((url, json))
+        return FakeResponse(load("contests.json"))
+
+    monkeypatch.setattr(requests, "post", post)
+    scraper = LeetCodeScraper()
+    parse_contests = scraper.parse_contests
+    monkeypatch.setattr(scraper, "parse_contests", lambda payload: parse_contests(payload, now=NOW))
+    contests = scraper.fetch_contests()
+
+    assert calls[0][0] == "https://leetcode.com/graphql"
+    assert calls[0][1]["operationName"] == "contests"
+    assert {c["contest_id"] for c in contests} >= {"weekly-contest-441", "biweekly-contest-152"}
+
+
+def test_fetch_contests_raises_on_http_errors(monkeypatch):
+    monkeypatch.setattr(requests, "post", lambda *args, **kwargs: FakeResponse({}, status_code=503))
+    with pytest.raises(requests.exceptions.HTTPError):
+        LeetCodeScraper().fetch_contests()
+
+
+@pytest.mark.parametrize("response", [
+    FakeResponse({}, status_code=503),
+    FakeResponse(load("contests_errors.json")),
+])
+def test_get_contests_returns_nothing_on_errors(monkeypatch, response):
+    monkeypatch.setattr(requests, "post", lambda *args, **kwargs: response)
+    assert LeetCodeScraper().get_contests() == []
+
+
+def test_get_contests_returns_nothing_when_unreachable(monkeypatch):
+    def post(*args, **kwargs):
+        raise requests.exceptions.ConnectionError("Name or service not known")
+
+    monkeypatch.setattr(requests, "post", post)
+    assert LeetCodeScraper().get_contests() == []
+
+
+def test_ingesting_the_same_feed_again_writes_nothing(db):
+    scraper = LeetCodeScraper()
+    contests = scraper.parse_contests(load("contests.json"), now=NOW)
+
+    assert len(upsert_contests(db, contests)) == len(contests)
+    db.commit()
+    assert upsert_contests(db, scraper.parse_contests(load("contests.json"), now=NOW)) == []
+
+
+def test_ingestion_only_rewrites_changed_contests(db):
+    scraper = LeetCodeScraper()
+    upsert_contests(db, scraper.parse_contests(load("contests.json"), now=NOW))
+    db.commit()
+
+    payload = load("contests.json")
+    for contest in payload["data"]["topTwoContests"] + payload["data"]["allContests"]:
+        if contest["titleSlug"] == "weekly-contest-441":
+            contest["duration"] = 7200
+    events = upsert_contests(db, scraper.parse_contests(payload, now=NOW))
+
+    assert [(e["contest"].contest_id, e["changed"]) for e in events] == [
+        ("weekly-contest-441", ["end_time", "duration"])
+    ]
+
+
+def test_upcoming_contests_missing_from_the_feed_are_removed(db):
+    scraper = LeetCodeScraper()
+    contests = scraper.parse_contests(load("contests.json"), now=NOW)
+    phantom = dict(contests[-1], contest_id="weekly-contest-445", name="Weekly Contest 445")
+    upsert_contests(db, contests + [phantom])
+    db.commit()
+
+    removed = remove_missing_contests(db, "leetcode", [c["contest_id"] for c in contests], now=NOW)
+    db.commit()
+
+    assert len(removed) == 1
+    assert len(upsert_contests(db, contests)) == 0
@@ -0,0 +1,51 @@
+# tests/test_read_routing.py
+import time
+
+import pytest
+from fastapi import Response
+from starlette.requests import Request
+
+from models import database
+from models.database import READ_PRIMARY_HEADER
+
+
+def _request(**headers):
+    return Request({
+        "type": "http",
+        "headers": [(name.lower().encode(), value.encode()) for name, value in headers.items()],
+    })
+
+
+@pytest.fixture(autouse=True)
+def replica(monkeypatch):
+    monkeypatch.setattr(database, "READ_DATABASE_URL", "postgresql://replica")
+    monkeypatch.setattr(database, "_sticky_users", {})
+
+
+def test_deadline_header_routes_any_worker_to_the_primary(monkeypatch):
+    response = Response()
+    database.mark_primary_sticky(response, "user-1")
+    deadline = response.headers[READ_PRIMARY_HEADER]
+
+    # Another worker has not seen the write
+    monkeypatch.setattr(database, "_sticky_users", {})
+    assert database._is_sticky(_request(**{"user-id": "user-1", READ_PRIMARY_HEADER: deadline}))
+    assert not database._is_sticky(_request(**{"user-id": "user-1"}))
+
+
+def test_expired_or_invalid_deadlines_use_the_replica():
+    assert not database._is_sticky(_request(**{READ_PRIMARY_HEADER: f"{time.time() - 1:.3f}"}))
+    assert not database._is_sticky(_request(**{READ_PRIMARY_HEADER: "soon"}))
+
+
+def test_writing_worker_routes_without_the_header():
+    database.mark_primary_sticky(Response(), "user-1")
+
+    assert database._is_sticky(_request(**{"user-id": "user-1"}))
+    assert not database._is_sticky(_request(**{"user-id": "user-2"}))
+
+
+def test_deadlines_beyond_one_window_are_ignored():
+    far = time.time() + database.READ_AFTER_WRITE_SECONDS + 60
+    assert not database._is_sticky(_request(**{READ_PRIMARY_HEADER: f"{far:.3f}"}))
+    assert not database._is_sticky(_request(**{READ_PRIMARY_HEADER: "inf"}))
@@ -0,0 +1,42 @@
+# tests/test_recommendations.py
+import random
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from utils.recommendation_benchmark import build
+from utils.recommendations import ContestRecommender
+
+NOW = datetime(2024, 1, 1, 12, 0)
+
+
+def test_scores_match_dense_product():
+    random.seed(7)
+    recommender = build(2000, 0.5, NOW)
+    contest_ids = list(recommender._rows)
+    bookmarks = [random.sample(contest_ids, 5) for _ in range(20)]
+
+    results = recommender.recommend(bookmarks, limit=10, now=NOW)
+
+    now_seconds = (NOW - datetime(1970, 1, 1)).total_seconds()
+    n = recommender._size
+    candidates = np.flatnonzero(recommender._valid[:n] & (recommender._start[:n] > now_seconds))
+    for user_bookmarks, result in zip(bookmarks, results):
+        rows = [recommender._rows[contest_id] for contest_id in user_bookmarks]
+        profile = recommender._matrix[rows].mean(axis=0)
+        dense = recommender._matrix[candidates] @ profile
+        dense[np.isin(candidates, rows)] = -np.inf
+        expected = np.sort(dense)[::-1][:10]
+        assert np.allclose([score for _, score in result], expected, atol=1e-5)
+        assert not set(user_bookmarks) & {contest_id for contest_id, _ in result}
+
+
+def test_users_without_bookmarks_get_soonest_contests():
+    recommender = ContestRecommender(initial_capacity=4)
+    for i in range(6):
+        recommender.upsert(f"c{i}", "codeforces", f"Round {i}", NOW + timedelta(hours=6 - i), 120)
+    recommender.upsert("past", "codeforces", "Round past", NOW - timedelta(hours=1), 120)
+
+    [result] = recommender.recommend([["unknown"]], limit=3, now=NOW)
+
+    assert result == [("c5", 0.0), ("c4", 0.0), ("c3", 0.0)]
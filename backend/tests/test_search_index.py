@@ -0,0 +1,32 @@
+# tests/test_search_index.py
+import pytest
+
+from utils.search_index import ContestSearchIndex, QueryTooLongError, MAX_QUERY_TOKENS
+
+
+def test_removed_slots_are_reused():
+    index = ContestSearchIndex()
+    for i in range(100):
+        index.upsert(f"c{i}", f"Codeforces Round {i}", "codeforces")
+    previous = "c"
+    for cycle in range(5):
+        for i in range(100):
+            index.remove(f"{previous}{i}")
+            index.upsert(f"a{cycle}-{i}", f"Codeforces Round {i}", "codeforces")
+        previous = f"a{cycle}-"
+
+    assert index._next_slot == 100
+    assert index._postings["codeforces"].bit_length() == 100
+    assert [doc_id for doc_id, _ in index.search("round 42")] == ["a4-42"]
+
+
+def test_queries_over_the_token_limit_are_rejected_not_truncated():
+    index = ContestSearchIndex()
+    index.upsert("c1", "Educational Codeforces Round 1", "codeforces")
+    words = " ".join(f"w{i}" for i in range(MAX_QUERY_TOKENS))
+
+    assert index.search(words) == []
+    with pytest.raises(QueryTooLongError):
+        index.search(words + " extra")
+    # Repeated words count once
+    assert index.search("round " * 20)[0][0] == "c1"
@@ -0,0 +1,52 @@
+# tests/test_solution_import.py
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from models.contests import Contest
+from models.database import get_db
+from routers import contests
+from utils.solution_import import MAX_IMPORT_LINE_LENGTH
+
+START = datetime(2025, 3, 10, 14, 35)
+
+
+@pytest.fixture
+def client(db):
+    app = FastAPI()
+    app.include_router(contests.router)
+    app.dependency_overrides[get_db] = lambda: db
+    return TestClient(app)
+
+
+def _post(client, chunks):
+    return client.post(
+        "/contests/solutions/import",
+        content=iter(chunks),
+        headers={"content-type": "application/x-ndjson"}
+    )
+
+
+def test_rows_split_across_chunks_are_imported(client, db):
+    db.add(Contest(
+        platform="codeforces", contest_id="2077", name="Round 1008", url="https://codeforces.com/contest/2077",
+        start_time=START, end_time=START + timedelta(hours=2), duration=120, status="past"
+    ))
+    db.commit()
+    line = json.dumps({"platform": "codeforces", "contest_id": "2077", "solution_url": "https://youtu.be/abc"})
+    body = (line + "\n" + json.dumps({"name": "Unknown", "solution_url": "https://youtu.be/x"})).encode()
+
+    response = _post(client, [body[i:i + 7] for i in range(0, len(body), 7)])
+
+    assert response.status_code == 200
+    assert db.query(Contest.solution_url).scalar() == "https://youtu.be/abc"
+
+
+def test_overlong_line_is_rejected(client):
+    response = _post(client, [b"x" * 1024] * 100)
+
+    assert response.status_code == 413
+    assert str(MAX_IMPORT_LINE_LENGTH) in response.json()["detail"]
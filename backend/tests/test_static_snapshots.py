@@ -0,0 +1,59 @@
+# tests/test_static_snapshots.py
+import gzip
+import json
+import os
+import threading
+from datetime import datetime, timedelta
+
+from models.contests import Contest
+from models.database import SessionLocal
+from models.users import User
+from utils import static_snapshots
+from utils.contest_snapshot import contest_snapshots
+from utils.static_snapshots import StaticSnapshotWriter
+
+START = datetime(2030, 3, 10, 14, 35)
+
+
+def test_render_writes_every_variant_with_encodings(db, tmp_path, monkeypatch):
+    monkeypatch.setattr(contest_snapshots, "_snapshot", None)
+    db.add(Contest(
+        platform="codeforces", contest_id="1", name="Round 1", url="https://codeforces.com/contest/1",
+        start_time=START, end_time=START + timedelta(hours=2), duration=120, status="upcoming"
+    ))
+    db.commit()
+    writer = StaticSnapshotWriter(str(tmp_path))
+
+    writer.refresh()
+
+    manifest = json.loads((tmp_path / "manifest.json").read_bytes())
+    assert set(manifest["files"]) == set(static_snapshots.variants())
+    body = (tmp_path / "platform-codeforces.json").read_bytes()
+    assert gzip.decompress((tmp_path / "platform-codeforces.json.gz").read_bytes()) == body
+    assert os.path.exists(tmp_path / manifest["files"]["all"])
+
+
+def test_writes_are_not_blocked_while_files_are_compressed(db, tmp_path, monkeypatch):
+    monkeypatch.setattr(contest_snapshots, "_snapshot", None)
+    encode = static_snapshots._encode
+    finished = []
+
+    def write_during_compression(body, levels):
+        def write():
+            session = SessionLocal()
+            try:
+                session.add(User(clerk_id=f"user-{len(finished)}", email="user@example.com"))
+                session.commit()
+                finished.append(True)
+            finally:
+                session.close()
+
+        thread = threading.Thread(target=write, daemon=True)
+        thread.start()
+        thread.join(timeout=5)
+        return encode(body, levels)
+
+    monkeypatch.setattr(static_snapshots, "_encode", write_during_compression)
+    StaticSnapshotWriter(str(tmp_path)).refresh()
+
+    assert len(finished) == len(static_snapshots.variants())
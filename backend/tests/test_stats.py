@@ -0,0 +1,56 @@
+# tests/test_stats.py
+from collections import OrderedDict
+from datetime import datetime
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from models.contest_stats import PlatformWeekStat
+from models.contests import Contest
+from models.database import get_read_db
+from routers import stats
+from utils import admin
+from utils.rate_limit import limiter_store
+from utils.stats import check_stats, week_start
+
+START = datetime(2025, 3, 12, 14, 35)
+
+
+@pytest.fixture
+def client(db, monkeypatch):
+    monkeypatch.setattr(admin, "ADMIN_TOKEN", "secret")
+    monkeypatch.setattr(limiter_store, "_buckets", OrderedDict())
+    app = FastAPI()
+    app.include_router(stats.router)
+    app.dependency_overrides[get_read_db] = lambda: db
+    return TestClient(app)
+
+
+def test_check_requires_the_admin_token(client):
+    assert client.get("/stats/check").status_code == 403
+    assert client.get("/stats/check", headers={"X-Admin-Token": "wrong"}).status_code == 403
+
+
+def test_check_is_rate_limited(client):
+    headers = {"X-Admin-Token": "secret"}
+    assert client.get("/stats/check", headers=headers).json()["consistent"] is True
+    assert client.get("/stats/check", headers=headers).status_code == 200
+    assert client.get("/stats/check", headers=headers).status_code == 429
+
+
+def test_repair_replaces_drifted_aggregates(db):
+    db.add(Contest(
+        platform="codeforces", contest_id="1", name="Round 1", url="https://codeforces.com/contest/1",
+        start_time=START, end_time=START, duration=120, status="past"
+    ))
+    db.add(PlatformWeekStat(platform="codeforces", week_start=week_start(START), contest_count=5, total_duration=600))
+    db.commit()
+
+    report = check_stats(db, repair=True)
+
+    assert report["repaired"] is True
+    assert report["platform_week_stats"]["mismatched"] == 1
+    row = db.query(PlatformWeekStat).one()
+    assert (row.contest_count, row.total_duration) == (1, 120)
+    assert check_stats(db)["consistent"] is True
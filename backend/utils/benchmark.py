@@ -0,0 +1,147 @@
+# utils/benchmark.py
+import argparse
+import random
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List
+
+from sqlalchemy.exc import OperationalError
+
+from models.database import Base, engine, SessionLocal, ReadSessionLocal
+from models.contests import Contest
+from models.bookmarks import Bookmark
+from utils.ingestion import ingest_contests
+from utils.stats import apply_bookmark_delta
+
+PLATFORM = "benchmark"
+
+
+def _contests(count: int, now: datetime) -> List[Dict[str, Any]]:
+    contests = []
+    for i in range(count):
+        start_time = now + timedelta(hours=random.randint(-2000, 2000))
+        contests.append({
+            "platform": PLATFORM,
+            "contest_id": str(i),
+            "name": f"Benchmark Round {i}",
+            "url": f"https://example.com/contest/{i}",
+            "start_time": start_time,
+            "end_time": start_time + timedelta(minutes=120),
+            "duration": 120,
+            "status": "upcoming" if start_time > now else "past",
+            "description": "",
+        })
+    return contests
+
+
+def _timed(label: str, fn: Callable[[], Any], results: Dict[str, float]) -> None:
+    started = time.perf_counter()
+    fn()
+    results[label] = time.perf_counter() - started
+    print(f"{label:<32} {results[label]:8.3f}s")
+
+
+def _ingest(contests: List[Dict[str, Any]], batch_size: int) -> None:
+    db = SessionLocal()
+    try:
+        for i in range(0, len(contests), batch_size):
+            ingest_contests(db, contests[i:i + batch_size], refresh_status=False)
+    finally:
+        db.close()
+
+
+def _mixed_load(contest_ids: List[str], writers: int, readers: int, seconds: float) -> Dict[str, int]:
+    """Bookmark writers and contest list readers running side by side"""
+    counts = {"writes": 0, "reads": 0, "locked": 0}
+    lock = threading.Lock()
+    deadline = time.monotonic() + seconds
+
+    def write() -> None:
+        db = SessionLocal()
+        try:
+            while time.monotonic() < deadline:
+                contest_id = random.choice(contest_ids)
+                try:
+                    db.add(Bookmark(contest_id=contest_id, user_id=f"benchmark-{uuid.uuid4().hex}"))
+                    apply_bookmark_delta(db, contest_id, 1)
+                    db.commit()
+                    key = "writes"
+                except OperationalError:
+                    db.rollback()
+                    key = "locked"
+                with lock:
+                    counts[key] += 1
+        finally:
+            db.close()
+
+    def read() -> None:
+        db = ReadSessionLocal()
+        try:
+            while time.monotonic() < deadline:
+                db.query(Contest).filter(
+                    Contest.platform == PLATFORM, Contest.status == "upcoming"
+                ).order_by(Contest.start_time).limit(100).all()
+                db.rollback()
+                with lock:
+                    counts["reads"] += 1
+        finally:
+            db.close()
+
+    threads = [threading.Thread(target=write) for _ in range(writers)]
+    threads += [threading.Thread(target=read) for _ in range(readers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return counts
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Run the ingestion and bookmark workload against DATABASE_URL. "
+                    "Use an empty, throwaway database: the benchmark writes rows and does not clean up."
+    )
+    parser.add_argument("--contests", type=int, default=5000)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    args = parser.parse_args(argv)
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        if db.query(Contest.id).filter(Contest.platform == PLATFORM).first():
+            parser.error("Benchmark rows already exist; point DATABASE_URL at an empty database")
+    finally:
+        db.close()
+
+    print(f"Database: {engine.url.render_as_string(hide_password=True)}")
+    random.seed(42)
+    now = datetime.utcnow()
+    contests = _contests(args.contests, now)
+    results: Dict[str, float] = {}
+
+    _timed("ingest new contests", lambda: _ingest(contests, args.batch_size), results)
+    _timed("re-ingest unchanged", lambda: _ingest(contests, args.batch_size), results)
+    for contest in random.sample(contests, len(contests) // 10):
+        contest["start_time"] += timedelta(days=7)
+        contest["end_time"] += timedelta(days=7)
+    _timed("re-ingest 10% moved", lambda: _ingest(contests, args.batch_size), results)
+
+    db = SessionLocal()
+    try:
+        contest_ids = [row[0] for row in db.query(Contest.id).filter(Contest.platform == PLATFORM)]
+    finally:
+        db.close()
+    counts = _mixed_load(contest_ids, args.writers, args.readers, args.seconds)
+    print(
+        f"{'mixed load':<32} {counts['writes'] / args.seconds:8.1f} bookmark writes/s, "
+        f"{counts['reads'] / args.seconds:8.1f} reads/s, {counts['locked']} lock errors"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+# utils/calendar_feed.py
+import hashlib
+import logging
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from models.database import SessionLocal
+from models.contests import Contest
+from models.bookmarks import Bookmark
+from models.calendar_feeds import CalendarFeed
+
+logger = logging.getLogger(__name__)
+
+PRODID = "-//botarmy//Coding Contests//EN"
+
+
+def _escape(value: str) -> str:
+    """Escape a TEXT value as required by RFC 5545"""
+    return (
+        value.replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\r\n", "\\n")
+        .replace("\n", "\\n")
+    )
+
+
+def _fold(line: str) -> str:
+    """Fold a content line into chunks of at most 75 octets"""
+    encoded = line.encode("utf-8")
+    if len(encoded) <= 75:
+        return line
+    parts = []
+    while encoded:
+        limit = 75 if not parts else 74
+        chunk = encoded[:limit]
+        # Do not split a multi-byte character
+        while True:
+            try:
+                text = chunk.decode("utf-8")
+                break
+            except UnicodeDecodeError:
+                chunk = chunk[:-1]
+        parts.append(text)
+        encoded = encoded[len(chunk):]
+    return "\r\n ".join(parts)
+
+
+def _format_time(value: datetime) -> str:
+    return value.strftime("%Y%m%dT%H%M%SZ")
+
+
+def render_calendar(contests: Iterable[Contest], stamp: datetime) -> str:
+    """
+    Render contests as an iCalendar document
+
+    DTSTAMP comes from each contest's updated_at, so rendering the same data
+    twice produces the same body and therefore the same ETag.
+    """
+    lines = [
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        f"PRODID:{PRODID}",
+        "CALSCALE:GREGORIAN",
+        "METHOD:PUBLISH",
+        "X-WR-CALNAME:Bookmarked contests",
+    ]
+    for contest in contests:
+        description = contest.url
+        if contest.solution_url:
+            description += f"\nSolution: {contest.solution_url}"
+        lines.extend([
+            "BEGIN:VEVENT",
+            f"UID:{contest.id}@botarmy",
+            f"DTSTAMP:{_format_time(contest.updated_at or stamp)}",
+            f"DTSTART:{_format_time(contest.start_time)}",
+            f"DTEND:{_format_time(contest.end_time)}",
+            f"SUMMARY:{_escape(contest.name)}",
+            f"URL:{contest.url}",
+            f"DESCRIPTION:{_escape(description)}",
+            f"CATEGORIES:{_escape(contest.platform)}",
+            "END:VEVENT",
+        ])
+    lines.append("END:VCALENDAR")
+    return "\r\n".join(_fold(line) for line in lines) + "\r\n"
+
+
+def render_feed(db: Session, feed: CalendarFeed) -> Tuple[str, datetime, str]:
+    """
+    Regenerate the body of a feed and store it unless it went stale meanwhile
+
+    The body is only written if the feed's generation is still the one seen
+    before reading the bookmarks. A bookmark change committed in between
+    bumps the generation, and then the stored body stays null for the next
+    request to render instead of being overwritten with stale data.
+
+    Returns:
+        Tuple[str, datetime, str]: ETag, render time and body
+    """
+    seen = feed.generation
+    contests = db.query(Contest).join(
+        Bookmark, Contest.id == Bookmark.contest_id
+    ).filter(
+        Bookmark.user_id == feed.user_id
+    ).order_by(Contest.start_time.asc()).all()
+
+    now = datetime.utcnow().replace(microsecond=0)
+    body = render_calendar(contests, now)
+    etag = hashlib.sha256(body.encode("utf-8")).hexdigest()[:32]
+    rendered_at = feed.rendered_at if etag == feed.etag and feed.rendered_at is not None else now
+    stored = db.query(CalendarFeed).filter(
+        CalendarFeed.token == feed.token,
+        CalendarFeed.generation == seen
+    ).update({"body": body, "etag": etag, "rendered_at": rendered_at}, synchronize_session=False)
+    db.commit()
+    if not stored:
+        logger.info(f"Calendar feed of {feed.user_id} changed while rendering; not storing the body")
+    return etag, rendered_at, body
+
+
+def _invalidate(db: Session, user_ids) -> None:
+    # Feeds that are already invalid are bumped too, since a render of them
+    # may be in progress
+    db.query(CalendarFeed).filter(
+        CalendarFeed.user_id.in_(user_ids)
+    ).update(
+        {"body": None, "generation": CalendarFeed.generation + 1},
+        synchronize_session=False
+    )
+
+
+def invalidate_user_feeds(db: Session, user_ids: Iterable[str]) -> None:
+    """
+    Mark the feeds of the given users for regeneration
+
+    Does not commit, so callers can include it in their own transaction.
+    """
+    user_ids = list(set(user_ids))
+    if not user_ids:
+        return
+    _invalidate(db, user_ids)
+
+
+def on_contests_changed(events: List[Dict[str, Any]]) -> None:
+    """Ingestion listener invalidating feeds that include changed contests"""
+    # Status is not part of the rendered calendar
+    contest_ids = sorted({event["contest"]["id"] for event in events if event["type"] != "status"})
+    if not contest_ids:
+        return
+    db = SessionLocal()
+    try:
+        for i in range(0, len(contest_ids), 500):
+            user_ids = select(Bookmark.user_id).where(
+                Bookmark.contest_id.in_(contest_ids[i:i + 500])
+            )
+            _invalidate(db, user_ids)
+        db.commit()
+    finally:
+        db.close()
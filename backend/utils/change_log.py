@@ -0,0 +1,178 @@
+# utils/change_log.py
+import json
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import and_, exists, func, text
+from sqlalchemy.orm import Session, aliased
+
+from models.contests import Contest
+from models.contest_changes import ContestChange
+
+logger = logging.getLogger(__name__)
+
+# Changes older than this are dropped entirely
+RETENTION_DAYS = int(os.getenv("CHANGE_LOG_RETENTION_DAYS", "30"))
+# Changes older than this are compacted down to the latest one per contest
+COMPACT_AFTER_HOURS = int(os.getenv("CHANGE_LOG_COMPACT_AFTER_HOURS", "24"))
+
+# Arbitrary key for the Postgres advisory lock serializing change log writers
+_WRITER_LOCK_KEY = 724101
+
+# Maps ingestion event types to change log entry types
+_CHANGE_TYPES = {"status": "status", "solution": "solution"}
+
+
+class CursorExpiredError(Exception):
+    """Raised when a cursor points before the retained part of the change log"""
+
+
+def contest_record(contest: Contest) -> Dict[str, Any]:
+    """Full JSON-serializable representation of a contest row"""
+    record = {}
+    for column in Contest.__table__.columns:
+        value = getattr(contest, column.name)
+        if isinstance(value, datetime):
+            value = value.isoformat()
+        record[column.name] = value
+    return record
+
+
+def record_changes(db: Session, events: List[Dict[str, Any]]) -> None:
+    """
+    Append one change log entry per event to the current transaction
+
+    Must be called after the contest rows have been flushed, so that new
+    contests already have their ids.
+    """
+    if not events:
+        return
+
+    _lock_writers(db)
+    now = datetime.utcnow()
+    entries = []
+    for event in events:
+        contest = event["contest"]
+        change_type = _CHANGE_TYPES.get(event["type"])
+        if change_type is None:
+            change_type = "created" if event.get("created") else "updated"
+        entries.append(ContestChange(
+            contest_id=contest.id,
+            change_type=change_type,
+            payload=json.dumps(contest_record(contest)),
+            created_at=now
+        ))
+    db.add_all(entries)
+
+
+def record_removals(db: Session, contest_ids: List[str], change_type: str = "archived") -> None:
+    """Append entries for contests that left the contests table"""
+    if not contest_ids:
+        return
+
+    _lock_writers(db)
+    now = datetime.utcnow()
+    db.add_all([
+        ContestChange(contest_id=contest_id, change_type=change_type, payload=None, created_at=now)
+        for contest_id in contest_ids
+    ])
+
+
+def _lock_writers(db: Session) -> None:
+    # Serialize writers so cursors become visible in commit order; otherwise a
+    # reader could move past an id whose transaction has not committed yet
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": _WRITER_LOCK_KEY})
+
+
+def get_changes(db: Session, since: Optional[int] = None, limit: int = 500) -> Dict[str, Any]:
+    """
+    Return change log entries after the given cursor
+
+    Without a cursor only the current head is returned; clients load the full
+    contest list once and then apply deltas from that cursor.
+
+    Raises:
+        CursorExpiredError: If entries after the cursor have been truncated
+    """
+    if since is None:
+        head = db.query(func.max(ContestChange.id)).scalar()
+        return {"changes": [], "cursor": head or 0, "has_more": False}
+
+    marker = db.query(func.max(ContestChange.id)).filter(
+        ContestChange.change_type == "truncated"
+    ).scalar()
+    if marker is not None and since < marker:
+        raise CursorExpiredError(f"Cursor {since} is older than the retained change log ({marker})")
+
+    rows = db.query(ContestChange).filter(
+        ContestChange.id > since,
+        ContestChange.change_type != "truncated"
+    ).order_by(ContestChange.id.asc()).limit(limit + 1).all()
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if rows:
+        cursor = rows[-1].id
+    else:
+        # Nothing new; never hand out a cursor before the truncation marker
+        cursor = max(since, marker or 0)
+
+    return {
+        "changes": [
+            {
+                "cursor": row.id,
+                "type": row.change_type,
+                "contest_id": row.contest_id,
+                "contest": json.loads(row.payload) if row.payload else None,
+                "changed_at": row.created_at.isoformat(),
+            }
+            for row in rows
+        ],
+        "cursor": cursor,
+        "has_more": has_more,
+    }
+
+
+def compact_change_log(db: Session, now: Optional[datetime] = None) -> Dict[str, int]:
+    """
+    Compact and truncate the change log
+
+    Entries older than COMPACT_AFTER_HOURS are removed when a newer entry for
+    the same contest exists, which keeps the final state reachable from any
+    cursor. Entries older than RETENTION_DAYS are dropped and replaced by a
+    single "truncated" marker; cursors before the marker must resync.
+    """
+    now = now or datetime.utcnow()
+    compact_cutoff = now - timedelta(hours=COMPACT_AFTER_HOURS)
+    retention_cutoff = now - timedelta(days=RETENTION_DAYS)
+
+    newer = aliased(ContestChange)
+    compacted = db.query(ContestChange).filter(
+        ContestChange.created_at < compact_cutoff,
+        ContestChange.contest_id.isnot(None),
+        exists().where(and_(
+            newer.contest_id == ContestChange.contest_id,
+            newer.id > ContestChange.id
+        ))
+    ).delete(synchronize_session=False)
+
+    truncated = 0
+    horizon = db.query(func.max(ContestChange.id)).filter(
+        ContestChange.created_at < retention_cutoff
+    ).scalar()
+    if horizon is not None:
+        truncated = db.query(ContestChange).filter(
+            ContestChange.id < horizon
+        ).delete(synchronize_session=False)
+        db.query(ContestChange).filter(ContestChange.id == horizon).update({
+            "contest_id": None,
+            "change_type": "truncated",
+            "payload": None
+        }, synchronize_session=False)
+
+    db.commit()
+    logger.info(f"Change log compaction removed {compacted} superseded and {truncated} expired entries")
+    return {"compacted": compacted, "truncated": truncated}
@@ -0,0 +1,132 @@
+# utils/circuit_breaker.py
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling upstream while a circuit is open"""
+
+
+class CircuitBreaker:
+    """
+    Stop calling a failing upstream until it has had time to recover
+
+    After failure_threshold consecutive failures the circuit opens and calls
+    fail immediately with CircuitOpenError. Once reset_timeout seconds have
+    passed a single probe call is let through (half-open): success closes the
+    circuit, failure opens it again for another reset_timeout.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 3, reset_timeout: float = 600.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.last_failure_at: Optional[datetime] = None
+        self.last_success_at: Optional[datetime] = None
+
+    def _before_call(self) -> None:
+        with self._lock:
+            if self.state == OPEN:
+                if time.monotonic() - self.opened_at < self.reset_timeout:
+                    raise CircuitOpenError(f"{self.name} circuit is open")
+                self.state = HALF_OPEN
+                logger.info(f"{self.name} circuit half-open, probing upstream")
+            elif self.state == HALF_OPEN:
+                # Only one probe at a time
+                raise CircuitOpenError(f"{self.name} circuit is half-open and a probe is in flight")
+
+    def _on_success(self) -> None:
+        with self._lock:
+            if self.state != CLOSED:
+                logger.info(f"{self.name} circuit closed")
+            self.state = CLOSED
+            self.failures = 0
+            self.opened_at = None
+            self.last_success_at = datetime.utcnow()
+
+    def _on_failure(self, error: Exception) -> None:
+        with self._lock:
+            self.failures += 1
+            self.last_error = str(error)
+            self.last_failure_at = datetime.utcnow()
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != OPEN:
+                    logger.warning(f"{self.name} circuit opened after {self.failures} failures: {error}")
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+
+    def call(self, fn: Callable[[], Any], ignore: Tuple[type, ...] = ()) -> Any:
+        """
+        Call fn through the breaker, re-raising its errors
+
+        Exceptions listed in ignore are re-raised but do not count as upstream
+        failures, e.g. an API rejecting one specific request.
+        """
+        self._before_call()
+        try:
+            result = fn()
+        except ignore:
+            self._on_success()
+            raise
+        except Exception as e:
+            self._on_failure(e)
+            raise
+        self._on_success()
+        return result
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            retry_in = None
+            if self.state == OPEN:
+                retry_in = max(self.reset_timeout - (time.monotonic() - self.opened_at), 0)
+            return {
+                "state": self.state,
+                "failures": self.failures,
+                "retry_in_seconds": retry_in,
+                "last_error": self.last_error,
+                "last_failure_at": self.last_failure_at.isoformat() if self.last_failure_at else None,
+                "last_success_at": self.last_success_at.isoformat() if self.last_success_at else None,
+                # Stored data for the platform was not refreshed by the latest attempt
+                "stale": self.last_failure_at is not None and (
+                    self.last_success_at is None or self.last_failure_at > self.last_success_at
+                ),
+            }
+
+
+breakers: Dict[str, CircuitBreaker] = {
+    "codeforces": CircuitBreaker("codeforces"),
+    "leetcode": CircuitBreaker("leetcode"),
+    "codechef": CircuitBreaker("codechef"),
+}
+
+
+def fetch_platform(platform: str, fetch: Callable[[], List[Dict[str, Any]]]) -> Optional[List[Dict[str, Any]]]:
+    """
+    Fetch a platform's contests through its circuit breaker
+
+    Returns:
+        Optional[List[Dict[str, Any]]]: The contests, or None when the call
+        failed or was skipped; callers then keep the platform's
+        last-known-good rows in the database untouched
+    """
+    try:
+        return breakers[platform].call(fetch)
+    except CircuitOpenError as e:
+        logger.warning(f"Skipping {platform} scrape: {e}")
+    except Exception as e:
+        logger.error(f"Failed to scrape {platform} contests: {e}")
+    return None
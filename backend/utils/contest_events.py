@@ -0,0 +1,238 @@
+# utils/contest_events.py
+import asyncio
+import heapq
+import json
+import logging
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 2024-01-01T00:00:00Z; event ids count from here to stay JavaScript-safe
+ID_EPOCH = 1704067200
+
+
+class ContestEventBroadcaster:
+    """
+    Fan out contest change events to Server-Sent Events subscribers
+
+    Events are kept in a bounded ring buffer with monotonically increasing ids.
+    Ids start from a per-process epoch (the start time in milliseconds since
+    ID_EPOCH times a thousand), so an id handed out before a restart is
+    recognized as unknown and answered with a reset instead of being resumed
+    from silently, unless the previous process published more than a
+    thousand events per millisecond of its lifetime. Ids stay below 2**53
+    until about 2300, so JavaScript clients can hold them as numbers.
+    Subscribers do not own a queue; they all wait on a single asyncio.Event that
+    is swapped on every publish and read new events from the shared buffer, so
+    publishing costs the same no matter how many connections are idle.
+    """
+
+    def __init__(self, buffer_size: int = 1000, heartbeat_seconds: float = 15.0):
+        self.heartbeat_seconds = heartbeat_seconds
+        self._buffer: deque = deque(maxlen=buffer_size)
+        self._last_id = int((time.time() - ID_EPOCH) * 1000) * 1000
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self.subscribers = 0
+
+    def bind(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Attach the broadcaster to the event loop serving the subscribers"""
+        self._loop = loop
+        self._wakeup = asyncio.Event()
+
+    def publish(self, event_type: str, data: Dict[str, Any]) -> int:
+        """
+        Append an event to the buffer and wake all subscribers
+
+        Safe to call from any thread, e.g. the background scheduler.
+        """
+        with self._lock:
+            self._last_id += 1
+            event_id = self._last_id
+            self._buffer.append((event_id, event_type, json.dumps(data, separators=(",", ":"))))
+
+        loop = self._loop
+        if loop is not None and not loop.is_closed():
+            try:
+                running = asyncio.get_running_loop()
+            except RuntimeError:
+                running = None
+            if running is loop:
+                self._wake()
+            else:
+                loop.call_soon_threadsafe(self._wake)
+        return event_id
+
+    def _wake(self) -> None:
+        wakeup, self._wakeup = self._wakeup, asyncio.Event()
+        if wakeup is not None:
+            wakeup.set()
+
+    def _events_after(self, last_id: int) -> Tuple[List[Tuple[int, str, str]], Optional[int]]:
+        """
+        Return buffered events newer than last_id, and the id to send a reset
+        with when events were missed or last_id is unknown to this process
+        """
+        with self._lock:
+            if last_id == self._last_id:
+                return [], None
+            oldest = self._buffer[0][0] if self._buffer else self._last_id + 1
+            if last_id > self._last_id or last_id < oldest - 1:
+                # Evicted, or issued by an earlier process
+                return list(self._buffer), oldest - 1
+            start = last_id + 1 - oldest
+            return [self._buffer[i] for i in range(start, len(self._buffer))], None
+
+    @staticmethod
+    def _format(event_id: int, event_type: str, data: str) -> str:
+        return f"id: {event_id}\nevent: {event_type}\ndata: {data}\n\n"
+
+    async def subscribe(self, last_event_id: Optional[int] = None) -> AsyncIterator[str]:
+        """
+        Yield SSE frames, resuming after last_event_id when given
+
+        If the requested id has already been evicted from the buffer, or was
+        issued before a restart, a "reset" event is sent first so the client
+        knows to refetch the full list.
+        """
+        if self._loop is None:
+            self.bind(asyncio.get_running_loop())
+
+        last_id = self._last_id if last_event_id is None else last_event_id
+        self.subscribers += 1
+        try:
+            yield f"retry: {int(self.heartbeat_seconds * 1000)}\n\n"
+            while True:
+                wakeup = self._wakeup
+                events, reset_id = self._events_after(last_id)
+                if reset_id is not None:
+                    yield self._format(reset_id, "reset", "{}")
+                    last_id = reset_id
+                for event_id, event_type, data in events:
+                    yield self._format(event_id, event_type, data)
+                    last_id = event_id
+                if events:
+                    continue
+                try:
+                    await asyncio.wait_for(wakeup.wait(), timeout=self.heartbeat_seconds)
+                except asyncio.TimeoutError:
+                    yield ": heartbeat\n\n"
+        finally:
+            self.subscribers -= 1
+
+    def on_contests_changed(self, events: List[Dict[str, Any]]) -> None:
+        """Ingestion listener publishing committed changes"""
+        for event in events:
+            data = dict(event["contest"])
+            if event["type"] == "status":
+                data["previous"] = event.get("previous")
+            elif event["type"] == "ingest":
+                data["created"] = event.get("created", False)
+            self.publish(event["type"], data)
+
+
+class StatusTransitionScheduler:
+    """
+    Publish status transitions at each contest's start_time and end_time
+
+    Stored statuses are only recomputed when ingestion runs, so this keeps a
+    heap of upcoming transition times and emits "status" events as they pass.
+    Only contests with a transition ahead are kept; summaries are dropped once
+    a contest is past or removed.
+    """
+
+    def __init__(self, broadcaster: ContestEventBroadcaster):
+        self.broadcaster = broadcaster
+        self._contests: Dict[str, Dict[str, Any]] = {}
+        self._heap: List[Tuple[datetime, str, str]] = []
+        self._lock = threading.Lock()
+        self._changed: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def track(self, summary: Dict[str, Any]) -> None:
+        """Add or replace a contest summary and schedule its pending transitions"""
+        start_time = datetime.fromisoformat(summary["start_time"])
+        end_time = datetime.fromisoformat(summary["end_time"])
+        now = datetime.utcnow()
+        with self._lock:
+            if end_time <= now or summary["status"] == "past":
+                self._contests.pop(summary["id"], None)
+                return
+            self._contests[summary["id"]] = summary
+            if start_time > now:
+                heapq.heappush(self._heap, (start_time, summary["id"], "ongoing"))
+            heapq.heappush(self._heap, (end_time, summary["id"], "past"))
+        self._notify()
+
+    def untrack(self, contest_ids: List[str]) -> None:
+        """Forget contests that were removed; their heap entries are skipped when due"""
+        with self._lock:
+            for contest_id in contest_ids:
+                self._contests.pop(contest_id, None)
+
+    def _notify(self) -> None:
+        if self._loop is not None and self._changed is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._changed.set)
+
+    def on_contests_changed(self, events: List[Dict[str, Any]]) -> None:
+        """Ingestion listener keeping the transition heap current"""
+        for event in events:
+            self.track(event["contest"])
+
+    def _pop_due(self, now: datetime) -> Tuple[List[Tuple[str, Dict[str, Any]]], Optional[datetime]]:
+        due = []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now:
+                when, contest_id, status = heapq.heappop(self._heap)
+                summary = self._contests.get(contest_id)
+                # Skip entries made stale by a later reschedule
+                if summary is None:
+                    continue
+                key = "start_time" if status == "ongoing" else "end_time"
+                if datetime.fromisoformat(summary[key]) != when or summary["status"] == status:
+                    continue
+                previous = summary["status"]
+                summary = dict(summary, status=status)
+                self._contests[contest_id] = summary
+                if status == "past":
+                    self._contests.pop(contest_id, None)
+                due.append((previous, summary))
+            next_at = self._heap[0][0] if self._heap else None
+        return due, next_at
+
+    async def run(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._changed = asyncio.Event()
+        while True:
+            self._changed.clear()
+            due, next_at = self._pop_due(datetime.utcnow())
+            for previous, summary in due:
+                self.broadcaster.publish("status", dict(summary, previous=previous))
+            timeout = None
+            if next_at is not None:
+                timeout = max((next_at - datetime.utcnow()).total_seconds(), 0)
+            try:
+                await asyncio.wait_for(self._changed.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self, summaries: List[Dict[str, Any]]) -> None:
+        """Seed the heap with stored contests and start the timer task"""
+        for summary in summaries:
+            self.track(summary)
+        self._task = asyncio.get_running_loop().create_task(self.run())
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+
+broadcaster = ContestEventBroadcaster()
+transitions = StatusTransitionScheduler(broadcaster)
@@ -0,0 +1,199 @@
+# utils/contest_history.py
+import argparse
+import logging
+import os
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import insert, tuple_
+from sqlalchemy.orm import Session
+
+from models.contests import Contest, ArchivedContest
+from models.ingestion_checkpoints import IngestionCheckpoint
+from scrapers.codeforces import CodeForcesScraper
+from utils.ingestion import upsert_contests, commit_changes, platform_lock
+from utils.retention import RETENTION_DAYS
+from utils.stats import add_contest_stats
+
+logger = logging.getLogger(__name__)
+
+FULL_HISTORY_ENABLED = os.getenv("CODEFORCES_FULL_HISTORY", "").lower() in ("1", "true", "yes")
+HISTORY_BATCH_SIZE = int(os.getenv("CODEFORCES_HISTORY_BATCH_SIZE", "1000"))
+# Items before the checkpoint that are processed again on resume, in case the
+# feed shifted between runs; ingestion is idempotent so repeats are no-ops
+RESUME_OVERLAP = 100
+
+# Checkpoint name -> contest.list gym flag
+FEEDS = {
+    "codeforces-history": False,
+    "codeforces-gym-history": True,
+}
+
+
+def _key(contest: Dict[str, Any]) -> Tuple[str, str]:
+    return contest["platform"], contest["contest_id"]
+
+
+def archive_new_contests(db: Session, contests: List[Dict[str, Any]], now: datetime) -> int:
+    """
+    Insert finished contests straight into contests_archive
+
+    Contests already archived are skipped. Does not commit.
+
+    Returns:
+        int: Number of inserted rows
+    """
+    if not contests:
+        return 0
+    archived = set(db.query(ArchivedContest.platform, ArchivedContest.contest_id).filter(
+        tuple_(ArchivedContest.platform, ArchivedContest.contest_id).in_([_key(c) for c in contests])
+    ).all())
+    rows = [
+        dict(contest, id=str(uuid.uuid4()), created_at=now, updated_at=now, archived_at=now)
+        for contest in contests if _key(contest) not in archived
+    ]
+    if rows:
+        db.execute(insert(ArchivedContest), rows)
+        add_contest_stats(db, [(row["platform"], row["start_time"], row["duration"]) for row in rows])
+    return len(rows)
+
+
+def ingest_history_batch(
+    db: Session,
+    contests: List[Dict[str, Any]],
+    archive_all_past: bool,
+    now: Optional[datetime] = None
+) -> Dict[str, int]:
+    """
+    Store one batch of a full-history feed without committing
+
+    Past contests that would be archived right away (all of them with
+    archive_all_past) go straight to contests_archive, so the history does not
+    pass through the contests table and the snapshot served by GET /contests.
+    Everything else, and old contests that are still in the contests table,
+    goes through regular ingestion.
+
+    Returns:
+        Dict[str, Any]: Counts of archived contests and the ingestion events
+    """
+    now = now or datetime.utcnow()
+    cutoff = now - timedelta(days=RETENTION_DAYS)
+    # The feed may repeat a contest; keep the last occurrence
+    contests = list({_key(contest): contest for contest in contests}.values())
+
+    old = [c for c in contests if c["status"] == "past" and (archive_all_past or c["end_time"] < cutoff)]
+    live = set()
+    if old:
+        live = set(db.query(Contest.platform, Contest.contest_id).filter(
+            tuple_(Contest.platform, Contest.contest_id).in_([_key(c) for c in old])
+        ).all())
+    old_keys = {_key(c) for c in old}
+
+    archived = archive_new_contests(db, [c for c in old if _key(c) not in live], now)
+    events = upsert_contests(db, [c for c in contests if _key(c) not in old_keys or _key(c) in live])
+    return {"archived": archived, "events": events}
+
+
+def ingest_full_history(
+    db: Session,
+    name: str,
+    scraper: Optional[CodeForcesScraper] = None,
+    batch_size: int = HISTORY_BATCH_SIZE,
+    restart: bool = False
+) -> Dict[str, Any]:
+    """
+    Stream a Codeforces contest.list feed into the database in batches
+
+    Each batch is committed together with the checkpoint recording how far
+    into the feed the run got, so a crashed run resumes where it stopped.
+    A completed run starts over from the beginning the next time.
+
+    Returns:
+        Dict[str, Any]: Feed position reached and number of stored contests
+    """
+    scraper = scraper or CodeForcesScraper()
+    checkpoint = db.get(IngestionCheckpoint, name)
+    if checkpoint is None:
+        checkpoint = IngestionCheckpoint(name=name, position=0)
+        db.add(checkpoint)
+    elif restart or checkpoint.completed_at is not None:
+        checkpoint.position = 0
+        checkpoint.started_at = datetime.utcnow()
+        checkpoint.completed_at = None
+    db.commit()
+
+    skip = max(checkpoint.position - RESUME_OVERLAP, 0)
+    if skip:
+        logger.info(f"Resuming {name} after {checkpoint.position} feed items")
+
+    totals = {"archived": 0, "changes": 0}
+    batch: List[Dict[str, Any]] = []
+    committed = position = skip
+
+    def flush() -> None:
+        # Held per batch, so scrapes of codeforces interleave with the history
+        with platform_lock("codeforces"):
+            result = ingest_history_batch(db, batch, archive_all_past=FEEDS[name])
+            checkpoint.position = max(checkpoint.position, position)
+            # Commits the checkpoint in the same transaction as the batch
+            commit_changes(db, result["events"])
+        totals["archived"] += result["archived"]
+        totals["changes"] += len(result["events"])
+        batch.clear()
+
+    for index, contest in enumerate(scraper.stream_contests(gym=FEEDS[name])):
+        if index < skip:
+            continue
+        position = index + 1
+        if contest is not None:
+            batch.append(contest)
+        if position - committed >= batch_size:
+            flush()
+            committed = position
+            logger.info(f"{name}: {position} feed items processed")
+    flush()
+
+    checkpoint.completed_at = datetime.utcnow()
+    db.commit()
+    logger.info(
+        f"Finished {name} at {position} feed items: "
+        f"{totals['archived']} archived, {totals['changes']} ingestion changes"
+    )
+    return {"feed": name, "position": position, **totals}
+
+
+def run_full_history(restart: bool = False) -> List[Dict[str, Any]]:
+    """Ingest the regular and gym contest history, one feed after the other"""
+    from models.database import SessionLocal
+
+    results = []
+    db = SessionLocal()
+    try:
+        for name in FEEDS:
+            results.append(ingest_full_history(db, name, restart=restart))
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Ingest the full Codeforces contest and gym history, resuming an interrupted run"
+    )
+    parser.add_argument("--restart", action="store_true", help="Start from the beginning of the feeds")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    from models.database import Base, engine
+
+    Base.metadata.create_all(bind=engine)
+    for result in run_full_history(restart=args.restart):
+        print(result)
+
+
+if __name__ == "__main__":
+    main()
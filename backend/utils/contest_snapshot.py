@@ -0,0 +1,185 @@
+# utils/contest_snapshot.py
+import bisect
+import json
+import logging
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from models.database import SessionLocal
+from models.contests import Contest
+from models.contest_changes import ContestChange
+from utils.change_log import contest_record
+
+logger = logging.getLogger(__name__)
+
+# How often a worker asks the database whether another process wrote newer data
+STALENESS_CHECK_SECONDS = 5.0
+
+
+def _bit_positions(mask: int) -> List[int]:
+    """Return the set bit positions of mask in ascending order"""
+    bits = bin(mask)[:1:-1]
+    positions = []
+    i = bits.find("1")
+    while i != -1:
+        positions.append(i)
+        i = bits.find("1", i + 1)
+    return positions
+
+
+def _mask_of(positions: List[int], size: int) -> int:
+    """
+    Bitmask with the given positions set, built in one pass
+
+    ORing in one bit at a time copies the growing integer on every step,
+    which is quadratic in the number of positions.
+    """
+    bits = bytearray((size + 7) // 8)
+    for i in positions:
+        bits[i >> 3] |= 1 << (i & 7)
+    return int.from_bytes(bits, "little")
+
+
+class ContestSnapshot:
+    """
+    Immutable, query-ready copy of the contests table
+
+    Contests are stored in start_time order together with their pre-encoded
+    JSON. Platform and status filters are integer bitmaps over those positions,
+    and a separate end_time ordering answers the past_days cutoff with bisect,
+    so a GET /contests query is a few integer operations plus a join of
+    pre-encoded rows.
+    """
+
+    __slots__ = (
+        "version", "built_at", "_encoded", "_ends", "_end_times", "_end_order",
+        "_platforms", "_statuses", "_all"
+    )
+
+    def __init__(self, contests: List[Contest], version: int):
+        self.version = version
+        self.built_at = datetime.utcnow()
+
+        contests = sorted(contests, key=lambda contest: contest.start_time)
+        self._encoded = [
+            json.dumps(contest_record(contest), separators=(",", ":")).encode("utf-8")
+            for contest in contests
+        ]
+        self._ends = [contest.end_time for contest in contests]
+        self._end_order = sorted(range(len(contests)), key=self._ends.__getitem__)
+        self._end_times = [self._ends[i] for i in self._end_order]
+
+        platforms: Dict[str, List[int]] = defaultdict(list)
+        statuses: Dict[str, List[int]] = defaultdict(list)
+        for i, contest in enumerate(contests):
+            platforms[contest.platform].append(i)
+            statuses[contest.status].append(i)
+        size = len(contests)
+        self._platforms = {platform: _mask_of(positions, size) for platform, positions in platforms.items()}
+        self._statuses = {status: _mask_of(positions, size) for status, positions in statuses.items()}
+        self._all = (1 << len(contests)) - 1
+
+    def __len__(self) -> int:
+        return len(self._encoded)
+
+    def _ended_after(self, cutoff: datetime) -> int:
+        start = bisect.bisect_left(self._end_times, cutoff)
+        return _mask_of(self._end_order[start:], len(self._encoded))
+
+    def query(
+        self,
+        platforms: Optional[List[str]] = None,
+        status: Optional[str] = None,
+        past_days: Optional[int] = 7,
+        now: Optional[datetime] = None
+    ) -> bytes:
+        """
+        Answer a GET /contests query with a JSON array body
+
+        Filters and ordering mirror the SQL query the endpoint used to run.
+        """
+        mask = self._all
+        if platforms:
+            platform_mask = 0
+            for platform in platforms:
+                platform_mask |= self._platforms.get(platform, 0)
+            mask &= platform_mask
+
+        past = self._statuses.get("past", 0)
+        if status:
+            mask &= self._statuses.get(status, 0)
+            if status == "past":
+                now = now or datetime.utcnow()
+                mask &= self._ended_after(now - timedelta(days=past_days))
+
+        if status == "past":
+            # Most recently ended first
+            positions = sorted(_bit_positions(mask), key=self._ends.__getitem__, reverse=True)
+        else:
+            # Same order as ORDER BY status != 'past', start_time
+            positions = _bit_positions(mask & past) + _bit_positions(mask & ~past)
+
+        encoded = self._encoded
+        return b"[" + b",".join(encoded[i] for i in positions) + b"]"
+
+
+class SnapshotStore:
+    """
+    Holds the current snapshot and swaps in a new one after writes
+
+    The version is the contest change log head the snapshot was built from.
+    Writes made by this process rebuild it through the ingestion listener;
+    writes from other workers are noticed by comparing the version against the
+    change log at most every STALENESS_CHECK_SECONDS.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._snapshot: Optional[ContestSnapshot] = None
+        self._checked_at = 0.0
+
+    @property
+    def version(self) -> Optional[int]:
+        return self._snapshot.version if self._snapshot else None
+
+    def rebuild(self, db: Session) -> ContestSnapshot:
+        with self._lock:
+            version = db.query(func.max(ContestChange.id)).scalar() or 0
+            # A lagging replica may report an older head; never step back to it
+            if self._snapshot is not None and self._snapshot.version >= version:
+                return self._snapshot
+            snapshot = ContestSnapshot(db.query(Contest).all(), version)
+            # Readers holding the previous snapshot keep using it untouched
+            self._snapshot = snapshot
+            self._checked_at = time.monotonic()
+            logger.info(f"Built contest snapshot v{version} with {len(snapshot)} contests")
+            return snapshot
+
+    def get(self, db: Session) -> ContestSnapshot:
+        """Return the current snapshot, rebuilding it if another worker wrote newer data"""
+        snapshot = self._snapshot
+        if snapshot is None:
+            return self.rebuild(db)
+        if time.monotonic() - self._checked_at >= STALENESS_CHECK_SECONDS:
+            self._checked_at = time.monotonic()
+            head = db.query(func.max(ContestChange.id)).scalar() or 0
+            if head > snapshot.version:
+                return self.rebuild(db)
+        return snapshot
+
+    def on_contests_changed(self, events: List[Dict[str, Any]]) -> None:
+        """Ingestion listener rebuilding the snapshot after a commit"""
+        db = SessionLocal()
+        try:
+            self.rebuild(db)
+        finally:
+            db.close()
+
+
+contest_snapshots = SnapshotStore()
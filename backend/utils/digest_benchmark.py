@@ -0,0 +1,218 @@
+# utils/digest_benchmark.py
+import argparse
+import random
+import socketserver
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Optional
+
+from sqlalchemy import event, insert
+from sqlalchemy.orm import Session
+
+from models.database import Base, engine, SessionLocal
+from models.contests import Contest
+from models.bookmarks import Bookmark
+from models.users import User
+from models.digests import DigestSubscription
+from utils.digests import run_digests
+from utils.mailer import MailerPool
+
+PLATFORMS = ["codeforces", "codechef", "leetcode"]
+# Benchmark users and contests are recognizable by these prefixes
+USER_PREFIX = "digest-benchmark-"
+CONTEST_PREFIX = "digest-benchmark-"
+
+
+class _SinkHandler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        sink = self.server.sink
+        sink.count("connections")
+        self.wfile.write(b"220 sink ready\r\n")
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line[:4].upper()
+            if command == b"EHLO":
+                self.wfile.write(b"250-sink\r\n250 8BITMIME\r\n")
+            elif command == b"DATA":
+                self.wfile.write(b"354 end with <CRLF>.<CRLF>\r\n")
+                size = 0
+                while True:
+                    data = self.rfile.readline()
+                    if data in (b".\r\n", b""):
+                        break
+                    size += len(data)
+                sink.count("messages")
+                sink.count("bytes", size)
+                self.wfile.write(b"250 accepted\r\n")
+            elif command == b"QUIT":
+                self.wfile.write(b"221 bye\r\n")
+                return
+            else:
+                self.wfile.write(b"250 ok\r\n")
+
+
+class MailSink:
+    """
+    Minimal local SMTP server that accepts and discards every message
+
+    Only counts connections, messages and bytes, so delivery is measured
+    without a real mail server. Listens on an ephemeral port by default.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self._server = socketserver.ThreadingTCPServer((host, port), _SinkHandler, bind_and_activate=False)
+        self._server.daemon_threads = True
+        self._server.allow_reuse_address = True
+        self._server.sink = self
+        self._lock = threading.Lock()
+        self.counts: Dict[str, int] = {"connections": 0, "messages": 0, "bytes": 0}
+
+    @property
+    def port(self) -> int:
+        return self._server.server_address[1]
+
+    def count(self, key: str, amount: int = 1) -> None:
+        with self._lock:
+            self.counts[key] += amount
+
+    def __enter__(self) -> "MailSink":
+        self._server.server_bind()
+        self._server.server_activate()
+        threading.Thread(target=self._server.serve_forever, name="mail-sink", daemon=True).start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+
+@contextmanager
+def count_queries() -> Iterator[Dict[str, int]]:
+    """Count the statements executed on the primary engine inside the block"""
+    counts = {"queries": 0}
+
+    def before_cursor_execute(*args) -> None:
+        counts["queries"] += 1
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield counts
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def seed(
+    db: Session,
+    users: int,
+    contests: int,
+    now: datetime,
+    bookmarks_per_user: int = 3,
+    json_share: float = 0.2,
+    batch_size: int = 10000
+) -> None:
+    """
+    Insert upcoming contests and users subscribed to the digest
+
+    Users get a random subset of platforms (or all of them), a few bookmarks
+    and email delivery, except json_share of them who get JSON digests.
+    """
+    contest_rows = []
+    for i in range(contests):
+        start_time = now + timedelta(minutes=random.randint(60, 6 * 24 * 60))
+        contest_rows.append({
+            "id": str(uuid.uuid4()),
+            "platform": PLATFORMS[i % len(PLATFORMS)],
+            "contest_id": f"{CONTEST_PREFIX}{i}",
+            "name": f"Benchmark Round {i} (Div. {i % 3 + 1})",
+            "url": f"https://example.com/contest/{i}",
+            "start_time": start_time,
+            "end_time": start_time + timedelta(minutes=120),
+            "duration": 120,
+            "status": "upcoming",
+            "description": "",
+        })
+    db.execute(insert(Contest), contest_rows)
+    contest_ids = [row["id"] for row in contest_rows]
+
+    for offset in range(0, users, batch_size):
+        user_rows, subscription_rows, bookmark_rows = [], [], []
+        for i in range(offset, min(offset + batch_size, users)):
+            user_id = f"{USER_PREFIX}{i:08d}"
+            user_rows.append({
+                "id": str(uuid.uuid4()),
+                "clerk_id": user_id,
+                "email": f"user{i}@example.com",
+                "first_name": f"User{i}",
+            })
+            platforms = random.sample(PLATFORMS, random.randint(1, len(PLATFORMS)))
+            subscription_rows.append({
+                "user_id": user_id,
+                "enabled": True,
+                "platforms": None if len(platforms) == len(PLATFORMS) else ",".join(platforms),
+                "delivery": "json" if random.random() < json_share else "email",
+            })
+            for contest_id in random.sample(contest_ids, min(bookmarks_per_user, len(contest_ids))):
+                bookmark_rows.append({"id": str(uuid.uuid4()), "user_id": user_id, "contest_id": contest_id})
+        db.execute(insert(User), user_rows)
+        db.execute(insert(DigestSubscription), subscription_rows)
+        db.execute(insert(Bookmark), bookmark_rows)
+    db.commit()
+
+
+def run(db: Session, sink: MailSink, now: datetime, pool_size: int) -> Dict[str, float]:
+    """Deliver one digest run through the sink and measure it"""
+    mailer = MailerPool("127.0.0.1", sink.port, pool_size=pool_size, username=None, starttls=False)
+    started = time.perf_counter()
+    with count_queries() as queries, mailer:
+        totals = run_digests(db, mailer, now=now)
+    return {**totals, "queries": queries["queries"], "seconds": time.perf_counter() - started}
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Deliver digests for synthetic users to a local mail sink, then rerun the same day. "
+                    "Use an empty, throwaway DATABASE_URL: the benchmark writes rows and does not clean up."
+    )
+    parser.add_argument("--users", type=int, default=100000)
+    parser.add_argument("--contests", type=int, default=300)
+    parser.add_argument("--bookmarks-per-user", type=int, default=3)
+    parser.add_argument("--json-share", type=float, default=0.2)
+    parser.add_argument("--pool-size", type=int, default=4)
+    args = parser.parse_args(argv)
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        if db.query(User.id).filter(User.clerk_id.startswith(USER_PREFIX)).first():
+            parser.error("Benchmark rows already exist; point DATABASE_URL at an empty database")
+
+        print(f"Database: {engine.url.render_as_string(hide_password=True)}")
+        random.seed(42)
+        now = datetime.utcnow()
+        started = time.perf_counter()
+        seed(db, args.users, args.contests, now, args.bookmarks_per_user, args.json_share)
+        print(f"Seeded {args.users} users and {args.contests} contests in {time.perf_counter() - started:.1f}s")
+
+        with MailSink() as sink:
+            for label in ("first run", "same-day rerun"):
+                result = run(db, sink, now, args.pool_size)
+                print(
+                    f"{label:<16} {result['seconds']:8.1f}s {result['queries']:6d} queries  "
+                    f"emailed={result['emailed']} stored={result['stored']} "
+                    f"empty={result['empty']} failed={result['failed']}"
+                )
+            print(
+                f"Sink received {sink.counts['messages']} messages "
+                f"({sink.counts['bytes'] / 1e6:.1f} MB) over {sink.counts['connections']} connections"
+            )
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,347 @@
+# utils/digests.py
+import argparse
+import base64
+import html
+import json
+import logging
+import os
+import uuid
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from email.utils import format_datetime, make_msgid
+from string import Template
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy.orm import Session
+
+from models.contests import Contest
+from models.bookmarks import Bookmark
+from models.users import User
+from models.digests import DigestSubscription, UserDigest
+from utils.mailer import MAIL_FROM, MailerPool, create_mailer
+
+logger = logging.getLogger(__name__)
+
+DIGEST_WINDOW_DAYS = int(os.getenv("DIGEST_WINDOW_DAYS", "7"))
+DIGEST_CHUNK_SIZE = int(os.getenv("DIGEST_CHUNK_SIZE", "2000"))
+DIGEST_HOUR_UTC = int(os.getenv("DIGEST_HOUR_UTC", "7"))
+# Upcoming contests listed per preferred platform
+MAX_PER_PLATFORM = 10
+
+DELIVERIES = ("email", "json")
+
+# Compiled once at import; the digest is assembled from pre-rendered pieces
+SUBJECT = Template("Your contests for $date")
+TEXT_LINE = Template("- $start UTC  $name ($platform, $duration min)\n  $url")
+HTML_LINE = Template('<li>$start UTC &middot; <a href="$url">$name</a> ($platform, $duration min)</li>')
+TEXT_SECTION = Template("$title\n$lines\n")
+HTML_SECTION = Template("<h3>$title</h3><ul>$lines</ul>")
+TEXT_BODY = Template("Hi $first_name,\n\n$sections\nManage your digest settings in the app.\n")
+HTML_BODY = Template(
+    "<html><body><p>Hi $first_name,</p>$sections"
+    "<p>Manage your digest settings in the app.</p></body></html>"
+)
+# Built directly rather than through EmailMessage, whose header and MIME
+# handling dominated the cost of a digest. Base64 never contains "--", so
+# the parts cannot clash with the boundary.
+MIME_MESSAGE = Template(
+    "From: $sender\r\nTo: $to\r\nSubject: $subject\r\nDate: $date\r\nMessage-ID: $message_id\r\n"
+    "MIME-Version: 1.0\r\nContent-Type: multipart/alternative; boundary=\"$boundary\"\r\n\r\n"
+    "--$boundary\r\nContent-Type: text/plain; charset=\"utf-8\"\r\nContent-Transfer-Encoding: base64\r\n\r\n"
+    "$text\r\n"
+    "--$boundary\r\nContent-Type: text/html; charset=\"utf-8\"\r\nContent-Transfer-Encoding: base64\r\n\r\n"
+    "$html\r\n"
+    "--$boundary--\r\n"
+)
+
+
+class DigestRenderer:
+    """
+    Renders digests from contests loaded once per run
+
+    Every contest is rendered to its JSON, text and HTML fragments once, and
+    platform sections are cached by their contest ids, so users with the
+    same preferences share them. Rendering a user's digest only joins
+    cached strings.
+    """
+
+    def __init__(self, contests: Sequence[Tuple], digest_date: date, now: Optional[datetime] = None):
+        self.digest_date = digest_date
+        self.date_text = digest_date.isoformat()
+        self._headers = {
+            "sender": MAIL_FROM,
+            "subject": SUBJECT.substitute(date=self.date_text),
+            "date": format_datetime(now or datetime.utcnow()).replace("-0000", "+0000"),
+            "boundary": f"digest-{uuid.uuid4().hex}",
+        }
+        self._msgid_domain = MAIL_FROM.rpartition("@")[2] or "localhost"
+        self._json: Dict[str, str] = {}
+        self._text: Dict[str, str] = {}
+        self._html: Dict[str, str] = {}
+        self.by_platform: Dict[str, List[str]] = defaultdict(list)
+        # Rendered platform sections by (kind, platform, contest ids)
+        self._cache: Dict[Tuple[str, str, Tuple[str, ...]], str] = {}
+        for contest_id, platform, name, url, start_time, duration in contests:
+            values = {
+                "name": name,
+                "platform": platform,
+                "url": url,
+                "start": start_time.strftime("%a %d %b %H:%M"),
+                "duration": duration,
+            }
+            self._json[contest_id] = json.dumps({
+                "id": contest_id,
+                "platform": platform,
+                "name": name,
+                "url": url,
+                "start_time": start_time.isoformat(),
+                "duration": duration,
+            }, separators=(",", ":"))
+            self._text[contest_id] = TEXT_LINE.substitute(values)
+            self._html[contest_id] = HTML_LINE.substitute(
+                {key: html.escape(str(value)) for key, value in values.items()}
+            )
+            self.by_platform[platform].append(contest_id)
+
+    def select(self, bookmarked: Sequence[str], platforms: Optional[Sequence[str]]) -> Optional[Dict[str, Any]]:
+        """
+        Pick the contests of one digest, or None when there is nothing to send
+
+        Returns:
+            Dict[str, Any]: bookmarked ids and, per platform, upcoming ids
+            that are not bookmarked
+        """
+        bookmarked = tuple(contest_id for contest_id in bookmarked if contest_id in self._json)
+        skip = set(bookmarked)
+        upcoming = {}
+        for platform in platforms or sorted(self.by_platform):
+            ids = tuple(
+                contest_id for contest_id in self.by_platform.get(platform, ()) if contest_id not in skip
+            )[:MAX_PER_PLATFORM]
+            if ids:
+                upcoming[platform] = ids
+        if not bookmarked and not upcoming:
+            return None
+        return {"bookmarked": bookmarked, "upcoming": upcoming}
+
+    def _render(self, kind: str, title: str, ids: Tuple[str, ...]) -> str:
+        if kind == "json":
+            return "[" + ",".join(self._json[contest_id] for contest_id in ids) + "]"
+        if kind == "text":
+            return TEXT_SECTION.substitute(title=title, lines="\n".join(self._text[i] for i in ids))
+        return HTML_SECTION.substitute(
+            title=html.escape(title), lines="".join(self._html[i] for i in ids)
+        )
+
+    def _platform_section(self, kind: str, platform: str, ids: Tuple[str, ...]) -> str:
+        key = (kind, platform, ids)
+        section = self._cache.get(key)
+        if section is None:
+            title = platform if kind == "json" else f"Upcoming on {platform}"
+            section = self._cache[key] = self._render(kind, title, ids)
+        return section
+
+    def _sections(self, kind: str, selection: Dict[str, Any]) -> List[str]:
+        sections = []
+        if selection["bookmarked"]:
+            # Bookmark sections are per user and not worth caching
+            sections.append(self._render(kind, "Your bookmarked contests", selection["bookmarked"]))
+        for platform, ids in selection["upcoming"].items():
+            sections.append(self._platform_section(kind, platform, ids))
+        return sections
+
+    def render_json(self, selection: Dict[str, Any]) -> str:
+        upcoming = ",".join(
+            f"{json.dumps(platform)}:{self._platform_section('json', platform, ids)}"
+            for platform, ids in selection["upcoming"].items()
+        )
+        return (
+            f'{{"date":"{self.date_text}",'
+            f'"bookmarked":{self._render("json", "", selection["bookmarked"])},'
+            f'"upcoming":{{{upcoming}}}}}'
+        )
+
+    def render_email(self, selection: Dict[str, Any], to: str, first_name: Optional[str]) -> bytes:
+        name = first_name or "there"
+        text = TEXT_BODY.substitute(first_name=name, sections="\n".join(self._sections("text", selection)))
+        body = HTML_BODY.substitute(
+            first_name=html.escape(name), sections="\n".join(self._sections("html", selection))
+        )
+        return MIME_MESSAGE.substitute(
+            self._headers,
+            to=to,
+            message_id=make_msgid(domain=self._msgid_domain),
+            text=base64.encodebytes(text.encode("utf-8")).decode("ascii").replace("\n", "\r\n"),
+            html=base64.encodebytes(body.encode("utf-8")).decode("ascii").replace("\n", "\r\n"),
+        ).encode("ascii")
+
+
+def load_contests(db: Session, now: datetime, window_days: int = DIGEST_WINDOW_DAYS) -> List[Tuple]:
+    """Contests starting within the digest window, soonest first"""
+    return db.query(
+        Contest.id, Contest.platform, Contest.name, Contest.url, Contest.start_time, Contest.duration
+    ).filter(
+        Contest.start_time > now,
+        Contest.start_time <= now + timedelta(days=window_days)
+    ).order_by(Contest.start_time.asc()).all()
+
+
+def iter_subscriber_chunks(db: Session, digest_date: date, chunk_size: int) -> Iterator[List[Tuple]]:
+    """
+    Yield enabled subscribers who have not received this digest, in user id order
+
+    Keyset pagination keeps every page an index range scan, however many
+    users came before it.
+    """
+    last = ""
+    while True:
+        chunk = db.query(
+            DigestSubscription.user_id,
+            DigestSubscription.platforms,
+            DigestSubscription.delivery,
+            User.email,
+            User.first_name
+        ).outerjoin(
+            User, User.clerk_id == DigestSubscription.user_id
+        ).filter(
+            DigestSubscription.enabled.is_(True),
+            DigestSubscription.user_id > last,
+            (DigestSubscription.last_sent_on.is_(None)) | (DigestSubscription.last_sent_on < digest_date)
+        ).order_by(DigestSubscription.user_id.asc()).limit(chunk_size).all()
+        if not chunk:
+            return
+        yield chunk
+        last = chunk[-1][0]
+
+
+def load_bookmarks(db: Session, user_ids: List[str], now: datetime, window_days: int) -> Dict[str, List[str]]:
+    """Bookmarked contests within the digest window for a chunk of users, in one query"""
+    bookmarks: Dict[str, List[str]] = defaultdict(list)
+    rows = db.query(Bookmark.user_id, Bookmark.contest_id).join(
+        Contest, Contest.id == Bookmark.contest_id
+    ).filter(
+        Bookmark.user_id.in_(user_ids),
+        Contest.start_time > now,
+        Contest.start_time <= now + timedelta(days=window_days)
+    ).order_by(Contest.start_time.asc())
+    for user_id, contest_id in rows:
+        bookmarks[user_id].append(contest_id)
+    return bookmarks
+
+
+def _valid_address(email: Optional[str]) -> bool:
+    """Addresses that can go into the To header verbatim"""
+    return bool(email) and email.isascii() and "@" in email and not any(c in email for c in "\r\n<>,")
+
+
+def _mark_sent(db: Session, user_ids: List[str], digest_date: date) -> None:
+    if user_ids:
+        db.query(DigestSubscription).filter(
+            DigestSubscription.user_id.in_(user_ids)
+        ).update({"last_sent_on": digest_date}, synchronize_session=False)
+
+
+def run_digests(
+    db: Session,
+    mailer: Optional[MailerPool] = None,
+    now: Optional[datetime] = None,
+    chunk_size: int = DIGEST_CHUNK_SIZE,
+    window_days: int = DIGEST_WINDOW_DAYS
+) -> Dict[str, int]:
+    """
+    Build and deliver today's digest for every subscriber
+
+    Contests are loaded once; each chunk of users costs one subscriber query
+    and one bookmark query. JSON digests are written with one DELETE and one
+    multi-row INSERT per chunk, emails go through the mailer's pooled
+    connections. Users are marked once their digest was delivered, or when
+    there was nothing to send, so a rerun on the same day only picks up
+    failures. No transaction is open while mail is delivered; each chunk's
+    writes happen afterwards in one short transaction. A mailer must be
+    entered before it is passed in.
+
+    Returns:
+        Dict[str, int]: Counts of emailed, stored, empty and failed digests
+    """
+    now = now or datetime.utcnow()
+    digest_date = now.date()
+    renderer = DigestRenderer(load_contests(db, now, window_days), digest_date, now)
+    totals = {"emailed": 0, "stored": 0, "empty": 0, "failed": 0}
+
+    for chunk in iter_subscriber_chunks(db, digest_date, chunk_size):
+        bookmarks = load_bookmarks(db, [row[0] for row in chunk], now, window_days)
+        # End the read transaction so no connection is held during delivery
+        db.commit()
+        done: List[str] = []
+        stored = []
+        for user_id, platforms, delivery, email, first_name in chunk:
+            selection = renderer.select(bookmarks.get(user_id, ()), platforms.split(",") if platforms else None)
+            if selection is None:
+                done.append(user_id)
+                totals["empty"] += 1
+            elif delivery == "json":
+                stored.append({
+                    "user_id": user_id,
+                    "digest_date": digest_date,
+                    "body": renderer.render_json(selection),
+                    "created_at": now,
+                })
+            elif mailer is not None and _valid_address(email):
+                mailer.submit(user_id, email, renderer.render_email(selection, email, first_name))
+            else:
+                totals["failed"] += 1
+
+        # Delivery finishes before the chunk's first write, which would
+        # otherwise hold the write lock while waiting on SMTP
+        if mailer is not None:
+            sent, failed = mailer.drain()
+            done.extend(sent)
+            totals["emailed"] += len(sent)
+            totals["failed"] += len(failed)
+
+        if stored:
+            db.query(UserDigest).filter(
+                UserDigest.user_id.in_([row["user_id"] for row in stored])
+            ).delete(synchronize_session=False)
+            db.bulk_insert_mappings(UserDigest, stored)
+            done.extend(row["user_id"] for row in stored)
+            totals["stored"] += len(stored)
+        _mark_sent(db, done, digest_date)
+        db.commit()
+
+    logger.info(f"Daily digests for {digest_date}: {totals}")
+    return totals
+
+
+def run_daily_digests() -> Dict[str, int]:
+    """Run today's digests with the configured mailer"""
+    from models.database import SessionLocal
+
+    mailer = create_mailer()
+    db = SessionLocal()
+    try:
+        if mailer is None:
+            logger.warning("SMTP_HOST is not set; email digests are not delivered")
+            return run_digests(db)
+        with mailer:
+            return run_digests(db, mailer)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Deliver today's contest digests to every subscriber")
+    parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    from models.database import Base, engine
+
+    Base.metadata.create_all(bind=engine)
+    print(run_daily_digests())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+# utils/enrichment.py
+import heapq
+import json
+import logging
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
+
+from models.contests import Contest
+from models.contest_enrichments import ContestEnrichment
+from scrapers.codeforces import CodeForcesScraper, CodeforcesAPIError
+from utils.circuit_breaker import breakers, CircuitOpenError
+
+logger = logging.getLogger(__name__)
+
+# Upcoming contests are enriched first, then ongoing, then past
+STATUS_PRIORITY = {"upcoming": 0, "ongoing": 1, "past": 2}
+# Contests that keep failing are left alone until their status changes
+MAX_ATTEMPTS = 5
+
+_run_lock = threading.Lock()
+
+
+def build_queue(db: Session) -> List[Tuple[int, float, str]]:
+    """
+    Return a heap of Codeforces contests that need (re-)enrichment
+
+    A contest needs enrichment when it has no stored result or the result was
+    fetched while the contest had a different status. Within a status, the
+    soonest upcoming and the most recently finished contests come first.
+    """
+    rows = db.query(Contest.id, Contest.status, Contest.start_time).outerjoin(
+        ContestEnrichment, ContestEnrichment.contest_id == Contest.id
+    ).filter(
+        Contest.platform == "codeforces",
+        or_(
+            ContestEnrichment.contest_id.is_(None),
+            ContestEnrichment.status != Contest.status,
+            and_(ContestEnrichment.last_error.isnot(None), ContestEnrichment.attempts < MAX_ATTEMPTS)
+        )
+    ).all()
+
+    heap = []
+    for contest_id, status, start_time in rows:
+        timestamp = start_time.timestamp()
+        heap.append((STATUS_PRIORITY.get(status, 3), timestamp if status == "upcoming" else -timestamp, contest_id))
+    heapq.heapify(heap)
+    return heap
+
+
+def _store(db: Session, contest_id: str, status: str, details: Optional[Dict[str, Any]], error: Optional[str]) -> None:
+    enrichment = db.query(ContestEnrichment).filter(ContestEnrichment.contest_id == contest_id).first()
+    if enrichment is None:
+        enrichment = ContestEnrichment(contest_id=contest_id, attempts=0)
+        db.add(enrichment)
+    elif enrichment.status != status:
+        enrichment.attempts = 0
+
+    enrichment.status = status
+    enrichment.enriched_at = datetime.utcnow()
+    if error is None:
+        enrichment.problem_count = details["problem_count"]
+        enrichment.problem_tags = json.dumps(details["problem_tags"]) if details["problem_tags"] is not None else None
+        enrichment.participant_count = details["participant_count"]
+        enrichment.last_error = None
+        enrichment.attempts = 0
+    else:
+        enrichment.last_error = error[:500]
+        enrichment.attempts += 1
+    # Commit per contest so an interrupted run resumes where it stopped
+    db.commit()
+
+
+def run_enrichment(db: Session, max_contests: int = 25) -> int:
+    """
+    Enrich up to max_contests Codeforces contests in priority order
+
+    Every API call waits on the shared Codeforces rate limiter and goes
+    through the Codeforces circuit breaker; the run stops early when the
+    circuit opens. Overlapping runs are skipped. No transaction is open
+    while waiting on the API, so the run never holds a database connection
+    (or SQLite's write lock) across rate-limited calls.
+
+    Returns:
+        int: Number of contests processed
+    """
+    if not _run_lock.acquire(blocking=False):
+        logger.info("Codeforces enrichment already running, skipping")
+        return 0
+
+    try:
+        scraper = CodeForcesScraper()
+        queue = build_queue(db)
+        db.commit()
+        processed = 0
+        while queue and processed < max_contests:
+            _, _, contest_id = heapq.heappop(queue)
+            row = db.query(Contest.contest_id, Contest.status).filter(Contest.id == contest_id).first()
+            # End the read transaction before calling the API
+            db.commit()
+            if row is None:
+                continue
+            platform_id, status = row
+
+            try:
+                details = breakers["codeforces"].call(
+                    lambda: scraper.get_contest_details(platform_id),
+                    ignore=(CodeforcesAPIError,)
+                )
+            except CircuitOpenError as e:
+                logger.warning(f"Stopping Codeforces enrichment: {e}")
+                break
+            except CodeforcesAPIError as e:
+                # The API rejected this contest specifically; remember and move on
+                _store(db, contest_id, status, None, str(e))
+            except Exception as e:
+                logger.error(f"Failed to enrich Codeforces contest {platform_id}: {e}")
+                _store(db, contest_id, status, None, str(e))
+                break
+            else:
+                _store(db, contest_id, status, details, None)
+            processed += 1
+
+        logger.info(f"Enriched {processed} Codeforces contests, {len(queue)} still queued")
+        return processed
+    finally:
+        _run_lock.release()
+
+
+def enrichment_record(enrichment: ContestEnrichment) -> Dict[str, Any]:
+    return {
+        "contest_id": enrichment.contest_id,
+        "status": enrichment.status,
+        "problem_count": enrichment.problem_count,
+        "problem_tags": json.loads(enrichment.problem_tags) if enrichment.problem_tags else None,
+        "participant_count": enrichment.participant_count,
+        "enriched_at": enrichment.enriched_at.isoformat() if enrichment.enriched_at else None,
+        "last_error": enrichment.last_error,
+    }
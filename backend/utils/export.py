@@ -0,0 +1,219 @@
+# utils/export.py
+import argparse
+import json
+import logging
+import sys
+from datetime import datetime
+from typing import Any, Iterator, List, Optional, Sequence
+
+from sqlalchemy import Boolean, DateTime, Integer, select
+from sqlalchemy.orm import Session
+
+from models.contests import Contest, ArchivedContest
+from models.bookmarks import Bookmark
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet and Arrow exports are unavailable without pyarrow
+    pa = None
+    pq = None
+
+logger = logging.getLogger(__name__)
+
+# Exportable tables and the column their time-range filter applies to
+EXPORT_TABLES = {
+    "contests": (Contest, "start_time"),
+    "contests_archive": (ArchivedContest, "start_time"),
+    "bookmarks": (Bookmark, "created_at"),
+}
+# Tables holding per-user data, only exported over HTTP to admins
+PRIVATE_TABLES = {"bookmarks"}
+
+FORMATS = {
+    "parquet": "application/vnd.apache.parquet",
+    "arrow": "application/vnd.apache.arrow.stream",
+    "ndjson": "application/x-ndjson",
+}
+
+BATCH_SIZE = 5000
+
+
+class ExportError(Exception):
+    """Raised for export requests that cannot be served"""
+
+
+def resolve_columns(table: str, columns: Optional[Sequence[str]] = None) -> List[str]:
+    """Validate the requested columns, defaulting to all of them"""
+    if table not in EXPORT_TABLES:
+        raise ExportError(f"Unknown table {table}; expected one of {', '.join(EXPORT_TABLES)}")
+    available = [column.name for column in EXPORT_TABLES[table][0].__table__.columns]
+    if not columns:
+        return available
+    unknown = [column for column in columns if column not in available]
+    if unknown:
+        raise ExportError(f"Unknown columns for {table}: {', '.join(unknown)}")
+    return list(dict.fromkeys(columns))
+
+
+def iter_batches(
+    db: Session,
+    table: str,
+    columns: List[str],
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    batch_size: int = BATCH_SIZE
+) -> Iterator[List[tuple]]:
+    """
+    Yield rows of a table in batches of at most batch_size
+
+    yield_per streams rows through a server-side cursor on PostgreSQL, so
+    memory use depends on the batch size rather than the table size.
+    """
+    model, time_column = EXPORT_TABLES[table]
+    statement = select(*[model.__table__.c[column] for column in columns])
+    if since:
+        statement = statement.where(model.__table__.c[time_column] >= since)
+    if until:
+        statement = statement.where(model.__table__.c[time_column] < until)
+    statement = statement.order_by(model.__table__.c[time_column]).execution_options(yield_per=batch_size)
+
+    for partition in db.execute(statement).partitions():
+        yield [tuple(row) for row in partition]
+
+
+def _arrow_type(column) -> Any:
+    if isinstance(column.type, DateTime):
+        return pa.timestamp("us")
+    if isinstance(column.type, Integer):
+        return pa.int64()
+    if isinstance(column.type, Boolean):
+        return pa.bool_()
+    return pa.string()
+
+
+def arrow_schema(table: str, columns: List[str]):
+    model = EXPORT_TABLES[table][0]
+    return pa.schema([(column, _arrow_type(model.__table__.c[column])) for column in columns])
+
+
+class _ChunkSink:
+    """Write-only file object handing written bytes back to a generator"""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self.closed = False
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def _to_arrow(batch: List[tuple], schema) -> Any:
+    columns = list(zip(*batch))
+    return pa.RecordBatch.from_arrays(
+        [pa.array(values, type=field.type) for values, field in zip(columns, schema)],
+        schema=schema
+    )
+
+
+def encode(batches: Iterator[List[tuple]], table: str, columns: List[str], format: str) -> Iterator[bytes]:
+    """
+    Encode row batches as a byte stream in the given format
+
+    Each batch becomes one Arrow record batch or Parquet row group and is
+    yielded as soon as it is written. Callers validate the format first.
+    """
+    if format == "ndjson":
+        for batch in batches:
+            lines = []
+            for row in batch:
+                record = {
+                    column: value.isoformat() if isinstance(value, datetime) else value
+                    for column, value in zip(columns, row)
+                }
+                lines.append(json.dumps(record, separators=(",", ":")))
+            if lines:
+                yield ("\n".join(lines) + "\n").encode("utf-8")
+        return
+
+    schema = arrow_schema(table, columns)
+    sink = _ChunkSink()
+    if format == "arrow":
+        writer = pa.ipc.new_stream(sink, schema)
+        write = writer.write_batch
+    else:
+        writer = pq.ParquetWriter(sink, schema)
+        write = lambda record_batch: writer.write_table(pa.Table.from_batches([record_batch]))
+
+    with writer:
+        for batch in batches:
+            if batch:
+                write(_to_arrow(batch, schema))
+                yield sink.drain()
+    yield sink.drain()
+
+
+def export_table(
+    db: Session,
+    table: str,
+    format: str = "ndjson",
+    columns: Optional[Sequence[str]] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None
+) -> Iterator[bytes]:
+    """
+    Stream a table export
+
+    Arguments are validated eagerly, before the first chunk is produced.
+
+    Raises:
+        ExportError: For unknown tables, columns or formats, or a missing pyarrow
+    """
+    columns = resolve_columns(table, columns)
+    if format not in FORMATS:
+        raise ExportError(f"Unknown format {format}; expected one of {', '.join(FORMATS)}")
+    if format != "ndjson" and pa is None:
+        raise ExportError(f"{format} export requires pyarrow; use ndjson instead")
+    return encode(iter_batches(db, table, columns, since, until), table, columns, format)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Export contest and bookmark history")
+    parser.add_argument("table", choices=list(EXPORT_TABLES))
+    parser.add_argument("--format", choices=list(FORMATS), default="ndjson")
+    parser.add_argument("--columns", help="Comma separated column names (default: all)")
+    parser.add_argument("--since", type=datetime.fromisoformat, help="Inclusive lower bound (ISO 8601)")
+    parser.add_argument("--until", type=datetime.fromisoformat, help="Exclusive upper bound (ISO 8601)")
+    parser.add_argument("--output", "-o", help="Output file (default: stdout)")
+    args = parser.parse_args(argv)
+
+    from models.database import ReadSessionLocal
+
+    db = ReadSessionLocal()
+    output = open(args.output, "wb") if args.output else sys.stdout.buffer
+    try:
+        columns = args.columns.split(",") if args.columns else None
+        for chunk in export_table(db, args.table, args.format, columns, args.since, args.until):
+            output.write(chunk)
+    except ExportError as e:
+        parser.error(str(e))
+    finally:
+        if args.output:
+            output.close()
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
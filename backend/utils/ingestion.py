@@ -0,0 +1,224 @@
+# utils/ingestion.py
+import logging
+import threading
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import exists, or_, tuple_
+from sqlalchemy.orm import Session
+
+from models.contests import Contest, ArchivedContest
+from models.bookmarks import Bookmark
+from utils.change_log import record_changes, record_removals
+from utils.stats import apply_contest_deltas, remove_contest_stats
+
+logger = logging.getLogger(__name__)
+
+# Callables invoked with the list of change events after a successful commit
+_listeners: List[Callable[[List[Dict[str, Any]]], None]] = []
+
+# One lock per platform, see platform_lock
+_platform_locks: Dict[str, threading.Lock] = {}
+_platform_locks_guard = threading.Lock()
+
+
+def platform_lock(platform: str) -> threading.Lock:
+    """
+    Lock serializing writers of one platform's contests in this process
+
+    (platform, contest_id) is not unique, so two transactions upserting the
+    same platform could both see a contest as missing and insert it twice.
+    Scrapes and history batches hold this lock from their first read of the
+    platform's rows until they commit.
+    """
+    with _platform_locks_guard:
+        return _platform_locks.setdefault(platform, threading.Lock())
+
+
+def compute_status(start_time: datetime, end_time: datetime, now: Optional[datetime] = None) -> str:
+    """Return upcoming, ongoing or past for the given contest window"""
+    now = now or datetime.utcnow()
+    if start_time > now:
+        return "upcoming"
+    elif end_time > now:
+        return "ongoing"
+    return "past"
+
+
+def contest_summary(contest: Contest) -> Dict[str, Any]:
+    """Compact representation of a contest used in change events"""
+    return {
+        "id": contest.id,
+        "platform": contest.platform,
+        "contest_id": contest.contest_id,
+        "name": contest.name,
+        "start_time": contest.start_time.isoformat() if contest.start_time else None,
+        "end_time": contest.end_time.isoformat() if contest.end_time else None,
+        "status": contest.status,
+        "solution_url": contest.solution_url,
+    }
+
+
+def refresh_statuses(db: Session, now: Optional[datetime] = None) -> List[Dict[str, Any]]:
+    """
+    Recompute the status of stored contests
+
+    Past is terminal, so only contests that are not past yet (or whose end
+    moved into the future) are loaded; the cost does not grow with history.
+
+    Returns:
+        List[Dict[str, Any]]: One "status" event per contest whose status changed
+    """
+    now = now or datetime.utcnow()
+    events = []
+    for contest in db.query(Contest).filter(
+        or_(Contest.status != "past", Contest.end_time > now)
+    ):
+        status = compute_status(contest.start_time, contest.end_time, now)
+        if contest.status != status:
+            previous = contest.status
+            contest.status = status
+            events.append({"type": "status", "previous": previous, "contest": contest})
+    return events
+
+
+def upsert_contests(db: Session, contests: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Insert new contests and update existing ones matched by (platform, contest_id)
+
+    Existing rows are loaded with a single query and only rows whose fields
+    actually differ are touched. Contests that have been archived are skipped.
+
+    Returns:
+        List[Dict[str, Any]]: One "ingest" event per created or updated contest
+    """
+    if not contests:
+        return []
+
+    keys = {(c["platform"], c["contest_id"]) for c in contests}
+    existing = {
+        (contest.platform, contest.contest_id): contest
+        for contest in db.query(Contest).filter(
+            tuple_(Contest.platform, Contest.contest_id).in_(list(keys))
+        )
+    }
+
+    missing = keys - existing.keys()
+    archived = set()
+    if missing:
+        archived = set(db.query(ArchivedContest.platform, ArchivedContest.contest_id).filter(
+            tuple_(ArchivedContest.platform, ArchivedContest.contest_id).in_(list(missing))
+        ).all())
+
+    events = []
+    for contest_data in contests:
+        key = (contest_data["platform"], contest_data["contest_id"])
+        if key in archived:
+            continue
+        contest = existing.get(key)
+        if contest is None:
+            contest = Contest(**contest_data)
+            db.add(contest)
+            existing[key] = contest
+            events.append({"type": "ingest", "created": True, "contest": contest})
+            continue
+
+        changed = [
+            field for field, value in contest_data.items()
+            if getattr(contest, field) != value
+        ]
+        if changed:
+            for field in changed:
+                setattr(contest, field, contest_data[field])
+            events.append({"type": "ingest", "created": False, "changed": changed, "contest": contest})
+
+    return events
+
+
+def remove_missing_contests(
+    db: Session,
+    platform: str,
+    contest_ids: List[str],
+    now: Optional[datetime] = None
+) -> List[str]:
+    """
+    Delete upcoming contests of a platform that its feed no longer lists
+
+    Only called with a complete feed, so an upcoming contest missing from it
+    was cancelled or never existed. Bookmarked contests are kept. Does not
+    commit; the removals land in the same transaction as the next ingest.
+
+    Returns:
+        List[str]: Ids of the removed contests
+    """
+    if not contest_ids:
+        # An empty feed is more likely an upstream hiccup than mass cancellation
+        return []
+
+    now = now or datetime.utcnow()
+    rows = db.query(Contest.id, Contest.platform, Contest.start_time, Contest.duration).filter(
+        Contest.platform == platform,
+        Contest.start_time > now,
+        Contest.contest_id.notin_(contest_ids),
+        ~exists().where(Bookmark.contest_id == Contest.id)
+    ).all()
+    ids = [row[0] for row in rows]
+    if ids:
+        remove_contest_stats(db, [row[1:] for row in rows])
+        db.query(Contest).filter(Contest.id.in_(ids)).delete(synchronize_session=False)
+        record_removals(db, ids, "removed")
+        logger.info(f"Removed {len(ids)} {platform} contests missing from its feed")
+    return ids
+
+
+def ingest_contests(db: Session, contests: List[Dict[str, Any]], refresh_status: bool = True) -> List[Dict[str, Any]]:
+    """
+    Refresh statuses, upsert the scraped contests, commit and notify listeners
+    """
+    events = refresh_statuses(db) if refresh_status else []
+    events.extend(upsert_contests(db, contests))
+    return commit_changes(db, events)
+
+
+def commit_changes(db: Session, events: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Commit the session and publish the events describing what it changed
+
+    The change log entries and aggregate statistics are written in the same
+    transaction as the changes.
+    """
+    # Before flushing, while updated contests still carry their old values
+    apply_contest_deltas(db, events)
+    db.flush()
+    record_changes(db, events)
+    # Summarize before committing, as commit expires the loaded instances
+    events = summarize_events(events)
+    db.commit()
+    publish_changes(events)
+    return events
+
+
+def summarize_events(events: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Replace the ORM instances held by events with plain contest summaries"""
+    summarized = []
+    for event in events:
+        event = dict(event)
+        event["contest"] = contest_summary(event["contest"])
+        summarized.append(event)
+    return summarized
+
+
+def add_listener(listener: Callable[[List[Dict[str, Any]]], None]) -> None:
+    """Register a callable that is notified after contest changes are committed"""
+    _listeners.append(listener)
+
+
+def publish_changes(events: List[Dict[str, Any]]) -> None:
+    """Notify listeners about summarized, committed changes"""
+    if not events:
+        return
+    for listener in _listeners:
+        try:
+            listener(events)
+        except Exception as e:
+            logger.error(f"Contest change listener {listener!r} failed: {e}")
@@ -0,0 +1,203 @@
+# utils/jobs.py
+import logging
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple
+
+from models.database import SessionLocal
+from scrapers.codeforces import CodeForcesScraper
+from scrapers.leetcode import LeetCodeScraper
+from utils.circuit_breaker import breakers, fetch_platform
+from utils.ingestion import ingest_contests, remove_missing_contests, platform_lock
+from utils.contest_events import transitions
+from utils.contest_history import run_full_history
+from utils.digests import run_daily_digests
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+# Finished jobs kept around for polling
+MAX_FINISHED_JOBS = 200
+
+SCRAPERS = {
+    "codeforces": CodeForcesScraper,
+    "leetcode": LeetCodeScraper,
+}
+
+
+class Job:
+    def __init__(self, key: str, kind: str):
+        self.id = uuid.uuid4().hex
+        self.key = key
+        self.kind = kind
+        self.status = QUEUED
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.created_at = datetime.utcnow()
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.id,
+            "key": self.key,
+            "kind": self.kind,
+            "status": self.status,
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at.isoformat(),
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+        }
+
+
+class JobQueue:
+    """
+    Background job runner with single-flight deduplication
+
+    Jobs are keyed; submitting a key that already has a queued or running job
+    returns that job instead of starting another one, so concurrent requests
+    for the same work share a single run. Jobs live in this process only.
+    """
+
+    def __init__(self, max_workers: int = 2):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="jobs")
+        self._lock = threading.Lock()
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._in_flight: Dict[str, Job] = {}
+
+    def submit(
+        self,
+        key: str,
+        kind: str,
+        fn: Callable[[], Dict[str, Any]],
+        covered_by: Sequence[str] = ()
+    ) -> Tuple[Job, bool]:
+        """
+        Queue fn under key unless a job for key is already in flight
+
+        covered_by lists keys of jobs that do everything this one would and
+        more; an in-flight job under one of them is joined as well.
+
+        Returns:
+            Tuple[Job, bool]: The job, and whether it was an existing one
+        """
+        with self._lock:
+            for candidate in (key, *covered_by):
+                job = self._in_flight.get(candidate)
+                if job is not None:
+                    return job, True
+            job = Job(key, kind)
+            self._in_flight[key] = job
+            self._jobs[job.id] = job
+            self._prune()
+        self._executor.submit(self._run, job, fn)
+        return job, False
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _run(self, job: Job, fn: Callable[[], Dict[str, Any]]) -> None:
+        job.status = RUNNING
+        job.started_at = datetime.utcnow()
+        try:
+            job.result = fn()
+            job.status = SUCCEEDED
+        except Exception as e:
+            logger.error(f"Job {job.kind} ({job.key}) failed: {e}")
+            job.error = str(e)
+            job.status = FAILED
+        finally:
+            job.finished_at = datetime.utcnow()
+            with self._lock:
+                if self._in_flight.get(job.key) is job:
+                    del self._in_flight[job.key]
+
+    def _prune(self) -> None:
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished_at is not None]
+        for job_id in finished[:max(len(finished) - MAX_FINISHED_JOBS, 0)]:
+            del self._jobs[job_id]
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def scrape_platform(platform: str, refresh_status: bool = False) -> Dict[str, Any]:
+    """
+    Scrape one platform and store its contests
+
+    A failed scrape or an open circuit leaves the platform's stored rows
+    untouched and is reported as stale.
+
+    Returns:
+        Dict[str, Any]: What the scrape fetched and changed
+    """
+    scraper = SCRAPERS[platform]()
+    contests = fetch_platform(platform, scraper.fetch_contests)
+
+    db = SessionLocal()
+    removed = []
+    # A refresh and a plain scrape of the same platform fetch concurrently
+    # but store one after the other
+    with platform_lock(platform):
+        try:
+            if contests is not None and platform == "leetcode":
+                removed = remove_missing_contests(db, "leetcode", [c["contest_id"] for c in contests])
+            # Statuses are refreshed even when the scrape failed
+            events = ingest_contests(db, contests or [], refresh_status=refresh_status)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+    transitions.untrack(removed)
+
+    if contests is None:
+        return {"platform": platform, "stale": True, "breaker": breakers[platform].snapshot(), "changes": len(events)}
+    logger.info(f"Scraped {len(contests)} {platform} contests, {len(events)} changes")
+    return {"platform": platform, "stale": False, "fetched": len(contests), "changes": len(events)}
+
+
+def job_response(job: Job, joined: bool) -> Dict[str, Any]:
+    """Response body for an endpoint that queued a job"""
+    return {**job.to_dict(), "joined": joined, "status_url": f"/jobs/{job.id}"}
+
+
+def enqueue_scrape(platform: str, refresh_status: bool = False) -> Tuple[Job, bool]:
+    """
+    Queue a scrape of platform, joining one that is already in flight
+
+    A scrape that refreshes statuses never joins one that does not, while a
+    plain scrape can join either.
+    """
+    refresh_key = f"{platform}:refresh"
+    if refresh_status:
+        return job_queue.submit(refresh_key, "scrape", lambda: scrape_platform(platform, True))
+    return job_queue.submit(
+        platform, "scrape", lambda: scrape_platform(platform, False), covered_by=[refresh_key]
+    )
+
+
+def enqueue_full_history() -> Tuple[Job, bool]:
+    """Queue the Codeforces full-history ingestion, joining a run that is already in flight"""
+    return job_queue.submit(
+        "codeforces-history", "history", lambda: {"feeds": run_full_history()}
+    )
+
+
+def enqueue_digests() -> Tuple[Job, bool]:
+    """Queue today's digest delivery, joining a run that is already in flight"""
+    return job_queue.submit("digests", "digest", run_daily_digests)
+
+
+# Two workers per scraper (with and without status refresh) plus one each for
+# the long-running history and digest jobs
+job_queue = JobQueue(max_workers=2 * len(SCRAPERS) + 2)
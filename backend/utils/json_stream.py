@@ -0,0 +1,102 @@
+# utils/json_stream.py
+import codecs
+import json
+from typing import Any, Iterable, Iterator
+
+# Largest single value buffered while waiting for it to be complete
+MAX_VALUE_BYTES = 1024 * 1024
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = " \t\r\n"
+
+
+class _Buffer:
+    """Text buffer refilled from a byte chunk iterator on demand"""
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks = iter(chunks)
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self.text = ""
+        self.pos = 0
+        self.exhausted = False
+
+    def fill(self) -> bool:
+        """Append the next chunk, dropping consumed text; False at end of input"""
+        if self.exhausted:
+            return False
+        self.text = self.text[self.pos:]
+        self.pos = 0
+        if len(self.text) > MAX_VALUE_BYTES:
+            raise ValueError(f"JSON value exceeds {MAX_VALUE_BYTES} bytes")
+        try:
+            self.text += self._decoder.decode(next(self._chunks))
+        except StopIteration:
+            self.text += self._decoder.decode(b"", final=True)
+            self.exhausted = True
+        return True
+
+    def peek(self) -> str:
+        """Skip whitespace and return the next character, or "" at end of input"""
+        while True:
+            while self.pos < len(self.text) and self.text[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.text):
+                return self.text[self.pos]
+            if not self.fill():
+                return ""
+
+    def expect(self, char: str) -> None:
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Expected {char!r} in JSON stream, found {found!r}")
+        self.pos += 1
+
+    def value(self) -> Any:
+        """Decode the next complete JSON value"""
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.text, self.pos)
+            except json.JSONDecodeError:
+                if self.fill():
+                    continue
+                raise
+            # A number or literal may continue in the next chunk
+            if end == len(self.text) and self.fill():
+                continue
+            self.pos = end
+            return value
+
+
+def iter_array_items(chunks: Iterable[bytes], key: str) -> Iterator[Any]:
+    """
+    Yield the items of the array stored under key in a top-level JSON object
+
+    Only one item is held in memory at a time, so arbitrarily long arrays can
+    be read from a streamed HTTP body. Other members of the object are
+    decoded and discarded.
+
+    Raises:
+        ValueError: For malformed JSON or when the object has no member named key
+    """
+    buffer = _Buffer(chunks)
+    buffer.expect("{")
+    if buffer.peek() == "}":
+        raise ValueError(f"JSON object has no member {key!r}")
+    while True:
+        name = buffer.value()
+        buffer.expect(":")
+        if name != key:
+            buffer.value()
+        else:
+            buffer.expect("[")
+            if buffer.peek() == "]":
+                return
+            while True:
+                yield buffer.value()
+                if buffer.peek() == "]":
+                    return
+                buffer.expect(",")
+        if buffer.peek() == "}":
+            raise ValueError(f"JSON object has no member {key!r}")
+        buffer.expect(",")
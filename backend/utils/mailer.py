@@ -0,0 +1,149 @@
+# utils/mailer.py
+import logging
+import os
+import queue
+import smtplib
+import threading
+from typing import Any, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+SMTP_HOST = os.getenv("SMTP_HOST")
+SMTP_PORT = int(os.getenv("SMTP_PORT", "587"))
+SMTP_USERNAME = os.getenv("SMTP_USERNAME")
+SMTP_PASSWORD = os.getenv("SMTP_PASSWORD")
+SMTP_STARTTLS = os.getenv("SMTP_STARTTLS", "true").lower() in ("1", "true", "yes")
+SMTP_POOL_SIZE = int(os.getenv("SMTP_POOL_SIZE", "4"))
+MAIL_FROM = os.getenv("MAIL_FROM", "contests@localhost")
+
+# Many providers cap the messages accepted over one connection
+MAX_MESSAGES_PER_CONNECTION = 500
+
+
+class MailerPool:
+    """
+    Sends messages over a fixed number of persistent SMTP connections
+
+    Each worker thread owns one connection and reuses it across messages,
+    reconnecting when the server drops it or after
+    MAX_MESSAGES_PER_CONNECTION messages. The submission queue is bounded,
+    so producers are slowed down to the delivery rate instead of buffering
+    every message in memory.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int = SMTP_PORT,
+        pool_size: int = SMTP_POOL_SIZE,
+        username: Optional[str] = SMTP_USERNAME,
+        password: Optional[str] = SMTP_PASSWORD,
+        starttls: bool = SMTP_STARTTLS,
+        timeout: float = 30.0
+    ):
+        self.host = host
+        self.port = port
+        self.pool_size = pool_size
+        self.username = username
+        self.password = password
+        self.starttls = starttls
+        self.timeout = timeout
+        self._queue: "queue.Queue[Optional[Tuple[Any, str, bytes]]]" = queue.Queue(maxsize=pool_size * 100)
+        self._lock = threading.Lock()
+        self._sent: List[Any] = []
+        self._failed: List[Any] = []
+        self._threads: List[threading.Thread] = []
+
+    def __enter__(self) -> "MailerPool":
+        self._threads = [
+            threading.Thread(target=self._work, name=f"mailer-{i}", daemon=True)
+            for i in range(self.pool_size)
+        ]
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    def _connect(self) -> smtplib.SMTP:
+        connection = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        if self.starttls and connection.has_extn("starttls"):
+            connection.starttls()
+        if self.username:
+            connection.login(self.username, self.password or "")
+        return connection
+
+    def _work(self) -> None:
+        connection: Optional[smtplib.SMTP] = None
+        sent_on_connection = 0
+        while True:
+            item = self._queue.get()
+            if item is None:
+                self._queue.task_done()
+                break
+            key, to, message = item
+            delivered = False
+            # One retry on a fresh connection covers servers closing idle ones
+            for attempt in range(2):
+                try:
+                    if connection is None or sent_on_connection >= MAX_MESSAGES_PER_CONNECTION:
+                        self._close(connection)
+                        connection = self._connect()
+                        sent_on_connection = 0
+                    connection.sendmail(MAIL_FROM, [to], message)
+                    sent_on_connection += 1
+                    delivered = True
+                    break
+                except (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused, smtplib.SMTPDataError) as e:
+                    # The server answered; the connection is still usable
+                    logger.error(f"Mail to {to} was rejected: {e}")
+                    break
+                except OSError as e:
+                    # Includes the other SMTPExceptions, such as a dropped connection
+                    self._close(connection)
+                    connection = None
+                    if attempt:
+                        logger.error(f"Could not deliver mail to {to}: {e}")
+            with self._lock:
+                (self._sent if delivered else self._failed).append(key)
+            self._queue.task_done()
+        self._close(connection)
+
+    @staticmethod
+    def _close(connection: Optional[smtplib.SMTP]) -> None:
+        if connection is None:
+            return
+        try:
+            connection.quit()
+        except OSError:
+            connection.close()
+
+    def submit(self, key: Any, to: str, message: bytes) -> None:
+        """Queue a complete RFC 5322 message for one recipient, blocking while the queue is full"""
+        self._queue.put((key, to, message))
+
+    def drain(self) -> Tuple[List[Any], List[Any]]:
+        """
+        Wait for every submitted message
+
+        Returns:
+            Tuple[List[Any], List[Any]]: Keys of the delivered and failed
+            messages since the previous drain
+        """
+        self._queue.join()
+        with self._lock:
+            sent, failed = self._sent, self._failed
+            self._sent, self._failed = [], []
+        return sent, failed
+
+
+def create_mailer() -> Optional[MailerPool]:
+    """A pool for the configured SMTP server, or None when SMTP_HOST is unset"""
+    if not SMTP_HOST:
+        return None
+    return MailerPool(SMTP_HOST)
@@ -0,0 +1,131 @@
+# utils/rate_limit.py
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional
+
+from fastapi import HTTPException, Request
+
+logger = logging.getLogger(__name__)
+
+# Hard cap on tracked keys; the least recently seen key is dropped beyond it
+MAX_KEYS = 100000
+
+
+class RateLimitPolicy:
+    """
+    Token bucket parameters for a group of routes
+
+    Buckets are per client address. Only policies for routes that act on the
+    caller's own data set per_user, which keys them on the user-id header:
+    anyone can send a new header value, so elsewhere it would let callers
+    skip the limit and flood the store with fresh buckets.
+    """
+
+    def __init__(self, name: str, rate: float, capacity: float, per_user: bool = False):
+        self.name = name
+        self.rate = rate  # tokens per second
+        self.capacity = capacity
+        self.per_user = per_user
+
+
+POLICIES: Dict[str, RateLimitPolicy] = {
+    # Every call scrapes upstream and rewrites contest rows
+    "scrape": RateLimitPolicy("scrape", rate=1 / 60, capacity=2),
+    "users": RateLimitPolicy("users", rate=10 / 60, capacity=5),
+    "bookmarks_read": RateLimitPolicy("bookmarks_read", rate=1.0, capacity=30, per_user=True),
+    "bookmarks_write": RateLimitPolicy("bookmarks_write", rate=0.5, capacity=10, per_user=True),
+    "recommendations": RateLimitPolicy("recommendations", rate=1.0, capacity=20, per_user=True),
+    "digests": RateLimitPolicy("digests", rate=0.5, capacity=10, per_user=True),
+    # Every call rebuilds the statistics from the full base tables
+    "stats_check": RateLimitPolicy("stats_check", rate=1 / 60, capacity=2),
+}
+
+
+class MemoryLimiterStore:
+    """
+    In-process token bucket state, one small [tokens, updated, refill] entry per key
+
+    Keys are kept in least-recently-used order. A key idle long enough for its
+    bucket to refill completely is indistinguishable from a new key, so it is
+    evicted when the store is next touched. A shared store (e.g. Redis backed)
+    can replace limiter_store by implementing the same take().
+    """
+
+    def __init__(self, max_keys: int = MAX_KEYS):
+        self.max_keys = max_keys
+        self._lock = threading.Lock()
+        self._buckets: "OrderedDict[str, list]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def take(self, key: str, policy: RateLimitPolicy, now: Optional[float] = None) -> float:
+        """
+        Take one token from key's bucket
+
+        Returns:
+            float: 0 if the request is allowed, otherwise seconds until it would be
+        """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            bucket = self._buckets.pop(key, None)
+            if bucket is None:
+                tokens = policy.capacity
+            else:
+                tokens = min(policy.capacity, bucket[0] + (now - bucket[1]) * policy.rate)
+
+            if tokens >= 1:
+                tokens -= 1
+                wait = 0.0
+            else:
+                wait = (1 - tokens) / policy.rate
+            self._buckets[key] = [tokens, now, (policy.capacity - tokens) / policy.rate]
+            self._evict(now)
+            return wait
+
+    def _evict(self, now: float) -> None:
+        # Oldest first; stop at the first bucket that has not refilled yet.
+        # Buckets of slower policies may linger a little longer, never the reverse.
+        while self._buckets:
+            key, (_, updated, refill) = next(iter(self._buckets.items()))
+            if now - updated < refill and len(self._buckets) <= self.max_keys:
+                break
+            del self._buckets[key]
+
+
+limiter_store = MemoryLimiterStore()
+
+
+def client_key(request: Request, per_user: bool = False) -> str:
+    """Identify the caller by the client IP, or by the user-id header when per_user is set and it is present"""
+    user_id = request.headers.get("user-id") if per_user else None
+    if user_id:
+        return f"user:{user_id}"
+    host = request.client.host if request.client else "unknown"
+    return f"ip:{host}"
+
+
+def rate_limit(policy_name: str) -> Callable[[Request], None]:
+    """
+    Route dependency enforcing the named policy per caller
+
+    Raises:
+        HTTPException: 429 with a Retry-After header when the caller is over the limit
+    """
+    policy = POLICIES[policy_name]
+
+    def dependency(request: Request) -> None:
+        key = f"{policy.name}:{client_key(request, policy.per_user)}"
+        wait = limiter_store.take(key, policy)
+        if wait:
+            logger.info(f"Rate limited {key} for {wait:.1f}s")
+            raise HTTPException(
+                status_code=429,
+                detail="Too many requests, please retry later",
+                headers={"Retry-After": str(math.ceil(wait))}
+            )
+
+    return dependency
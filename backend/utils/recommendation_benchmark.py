@@ -0,0 +1,81 @@
+# utils/recommendation_benchmark.py
+import argparse
+import random
+import statistics
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from utils.recommendations import ContestRecommender, PLATFORMS
+
+NAME_WORDS = [
+    "Round", "Div.", "Educational", "Global", "Weekly", "Biweekly", "Contest", "Starters",
+    "Cook-Off", "Lunchtime", "Good", "Bye", "Hello", "April", "Fools", "Kotlin", "Heuristic",
+]
+
+
+def build(contests: int, upcoming_share: float, now: datetime) -> ContestRecommender:
+    """A recommender holding synthetic contests, upcoming_share of them in the future"""
+    recommender = ContestRecommender()
+    for i in range(contests):
+        if random.random() < upcoming_share:
+            start_time = now + timedelta(minutes=random.randint(60, 365 * 24 * 60))
+        else:
+            start_time = now - timedelta(minutes=random.randint(60, 10 * 365 * 24 * 60))
+        name = " ".join(random.sample(NAME_WORDS, random.randint(2, 4))) + f" {i}"
+        recommender.upsert(
+            str(uuid.uuid4()), random.choice(PLATFORMS), name, start_time, random.choice([90, 120, 135, 150, 180])
+        )
+    return recommender
+
+
+def measure(recommender: ContestRecommender, users: int, bookmarks: int, now: datetime) -> Dict[str, float]:
+    """Latency of one GET /recommendations call, i.e. a single-user recommend()"""
+    contest_ids = list(recommender._rows)
+    # The first call after a change also copies the upcoming rows
+    started = time.perf_counter()
+    recommender.recommend([random.sample(contest_ids, bookmarks)], now=now)
+    cold = time.perf_counter() - started
+
+    timings = []
+    for _ in range(users):
+        user_bookmarks = random.sample(contest_ids, bookmarks)
+        started = time.perf_counter()
+        recommender.recommend([user_bookmarks], now=now)
+        timings.append(time.perf_counter() - started)
+    timings.sort()
+    return {
+        "cold_ms": cold * 1000,
+        "p50_ms": statistics.median(timings) * 1000,
+        "p99_ms": timings[int(len(timings) * 0.99) - 1] * 1000,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Measure per-user GET /recommendations scoring latency on synthetic contests"
+    )
+    parser.add_argument("--contests", type=int, default=100000)
+    parser.add_argument("--upcoming-share", type=float, default=0.5,
+                        help="Fraction of contests that have not started; only these are scored")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--bookmarks", type=int, default=5, help="Bookmarks per user")
+    args = parser.parse_args(argv)
+
+    random.seed(42)
+    now = datetime.utcnow()
+    started = time.perf_counter()
+    recommender = build(args.contests, args.upcoming_share, now)
+    print(f"Built {len(recommender)} contests in {time.perf_counter() - started:.1f}s")
+
+    result = measure(recommender, args.users, args.bookmarks, now)
+    print(
+        f"{args.contests} contests, {args.upcoming_share:.0%} upcoming, {args.bookmarks} bookmarks per user: "
+        f"p50 {result['p50_ms']:.2f} ms, p99 {result['p99_ms']:.2f} ms, "
+        f"first call after a change {result['cold_ms']:.2f} ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
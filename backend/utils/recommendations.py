@@ -0,0 +1,289 @@
+# utils/recommendations.py
+import logging
+import math
+import threading
+import zlib
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from models.database import SessionLocal
+from models.contests import Contest
+from models.contest_changes import ContestChange
+from utils.change_log import get_changes, CursorExpiredError
+from utils.search_index import tokenize
+
+logger = logging.getLogger(__name__)
+
+PLATFORMS = ["codeforces", "codechef", "leetcode"]
+# Upper bounds in minutes; longer contests fall in a final bin
+DURATION_BINS = [60, 100, 135, 180, 300, 1440]
+NAME_DIMS = 256
+
+# Feature blocks: (name, size, weight). Each block is L2-normalized and then
+# scaled, so the weights set how much each kind of similarity counts.
+BLOCKS = [
+    ("platform", len(PLATFORMS) + 1, 1.0),
+    ("duration", len(DURATION_BINS) + 1, 0.5),
+    ("time_of_day", 2, 0.7),
+    ("weekday", 7, 0.3),
+    ("name", NAME_DIMS, 1.0),
+]
+_OFFSETS = {}
+_offset = 0
+for _name, _size, _ in BLOCKS:
+    _OFFSETS[_name] = _offset
+    _offset += _size
+FEATURE_DIMS = _offset
+
+_EPOCH = datetime(1970, 1, 1)
+# Rows per step when transposing the upcoming contests' features
+_TRANSPOSE_BLOCK = 256
+
+
+def _name_features(name: str) -> Dict[int, float]:
+    """Signed feature hashing of word unigrams and bigrams, ignoring round numbers"""
+    tokens = [token for token in tokenize(name) if not token.isdigit()]
+    grams = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+    features: Dict[int, float] = {}
+    for gram in grams:
+        # crc32 rather than hash(), which differs between processes
+        digest = zlib.crc32(gram.encode("utf-8"))
+        index = digest % NAME_DIMS
+        features[index] = features.get(index, 0.0) + (1.0 if digest & 0x80000000 else -1.0)
+    return features
+
+
+def contest_features(platform: str, name: str, start_time: datetime, duration: int) -> np.ndarray:
+    """Feature vector of a contest; each block's length is its weight"""
+    vector = np.zeros(FEATURE_DIMS, dtype=np.float32)
+    weights = {block: weight for block, _, weight in BLOCKS}
+
+    platform_index = PLATFORMS.index(platform) if platform in PLATFORMS else len(PLATFORMS)
+    vector[_OFFSETS["platform"] + platform_index] = weights["platform"]
+
+    duration_index = next((i for i, bound in enumerate(DURATION_BINS) if duration <= bound), len(DURATION_BINS))
+    vector[_OFFSETS["duration"] + duration_index] = weights["duration"]
+
+    # Hours on a circle, so 23:00 is close to 01:00
+    angle = 2 * math.pi * (start_time.hour * 60 + start_time.minute) / (24 * 60)
+    vector[_OFFSETS["time_of_day"]] = weights["time_of_day"] * math.cos(angle)
+    vector[_OFFSETS["time_of_day"] + 1] = weights["time_of_day"] * math.sin(angle)
+
+    vector[_OFFSETS["weekday"] + start_time.weekday()] = weights["weekday"]
+
+    name_features = _name_features(name)
+    norm = math.sqrt(sum(value * value for value in name_features.values()))
+    if norm:
+        for index, value in name_features.items():
+            vector[_OFFSETS["name"] + index] = weights["name"] * value / norm
+    return vector
+
+
+class ContestRecommender:
+    """
+    Ranks upcoming contests by similarity to the contests a user bookmarked
+
+    Every contest is a row of a float32 feature matrix, with its start time
+    and id kept in parallel arrays. A user's profile is the mean of their
+    bookmarked rows, and scoring is one matrix product between the profiles
+    and the features of contests that have not started yet. Those are cached
+    transposed, one contiguous array per feature, and profiles are sparse
+    (one-hot blocks and a few hashed name words), so a product only reads the
+    features some profile uses rather than the whole block. Removed contests
+    free their row for reuse instead of shifting the matrix.
+
+    Like the search index, the matrix follows the contest change log and only
+    pulls changes newer than its cursor.
+    """
+
+    def __init__(self, initial_capacity: int = 1024):
+        self._lock = threading.RLock()
+        self._initial_capacity = initial_capacity
+        self._reset()
+
+    def _reset(self) -> None:
+        self.cursor: Optional[int] = None
+        self._matrix = np.zeros((self._initial_capacity, FEATURE_DIMS), dtype=np.float32)
+        self._start = np.zeros(self._initial_capacity, dtype=np.float64)  # POSIX seconds, UTC
+        self._valid = np.zeros(self._initial_capacity, dtype=bool)
+        self._ids: List[Optional[str]] = [None] * self._initial_capacity
+        self._rows: Dict[str, int] = {}
+        self._free: List[int] = []
+        self._size = 0
+        # Rows and transposed features of contests that have not started,
+        # valid until the matrix changes or the earliest of them starts
+        self._candidates: Optional[Tuple[np.ndarray, np.ndarray]] = None
+        self._candidates_until = 0.0
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def _grow(self) -> None:
+        capacity = len(self._ids) * 2
+        matrix = np.zeros((capacity, FEATURE_DIMS), dtype=np.float32)
+        matrix[:self._size] = self._matrix[:self._size]
+        start = np.zeros(capacity, dtype=np.float64)
+        start[:self._size] = self._start[:self._size]
+        valid = np.zeros(capacity, dtype=bool)
+        valid[:self._size] = self._valid[:self._size]
+        self._matrix, self._start, self._valid = matrix, start, valid
+        self._ids.extend([None] * (capacity - len(self._ids)))
+
+    def upsert(self, contest_id: str, platform: str, name: str, start_time: datetime, duration: int) -> None:
+        with self._lock:
+            row = self._rows.get(contest_id)
+            if row is None:
+                if self._free:
+                    row = self._free.pop()
+                else:
+                    if self._size == len(self._ids):
+                        self._grow()
+                    row = self._size
+                    self._size += 1
+                self._rows[contest_id] = row
+                self._ids[row] = contest_id
+            self._matrix[row] = contest_features(platform, name, start_time, duration)
+            self._start[row] = (start_time - _EPOCH).total_seconds()
+            self._valid[row] = True
+            self._candidates = None
+
+    def remove(self, contest_id: str) -> None:
+        with self._lock:
+            row = self._rows.pop(contest_id, None)
+            if row is not None:
+                self._valid[row] = False
+                self._ids[row] = None
+                self._free.append(row)
+                self._candidates = None
+
+    def rebuild(self, db: Session) -> None:
+        """Compute the feature rows of every contest"""
+        with self._lock:
+            # Take the cursor first; changes racing the load are re-applied later
+            head = db.query(func.max(ContestChange.id)).scalar() or 0
+            self._reset()
+            rows = db.query(
+                Contest.id, Contest.platform, Contest.name, Contest.start_time, Contest.duration
+            ).yield_per(1000)
+            for row in rows:
+                self.upsert(*row)
+            self.cursor = head
+            logger.info(f"Built contest recommendation matrix with {len(self._rows)} contests")
+
+    def sync(self, db: Session) -> None:
+        """Apply change log entries newer than the matrix cursor"""
+        with self._lock:
+            if self.cursor is None:
+                self.rebuild(db)
+                return
+            head = db.query(func.max(ContestChange.id)).scalar() or 0
+            if head <= self.cursor:
+                return
+            try:
+                while True:
+                    page = get_changes(db, since=self.cursor, limit=5000)
+                    for change in page["changes"]:
+                        contest = change["contest"]
+                        if contest is None:
+                            self.remove(change["contest_id"])
+                        else:
+                            self.upsert(
+                                contest["id"], contest["platform"], contest["name"],
+                                datetime.fromisoformat(contest["start_time"]), contest["duration"]
+                            )
+                    self.cursor = page["cursor"]
+                    if not page["has_more"]:
+                        break
+            except CursorExpiredError:
+                self.rebuild(db)
+
+    def _upcoming(self, now_seconds: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Row numbers and a (features, candidates) copy of the features of contests starting after now"""
+        if self._candidates is None or now_seconds >= self._candidates_until:
+            n = self._size
+            rows = np.flatnonzero(self._valid[:n] & (self._start[:n] > now_seconds))
+            # Transposed a block of rows at a time, which stays in cache and
+            # is about twice as fast as transposing the whole copy at once
+            features_t = np.empty((FEATURE_DIMS, len(rows)), dtype=np.float32)
+            for start in range(0, len(rows), _TRANSPOSE_BLOCK):
+                block = rows[start:start + _TRANSPOSE_BLOCK]
+                features_t[:, start:start + len(block)] = self._matrix[block].T
+            self._candidates = (rows, features_t)
+            self._candidates_until = float(self._start[rows].min()) if len(rows) else math.inf
+        return self._candidates
+
+    def recommend(
+        self,
+        bookmarks: Sequence[Sequence[str]],
+        limit: int = 10,
+        now: Optional[datetime] = None
+    ) -> List[List[Tuple[str, float]]]:
+        """
+        Rank upcoming contests for a batch of users
+
+        Args:
+            bookmarks: Bookmarked contest ids, one list per user
+
+        Returns:
+            List[List[Tuple[str, float]]]: Per user, up to limit (contest id,
+            score) pairs, best first. Users without usable bookmarks get the
+            soonest upcoming contests with a score of 0.
+        """
+        now = now or datetime.utcnow()
+        now_seconds = (now - _EPOCH).total_seconds()
+        with self._lock:
+            candidates, features_t = self._upcoming(now_seconds)
+            if not len(candidates):
+                return [[] for _ in bookmarks]
+
+            profiles = np.zeros((len(bookmarks), FEATURE_DIMS), dtype=np.float32)
+            has_profile = np.zeros(len(bookmarks), dtype=bool)
+            excluded = []
+            for i, contest_ids in enumerate(bookmarks):
+                rows = [self._rows[contest_id] for contest_id in contest_ids if contest_id in self._rows]
+                excluded.append(rows)
+                if rows:
+                    profiles[i] = self._matrix[rows].mean(axis=0)
+                    has_profile[i] = True
+
+            # (users, candidates) in a single product over the used features
+            used = np.flatnonzero(profiles.any(axis=0))
+            scores = profiles[:, used] @ features_t[used]
+            soonest = None
+            ids = self._ids
+
+            results = []
+            for i in range(len(bookmarks)):
+                if not has_profile[i]:
+                    if soonest is None:
+                        soonest = np.argsort(self._start[candidates], kind="stable")
+                    order = soonest[:limit]
+                    results.append([(ids[candidates[j]], 0.0) for j in order])
+                    continue
+                row_scores = scores[i]
+                if excluded[i]:
+                    row_scores[np.isin(candidates, excluded[i])] = -np.inf
+                k = min(limit, len(candidates))
+                top = np.argpartition(-row_scores, k - 1)[:k]
+                top = top[np.argsort(-row_scores[top], kind="stable")]
+                results.append([
+                    (ids[candidates[j]], float(row_scores[j])) for j in top if np.isfinite(row_scores[j])
+                ])
+            return results
+
+    def on_contests_changed(self, events: List[Dict[str, Any]]) -> None:
+        """Ingestion listener catching the matrix up right after a commit"""
+        if self.cursor is None:
+            return
+        db = SessionLocal()
+        try:
+            self.sync(db)
+        finally:
+            db.close()
+
+
+recommender = ContestRecommender()
@@ -0,0 +1,77 @@
+# utils/retention.py
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import exists, insert, select
+from sqlalchemy.orm import Session
+
+from models.contests import Contest, ArchivedContest
+from models.bookmarks import Bookmark
+from utils.change_log import record_removals
+
+logger = logging.getLogger(__name__)
+
+# Past contests that ended longer ago than this are moved to contests_archive
+RETENTION_DAYS = int(os.getenv("CONTEST_RETENTION_DAYS", "90"))
+
+_COLUMNS = [column.name for column in Contest.__table__.columns]
+
+
+def archive_past_contests(db: Session, now: Optional[datetime] = None, batch_size: int = 1000) -> int:
+    """
+    Move old past contests into contests_archive
+
+    Bookmarked contests stay in the contests table, so bookmarks keep working
+    without looking at the archive. Rows are moved in batches with set-based
+    INSERT ... SELECT and DELETE statements, each batch in its own transaction
+    together with its change log entries.
+
+    Returns:
+        int: Number of archived contests
+    """
+    now = now or datetime.utcnow()
+    cutoff = now - timedelta(days=RETENTION_DAYS)
+    archive_columns = [ArchivedContest.__table__.c[name] for name in _COLUMNS]
+    contest_columns = [Contest.__table__.c[name] for name in _COLUMNS]
+
+    total = 0
+    while True:
+        ids = [row[0] for row in db.query(Contest.id).filter(
+            Contest.status == "past",
+            Contest.end_time < cutoff,
+            ~exists().where(Bookmark.contest_id == Contest.id)
+        ).limit(batch_size)]
+        if not ids:
+            break
+
+        db.execute(insert(ArchivedContest).from_select(
+            archive_columns,
+            select(*contest_columns).where(Contest.id.in_(ids))
+        ))
+        db.query(Contest).filter(Contest.id.in_(ids)).delete(synchronize_session=False)
+        record_removals(db, ids, "archived")
+        db.commit()
+        total += len(ids)
+
+    if total:
+        logger.info(f"Archived {total} contests that ended before {cutoff}")
+    return total
+
+
+def restore_contest(db: Session, contest_id: str) -> Optional[Contest]:
+    """
+    Move an archived contest back into the contests table
+
+    Used when an archived contest is bookmarked. Does not commit.
+    """
+    archived = db.query(ArchivedContest).filter(ArchivedContest.id == contest_id).first()
+    if not archived:
+        return None
+
+    contest = Contest(**{name: getattr(archived, name) for name in _COLUMNS})
+    db.delete(archived)
+    db.add(contest)
+    db.flush()
+    return contest
@@ -0,0 +1,348 @@
+# utils/search_index.py
+import bisect
+import itertools
+import logging
+import re
+import threading
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import func, select, union_all
+from sqlalchemy.orm import Session
+
+from models.database import SessionLocal
+from models.contests import Contest, ArchivedContest
+from models.contest_changes import ContestChange
+from utils.change_log import get_changes, CursorExpiredError
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# Weights of the different ways a query token can match a name token
+EXACT_WEIGHT = 1.0
+PREFIX_WEIGHT = 0.8
+FUZZY_WEIGHT = 0.6
+# Minimum trigram similarity for a fuzzy match
+FUZZY_THRESHOLD = 0.4
+# Longer queries are rejected, as every token multiplies the ranking work
+MAX_QUERY_TOKENS = 8
+
+
+class QueryTooLongError(ValueError):
+    """Raised for search queries with more than MAX_QUERY_TOKENS distinct words"""
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN_RE.findall(text.lower())
+
+
+def query_tokens(query: str) -> List[str]:
+    """
+    Distinct tokens of a search query, in order
+
+    Raises:
+        QueryTooLongError: When there are more than MAX_QUERY_TOKENS of them
+    """
+    tokens = list(dict.fromkeys(tokenize(query)))
+    if len(tokens) > MAX_QUERY_TOKENS:
+        raise QueryTooLongError(f"Search queries are limited to {MAX_QUERY_TOKENS} words")
+    return tokens
+
+
+def trigrams(token: str) -> Set[str]:
+    padded = f"  {token} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _iter_bits_desc(mask: int):
+    """Yield set bit positions from the highest down"""
+    while mask:
+        bit = mask.bit_length() - 1
+        yield bit
+        mask ^= 1 << bit
+
+
+class ContestSearchIndex:
+    """
+    In-memory inverted index over contest names
+
+    Every contest gets a small integer slot and each name token maps to a
+    bitmask of the slots containing it, so AND/OR across tokens are plain
+    integer operations. The sorted token list answers prefix queries with
+    bisect, and a trigram index over the (comparatively few) distinct tokens
+    finds fuzzy matches for misspelled query words. Slots are handed out in
+    start_time order on rebuild, so higher slots are the more recent contests.
+    Slots freed by removals are reused, so the masks do not keep growing as
+    contests move to the archive, at the cost of that order only holding
+    approximately between rebuilds.
+
+    Archived contests are indexed too. The index follows the contest change
+    log: it remembers the cursor it has applied up to and pulls only newer
+    changes before answering a query. Rows added to contests_archive, which
+    the change log only records as removals (or not at all for contests
+    archived straight from the full history), are picked up by archived_at.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._reset()
+
+    def _reset(self) -> None:
+        self.cursor: Optional[int] = None
+        self.archived_until: Optional[datetime] = None
+        self._slots: Dict[str, int] = {}
+        self._docs: Dict[int, Tuple[str, Tuple[str, ...], str]] = {}
+        self._next_slot = 0
+        self._free: List[int] = []
+        self._postings: Dict[str, int] = {}
+        self._platforms: Dict[str, int] = defaultdict(int)
+        self._gram_tokens: Dict[str, Set[str]] = defaultdict(set)
+        self._sorted_tokens: List[str] = []
+        self._sorted_dirty = False
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def upsert(self, doc_id: str, name: str, platform: str) -> None:
+        with self._lock:
+            slot = self._slots.get(doc_id)
+            if slot is None:
+                if self._free:
+                    slot = self._free.pop()
+                else:
+                    slot = self._next_slot
+                    self._next_slot += 1
+                self._slots[doc_id] = slot
+            else:
+                self._clear_slot(slot)
+
+            bit = 1 << slot
+            tokens = tuple(dict.fromkeys(tokenize(name)))
+            self._docs[slot] = (doc_id, tokens, platform)
+            self._platforms[platform] |= bit
+            for token in tokens:
+                mask = self._postings.get(token)
+                if mask is None:
+                    mask = 0
+                    for gram in trigrams(token):
+                        self._gram_tokens[gram].add(token)
+                    self._sorted_dirty = True
+                self._postings[token] = mask | bit
+
+    def remove(self, doc_id: str) -> None:
+        with self._lock:
+            slot = self._slots.pop(doc_id, None)
+            if slot is not None:
+                self._clear_slot(slot)
+                self._free.append(slot)
+
+    def _clear_slot(self, slot: int) -> None:
+        doc = self._docs.pop(slot, None)
+        if doc is None:
+            return
+        _, tokens, platform = doc
+        keep = ~(1 << slot)
+        self._platforms[platform] &= keep
+        for token in tokens:
+            mask = self._postings[token] & keep
+            if mask:
+                self._postings[token] = mask
+                continue
+            del self._postings[token]
+            for gram in trigrams(token):
+                grams = self._gram_tokens.get(gram)
+                if grams is not None:
+                    grams.discard(token)
+                    if not grams:
+                        del self._gram_tokens[gram]
+            self._sorted_dirty = True
+
+    def rebuild(self, db: Session) -> None:
+        """Reload every contest and archived contest name from the database"""
+        with self._lock:
+            # Take the cursors first; changes racing the load are re-applied later
+            head = db.query(func.max(ContestChange.id)).scalar() or 0
+            archived_until = db.query(func.max(ArchivedContest.archived_at)).scalar()
+            self._reset()
+            names = union_all(
+                select(Contest.id, Contest.name, Contest.platform, Contest.start_time),
+                select(ArchivedContest.id, ArchivedContest.name, ArchivedContest.platform, ArchivedContest.start_time),
+            ).subquery()
+            rows = db.execute(
+                select(names.c.id, names.c.name, names.c.platform).order_by(names.c.start_time.asc())
+            ).yield_per(1000)
+            for doc_id, name, platform in rows:
+                self.upsert(doc_id, name, platform)
+            self.cursor = head
+            self.archived_until = archived_until
+            logger.info(f"Built contest search index with {len(self._docs)} contests")
+
+    def sync(self, db: Session) -> None:
+        """Apply change log entries newer than the index cursor, then newly archived contests"""
+        with self._lock:
+            if self.cursor is None:
+                self.rebuild(db)
+                return
+            self._sync_changes(db)
+            self._sync_archive(db)
+
+    def _sync_changes(self, db: Session) -> None:
+        head = db.query(func.max(ContestChange.id)).scalar() or 0
+        if head <= self.cursor:
+            return
+        try:
+            while True:
+                page = get_changes(db, since=self.cursor, limit=5000)
+                for change in page["changes"]:
+                    contest = change["contest"]
+                    if contest is None:
+                        self.remove(change["contest_id"])
+                    else:
+                        self.upsert(contest["id"], contest["name"], contest["platform"])
+                self.cursor = page["cursor"]
+                if not page["has_more"]:
+                    break
+        except CursorExpiredError:
+            self.rebuild(db)
+
+    def _sync_archive(self, db: Session) -> None:
+        archived_until = db.query(func.max(ArchivedContest.archived_at)).scalar()
+        if archived_until is None or (self.archived_until is not None and archived_until <= self.archived_until):
+            return
+        query = db.query(ArchivedContest.id, ArchivedContest.name, ArchivedContest.platform)
+        if self.archived_until is not None:
+            # Inclusive, as a later batch may share the last seen timestamp
+            query = query.filter(ArchivedContest.archived_at >= self.archived_until)
+        for doc_id, name, platform in query.yield_per(1000):
+            self.upsert(doc_id, name, platform)
+        self.archived_until = archived_until
+
+    def _match_token(self, token: str) -> List[Tuple[float, int]]:
+        """
+        Return (weight, mask) tiers for a single query token
+
+        Tiers are disjoint and ordered from the strongest to the weakest match.
+        """
+        if self._sorted_dirty:
+            self._sorted_tokens = sorted(self._postings)
+            self._sorted_dirty = False
+
+        exact = self._postings.get(token, 0)
+        tiers = [(EXACT_WEIGHT, exact)] if exact else []
+        seen = exact
+
+        prefix = 0
+        start = bisect.bisect_left(self._sorted_tokens, token)
+        for candidate in itertools.islice(self._sorted_tokens, start, None):
+            if not candidate.startswith(token):
+                break
+            prefix |= self._postings[candidate]
+        prefix &= ~seen
+        if prefix:
+            tiers.append((PREFIX_WEIGHT, prefix))
+            seen |= prefix
+
+        if len(token) >= 3:
+            grams = trigrams(token)
+            shared: Dict[str, int] = defaultdict(int)
+            for gram in grams:
+                for candidate in self._gram_tokens.get(gram, ()):
+                    shared[candidate] += 1
+            # Bucket similarities to one decimal so the number of tiers stays small
+            buckets: Dict[float, int] = defaultdict(int)
+            for candidate, common in shared.items():
+                similarity = common / (len(grams) + len(candidate) + 1 - common)
+                if similarity >= FUZZY_THRESHOLD and not candidate.startswith(token):
+                    buckets[round(similarity, 1)] |= self._postings[candidate]
+            for similarity in sorted(buckets, reverse=True):
+                mask = buckets[similarity] & ~seen
+                if mask:
+                    tiers.append((FUZZY_WEIGHT * similarity, mask))
+                    seen |= mask
+
+        return tiers
+
+    def search(self, query: str, platforms: Optional[List[str]] = None, limit: int = 20) -> List[Tuple[str, float]]:
+        """
+        Rank contests against a free-text query
+
+        The score is the average match weight over the query tokens. Contests
+        matching every token are preferred; if there are none, contests
+        matching any token are returned instead. Ties go to recent contests.
+
+        Returns:
+            List[Tuple[str, float]]: (contest id, score) pairs, best first
+
+        Raises:
+            QueryTooLongError: When the query has more than MAX_QUERY_TOKENS distinct words
+        """
+        tokens = query_tokens(query)
+        if not tokens:
+            return []
+
+        with self._lock:
+            allowed = -1
+            if platforms:
+                allowed = 0
+                for platform in platforms:
+                    allowed |= self._platforms.get(platform, 0)
+
+            per_token = [self._match_token(token) for token in tokens]
+            token_masks = []
+            for tiers in per_token:
+                token_mask = 0
+                for _, mask in tiers:
+                    token_mask |= mask
+                token_masks.append(token_mask)
+
+            candidates = allowed
+            for token_mask in token_masks:
+                candidates &= token_mask
+            options = per_token
+            if not candidates:
+                # Fall back to contests matching any token; a zero-weight tier
+                # covers the contests a given token did not match
+                candidates = 0
+                for token_mask in token_masks:
+                    candidates |= token_mask
+                candidates &= allowed
+                options = [tiers + [(0.0, ~token_mask)] for tiers, token_mask in zip(per_token, token_masks)]
+
+            # Add up the tier weights token by token, keeping one mask per
+            # distinct total. Tiers of a token are disjoint, so every contest
+            # is in exactly one group and there are never more groups than
+            # distinct totals or candidates.
+            totals: Dict[float, int] = {0.0: candidates}
+            for tiers in options:
+                next_totals: Dict[float, int] = defaultdict(int)
+                for total, group_mask in totals.items():
+                    for weight, tier_mask in tiers:
+                        mask = group_mask & tier_mask
+                        if mask:
+                            next_totals[round(total + weight, 6)] |= mask
+                totals = next_totals
+            groups = sorted(totals.items(), reverse=True)
+
+            results = []
+            for total, mask in groups:
+                score = total / len(tokens)
+                for slot in _iter_bits_desc(mask):
+                    results.append((self._docs[slot][0], score))
+                    if len(results) >= limit:
+                        return results
+        return results
+
+    def on_contests_changed(self, events: List[Dict[str, Any]]) -> None:
+        """Ingestion listener catching the index up right after a commit"""
+        if self.cursor is None:
+            return
+        db = SessionLocal()
+        try:
+            self.sync(db)
+        finally:
+            db.close()
+
+
+search_index = ContestSearchIndex()
@@ -0,0 +1,172 @@
+# utils/solution_import.py
+import csv
+import json
+import logging
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import case, func, tuple_, update
+from sqlalchemy.orm import Session
+
+from models.contests import Contest
+from utils.ingestion import commit_changes
+
+logger = logging.getLogger(__name__)
+
+# Largest IN list / CASE mapping sent in a single statement
+CHUNK_SIZE = 1000
+# Upper bound on rows accepted by a single import
+MAX_IMPORT_ROWS = 20000
+# Upper bound on the characters of one line; real rows are well under 1 KB
+MAX_IMPORT_LINE_LENGTH = 8192
+
+FIELDS = ("platform", "contest_id", "name", "solution_url")
+
+
+class InvalidHeaderError(ValueError):
+    """Raised when a CSV import does not start with a usable header row"""
+
+
+class SolutionRowParser:
+    """
+    Parse solution import rows one line at a time
+
+    CSV input needs a header row naming at least solution_url and either
+    platform and contest_id or name. NDJSON input has one object per line with
+    the same keys. Blank lines are skipped.
+    """
+
+    def __init__(self, format: str):
+        if format not in ("csv", "ndjson"):
+            raise ValueError(f"Unsupported import format: {format}")
+        self.format = format
+        self._header: Optional[List[str]] = None
+
+    def parse(self, line: str) -> Optional[Dict[str, Any]]:
+        """
+        Return the row for a line, or None for blank and header lines
+
+        Raises:
+            ValueError: If the line cannot be parsed
+        """
+        if not line.strip():
+            return None
+
+        if self.format == "ndjson":
+            try:
+                data = json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"Invalid JSON: {e}")
+            if not isinstance(data, dict):
+                raise ValueError("Expected a JSON object")
+        else:
+            values = next(csv.reader([line]))
+            if self._header is None:
+                self._header = [value.strip().lower() for value in values]
+                if "solution_url" not in self._header:
+                    raise InvalidHeaderError("CSV header must contain solution_url")
+                return None
+            data = dict(zip(self._header, values))
+
+        row = {field: (str(data[field]).strip() if data.get(field) is not None else "") for field in FIELDS}
+        if not row["solution_url"]:
+            raise ValueError("Missing solution_url")
+        if not (row["platform"] and row["contest_id"]) and not row["name"]:
+            raise ValueError("Row needs platform and contest_id, or name")
+        return row
+
+
+def _chunks(items: List[Any]):
+    for i in range(0, len(items), CHUNK_SIZE):
+        yield items[i:i + CHUNK_SIZE]
+
+
+def import_solution_urls(db: Session, rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Set solution URLs for many contests in one transaction
+
+    Rows are matched by (platform, contest_id) when both are given, otherwise
+    by case-insensitive name (narrowed by platform if given); a name matching
+    several contests is reported as ambiguous. Later rows win over earlier
+    rows for the same contest. Matched contests whose URL actually changes are
+    updated with one CASE-based UPDATE per chunk, and listeners are notified
+    once for the whole import.
+
+    Args:
+        rows: Parsed rows, each with a "line" number for reporting
+
+    Returns:
+        Dict[str, Any]: Counts of updated and unchanged contests, plus the
+        rows that could not be matched and why
+    """
+    by_key = [row for row in rows if row["platform"] and row["contest_id"]]
+    by_name = [row for row in rows if not (row["platform"] and row["contest_id"])]
+
+    contests: Dict[str, Contest] = {}
+    key_matches: Dict[tuple, Contest] = {}
+    keys = list({(row["platform"], row["contest_id"]) for row in by_key})
+    for chunk in _chunks(keys):
+        for contest in db.query(Contest).filter(tuple_(Contest.platform, Contest.contest_id).in_(chunk)):
+            key_matches[(contest.platform, contest.contest_id)] = contest
+            contests[contest.id] = contest
+
+    name_matches: Dict[str, List[Contest]] = defaultdict(list)
+    names = list({row["name"].lower() for row in by_name})
+    for chunk in _chunks(names):
+        for contest in db.query(Contest).filter(func.lower(Contest.name).in_(chunk)):
+            name_matches[contest.name.lower()].append(contest)
+            contests[contest.id] = contest
+
+    unmatched = []
+    urls: Dict[str, str] = {}
+    for row in rows:
+        if row["platform"] and row["contest_id"]:
+            contest = key_matches.get((row["platform"], row["contest_id"]))
+            candidates = [contest] if contest else []
+        else:
+            candidates = [
+                contest for contest in name_matches.get(row["name"].lower(), [])
+                if not row["platform"] or contest.platform == row["platform"]
+            ]
+        if len(candidates) != 1:
+            unmatched.append({
+                "line": row["line"],
+                "platform": row["platform"] or None,
+                "contest_id": row["contest_id"] or None,
+                "name": row["name"] or None,
+                "reason": "ambiguous name" if candidates else "contest not found",
+            })
+            continue
+        urls[candidates[0].id] = row["solution_url"]
+
+    changed = {
+        contest_id: url for contest_id, url in urls.items()
+        if contests[contest_id].solution_url != url
+    }
+
+    events = []
+    if changed:
+        now = datetime.utcnow()
+        for chunk in _chunks(list(changed)):
+            db.execute(
+                update(Contest)
+                .where(Contest.id.in_(chunk))
+                .values(
+                    solution_url=case({contest_id: changed[contest_id] for contest_id in chunk}, value=Contest.id),
+                    updated_at=now
+                )
+                .execution_options(synchronize_session=False)
+            )
+            # Reload the updated rows for the change log and listeners
+            for contest in db.query(Contest).filter(Contest.id.in_(chunk)).populate_existing():
+                events.append({"type": "solution", "contest": contest})
+    # One commit and one listener notification for the whole import
+    commit_changes(db, events)
+
+    logger.info(f"Imported solution URLs: {len(changed)} updated, {len(unmatched)} unmatched")
+    return {
+        "updated": len(changed),
+        "unchanged": len(urls) - len(changed),
+        "unmatched": unmatched,
+    }
@@ -0,0 +1,301 @@
+# utils/static_snapshots.py
+import glob
+import gzip
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from models.database import ReadSessionLocal
+from utils.contest_snapshot import ContestSnapshot, contest_snapshots
+
+try:
+    import brotli
+except ImportError:  # Only gzip encodings are written without brotli
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+STATIC_SNAPSHOT_DIR = os.getenv("STATIC_SNAPSHOT_DIR", os.path.join("static", "contests"))
+# Hashed files of this many previous renders are kept for clients still holding their names
+KEEP_PREVIOUS = 2
+
+PLATFORMS = ["codeforces", "codechef", "leetcode"]
+STATUSES = ["upcoming", "ongoing", "past"]
+
+# Stable names are revalidated often; hashed names never change content
+STABLE_CACHE_CONTROL = "public, max-age=60, must-revalidate"
+HASHED_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+# Content-Encoding -> file suffix, in order of preference
+ENCODINGS = {"br": ".br", "gzip": ".gz"}
+
+# Compression levels as (gzip, brotli). Renders triggered by a change use the
+# fast levels; the scheduled refresh re-encodes their files with the best ones.
+FAST_LEVELS = (6, 4)
+BEST_LEVELS = (9, 11)
+# Changes arriving within this window are rendered together
+RENDER_DELAY_SECONDS = float(os.getenv("STATIC_SNAPSHOT_DELAY_SECONDS", "2"))
+
+_FILE_RE = re.compile(r"^[a-z0-9-]+(\.[0-9a-f]{16})?\.json$")
+
+
+def variants() -> Dict[str, Dict[str, Any]]:
+    """The GET /contests variants rendered to files, by file name stem"""
+    result: Dict[str, Dict[str, Any]] = {"all": {}}
+    for platform in PLATFORMS:
+        result[f"platform-{platform}"] = {"platforms": [platform]}
+    for status in STATUSES:
+        result[f"status-{status}"] = {"status": status}
+    return result
+
+
+def _write_atomic(path: str, data: bytes) -> None:
+    temporary = f"{path}.tmp{os.getpid()}.{threading.get_ident()}"
+    with open(temporary, "wb") as f:
+        f.write(data)
+    os.replace(temporary, path)
+
+
+def _encode(body: bytes, levels: Tuple[int, int]) -> List[Tuple[str, bytes]]:
+    """Encodings of body, identity last so it replaces the stable file after its siblings"""
+    encoded = [("gzip", gzip.compress(body, compresslevel=levels[0], mtime=0))]
+    if brotli is not None:
+        encoded.insert(0, ("br", brotli.compress(body, quality=levels[1])))
+    encoded.append(("identity", body))
+    return encoded
+
+
+def _remove(path: str) -> None:
+    for candidate in [path] + [path + suffix for suffix in ENCODINGS.values()]:
+        try:
+            os.remove(candidate)
+        except FileNotFoundError:
+            pass
+
+
+def _current_snapshot() -> ContestSnapshot:
+    """
+    The current contest snapshot, read through a reader session
+
+    A writer session would take the SQLite write lock (BEGIN IMMEDIATE) on
+    its first query, and ingestion and bookmark writes would wait on it.
+    The session is closed before any file is compressed. The snapshot store
+    never steps back to an older version if a replica lags.
+    """
+    db = ReadSessionLocal()
+    try:
+        return contest_snapshots.get(db)
+    finally:
+        db.close()
+
+
+class StaticSnapshotWriter:
+    """
+    Renders the common GET /contests variants to pre-compressed files
+
+    For every variant, <name>.json holds the latest body and
+    <name>.<hash>.json an immutable, content-addressed copy, each with .gz and
+    .br siblings. manifest.json maps variants to their hashed files and the
+    snapshot version they came from. Everything lives on disk, so a web
+    server in front of the app can serve the directory directly.
+
+    Ingestion only marks the files stale. A background thread renders them
+    once changes stop arriving for RENDER_DELAY_SECONDS, so request handlers
+    that commit contest changes never wait for compression.
+    """
+
+    def __init__(self, directory: str = STATIC_SNAPSHOT_DIR):
+        self.directory = directory
+        self._lock = threading.Lock()
+        self.version: Optional[int] = None
+        # Variant name -> (digest, compression levels) of its stable file
+        self._digests: Dict[str, Tuple[str, Tuple[int, int]]] = {}
+        self._stale = threading.Event()
+        self._worker_lock = threading.Lock()
+        self._worker: Optional[threading.Thread] = None
+
+    def render(
+        self,
+        snapshot: ContestSnapshot,
+        force: bool = False,
+        levels: Tuple[int, int] = BEST_LEVELS
+    ) -> bool:
+        """
+        Write every variant of the snapshot unless it was already rendered
+
+        force re-renders an already rendered version, which moves the window
+        of the past variant forward. Only variants whose body changed, or
+        that were compressed with lower levels, are written again.
+
+        Returns:
+            bool: Whether the snapshot was rendered
+        """
+        with self._lock:
+            if snapshot.version == self.version and not force:
+                return False
+            os.makedirs(self.directory, exist_ok=True)
+
+            manifest = {"version": snapshot.version, "files": {}}
+            for name, filters in variants().items():
+                body = snapshot.query(**filters)
+                digest = hashlib.sha256(body).hexdigest()[:16]
+                hashed = f"{name}.{digest}.json"
+                manifest["files"][name] = hashed
+                rendered = self._digests.get(name)
+                if rendered and rendered[0] == digest and rendered[1] >= levels:
+                    continue
+
+                hashed_path = os.path.join(self.directory, hashed)
+                stable_path = os.path.join(self.directory, f"{name}.json")
+                if rendered and rendered[0] == digest:
+                    # Same body, compressed better this time
+                    write_hashed = True
+                else:
+                    write_hashed = not os.path.exists(hashed_path)
+                    if not write_hashed:
+                        # Content went back to an earlier body; keep it from being pruned
+                        os.utime(hashed_path)
+                for encoding, data in _encode(body, levels):
+                    suffix = ENCODINGS.get(encoding, "")
+                    if write_hashed:
+                        _write_atomic(hashed_path + suffix, data)
+                    _write_atomic(stable_path + suffix, data)
+                self._digests[name] = (digest, levels)
+                self._prune(name)
+
+            _write_atomic(
+                os.path.join(self.directory, "manifest.json"),
+                json.dumps(manifest, separators=(",", ":")).encode("utf-8")
+            )
+            self.version = snapshot.version
+            logger.info(f"Rendered static contest snapshots for v{snapshot.version}")
+            return True
+
+    def _prune(self, name: str) -> None:
+        hashed = glob.glob(os.path.join(self.directory, f"{name}.*.json"))
+        hashed.sort(key=os.path.getmtime, reverse=True)
+        for path in hashed[KEEP_PREVIOUS + 1:]:
+            _remove(path)
+
+    def on_contests_changed(self, events: List[Dict[str, Any]]) -> None:
+        """Ingestion listener scheduling a render on the background thread"""
+        # Not self._lock, which a render holds for its whole duration
+        with self._worker_lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._work, name="static-snapshots", daemon=True)
+                self._worker.start()
+        self._stale.set()
+
+    def _work(self) -> None:
+        while True:
+            self._stale.wait()
+            # Let a burst of commits, such as an import's batches, settle
+            # first, but do not put the render off indefinitely
+            deadline = time.monotonic() + 10 * RENDER_DELAY_SECONDS
+            while True:
+                self._stale.clear()
+                time.sleep(RENDER_DELAY_SECONDS)
+                if not self._stale.is_set() or time.monotonic() >= deadline:
+                    break
+            try:
+                self.render(_current_snapshot(), levels=FAST_LEVELS)
+            except Exception as e:
+                logger.error(f"Error rendering static contest snapshots: {e}")
+
+    def refresh(self) -> None:
+        """Scheduled re-render keeping the past variant's window current"""
+        self.render(_current_snapshot(), force=True)
+
+
+class StaticSnapshotApp:
+    """
+    ASGI app serving the rendered files without touching the database
+
+    Picks the best pre-compressed encoding the client accepts, sets a
+    content-hash ETag and answers If-None-Match with 304. File contents are
+    cached in memory and reloaded when any encoding of the file changes on
+    disk.
+    """
+
+    def __init__(self, directory: str = STATIC_SNAPSHOT_DIR):
+        self.directory = directory
+        # name -> (mtimes of every encoding, etag, {encoding: body})
+        self._cache: Dict[str, Tuple[Tuple[int, ...], str, Dict[str, bytes]]] = {}
+
+    def _load(self, name: str) -> Optional[Tuple[str, Dict[str, bytes]]]:
+        path = os.path.join(self.directory, name)
+        mtimes = []
+        for suffix in [""] + list(ENCODINGS.values()):
+            try:
+                mtimes.append(os.stat(path + suffix).st_mtime_ns)
+            except FileNotFoundError:
+                mtimes.append(0)
+        if not mtimes[0]:
+            return None
+        mtimes = tuple(mtimes)
+        cached = self._cache.get(name)
+        if cached and cached[0] == mtimes:
+            return cached[1], cached[2]
+
+        bodies = {}
+        for encoding, suffix in [("identity", "")] + list(ENCODINGS.items()):
+            try:
+                with open(path + suffix, "rb") as f:
+                    bodies[encoding] = f.read()
+            except FileNotFoundError:
+                pass
+        if "identity" not in bodies:
+            return None
+        etag = hashlib.sha256(bodies["identity"]).hexdigest()[:16]
+        self._cache[name] = (mtimes, etag, bodies)
+        return etag, bodies
+
+    async def __call__(self, scope, receive, send) -> None:
+        assert scope["type"] == "http"
+        name = scope["path"].rsplit("/", 1)[-1]
+        headers = {key.decode("latin-1"): value.decode("latin-1") for key, value in scope["headers"]}
+
+        loaded = _FILE_RE.match(name) and self._load(name)
+        if scope["method"] not in ("GET", "HEAD") or not loaded:
+            headers = [(b"content-length", b"0")]
+            if loaded:
+                headers.append((b"allow", b"GET, HEAD"))
+            await send({"type": "http.response.start", "status": 405 if loaded else 404, "headers": headers})
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        etag, bodies = loaded
+        cache_control = STABLE_CACHE_CONTROL if name.count(".") == 1 else HASHED_CACHE_CONTROL
+        response_headers = [
+            (b"etag", f'"{etag}"'.encode()),
+            (b"cache-control", cache_control.encode()),
+            (b"vary", b"Accept-Encoding"),
+        ]
+        if f'"{etag}"' in headers.get("if-none-match", ""):
+            await send({"type": "http.response.start", "status": 304, "headers": response_headers})
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        accepted = {
+            part.split(";")[0].strip()
+            for part in headers.get("accept-encoding", "").split(",")
+            if not part.strip().endswith(";q=0")
+        }
+        encoding = next((encoding for encoding in ENCODINGS if encoding in accepted and encoding in bodies), "identity")
+        body = bodies[encoding]
+        response_headers += [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+        ]
+        if encoding != "identity":
+            response_headers.append((b"content-encoding", encoding.encode()))
+        await send({"type": "http.response.start", "status": 200, "headers": response_headers})
+        await send({"type": "http.response.body", "body": b"" if scope["method"] == "HEAD" else body})
+
+
+static_snapshots = StaticSnapshotWriter()
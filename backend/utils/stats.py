@@ -0,0 +1,195 @@
+# utils/stats.py
+import logging
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Tuple
+
+from sqlalchemy import inspect, text
+from sqlalchemy.orm import Session
+
+from models.contests import Contest, ArchivedContest
+from models.bookmarks import Bookmark
+from models.contest_stats import PlatformWeekStat, ContestBookmarkCount
+from utils.upsert import upsert_increment
+
+logger = logging.getLogger(__name__)
+
+WeekKey = Tuple[str, datetime]
+
+
+def week_start(moment: datetime) -> datetime:
+    """Monday 00:00 of the week containing moment"""
+    day = moment - timedelta(days=moment.weekday())
+    return day.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _apply_week_deltas(db: Session, deltas: Dict[WeekKey, List[int]]) -> None:
+    touched = []
+    for (platform, week), (count, duration) in deltas.items():
+        if count or duration:
+            upsert_increment(
+                db, PlatformWeekStat,
+                {"platform": platform, "week_start": week},
+                {"contest_count": count, "total_duration": duration}
+            )
+            touched.append(week)
+    if touched:
+        db.query(PlatformWeekStat).filter(
+            PlatformWeekStat.week_start.in_(touched),
+            PlatformWeekStat.contest_count <= 0
+        ).delete(synchronize_session=False)
+
+
+def _old_value(contest: Contest, field: str) -> Any:
+    history = inspect(contest).attrs[field].history
+    if history.deleted:
+        return history.deleted[0]
+    return getattr(contest, field)
+
+
+def apply_contest_deltas(db: Session, events: List[Dict[str, Any]]) -> None:
+    """
+    Update the platform/week aggregates for ingestion events
+
+    Must run before the session is flushed, as updated contests are compared
+    against their attribute history. Contests restored from the archive are
+    already counted and are skipped.
+    """
+    deltas: Dict[WeekKey, List[int]] = defaultdict(lambda: [0, 0])
+    for event in events:
+        if event["type"] != "ingest" or event.get("restored"):
+            continue
+        contest = event["contest"]
+        if not event.get("created"):
+            if not {"platform", "start_time", "duration"} & set(event.get("changed", ())):
+                continue
+            old = deltas[(_old_value(contest, "platform"), week_start(_old_value(contest, "start_time")))]
+            old[0] -= 1
+            old[1] -= _old_value(contest, "duration")
+        new = deltas[(contest.platform, week_start(contest.start_time))]
+        new[0] += 1
+        new[1] += contest.duration
+    _apply_week_deltas(db, deltas)
+
+
+def _apply_row_deltas(db: Session, contests: Iterable[Tuple[str, datetime, int]], sign: int) -> None:
+    deltas: Dict[WeekKey, List[int]] = defaultdict(lambda: [0, 0])
+    for platform, start_time, duration in contests:
+        delta = deltas[(platform, week_start(start_time))]
+        delta[0] += sign
+        delta[1] += sign * duration
+    _apply_week_deltas(db, deltas)
+
+
+def add_contest_stats(db: Session, contests: Iterable[Tuple[str, datetime, int]]) -> None:
+    """Count contests inserted outside ingestion, given as (platform, start_time, duration) rows"""
+    _apply_row_deltas(db, contests, 1)
+
+
+def remove_contest_stats(db: Session, contests: Iterable[Tuple[str, datetime, int]]) -> None:
+    """Subtract deleted contests, given as (platform, start_time, duration) rows"""
+    _apply_row_deltas(db, contests, -1)
+
+
+def apply_bookmark_delta(db: Session, contest_id: str, delta: int) -> None:
+    """Adjust the bookmark count of a contest in the current transaction"""
+    upsert_increment(db, ContestBookmarkCount, {"contest_id": contest_id}, {"bookmark_count": delta})
+    if delta < 0:
+        db.query(ContestBookmarkCount).filter(
+            ContestBookmarkCount.contest_id == contest_id,
+            ContestBookmarkCount.bookmark_count <= 0
+        ).delete(synchronize_session=False)
+
+
+def compute_stats(db: Session) -> Tuple[Dict[WeekKey, Tuple[int, int]], Dict[str, int]]:
+    """Recompute both aggregates from the base tables"""
+    weeks: Dict[WeekKey, List[int]] = defaultdict(lambda: [0, 0])
+    for model in (Contest, ArchivedContest):
+        rows = db.query(model.platform, model.start_time, model.duration).yield_per(5000)
+        for platform, start_time, duration in rows:
+            totals = weeks[(platform, week_start(start_time))]
+            totals[0] += 1
+            totals[1] += duration
+
+    counts: Dict[str, int] = defaultdict(int)
+    for (contest_id,) in db.query(Bookmark.contest_id).yield_per(5000):
+        counts[contest_id] += 1
+
+    return {key: tuple(value) for key, value in weeks.items()}, dict(counts)
+
+
+def _diff(expected: Dict[Any, Any], actual: Dict[Any, Any]) -> Dict[str, int]:
+    keys = expected.keys() | actual.keys()
+    return {
+        "missing": sum(1 for key in keys if key not in actual),
+        "extra": sum(1 for key in keys if key not in expected),
+        "mismatched": sum(1 for key in keys if key in expected and key in actual and expected[key] != actual[key]),
+    }
+
+
+def _lock_aggregates(db: Session) -> None:
+    """
+    Make delta writers wait for the current transaction
+
+    Ingestion and bookmark writes change a base table and its aggregate in
+    one transaction. With the aggregates locked before the base tables are
+    read, each of those transactions either committed before the rebuild
+    read them or applies its delta on top of the repaired rows, so none is
+    lost or counted twice. On SQLite the writer engine already begins with
+    BEGIN IMMEDIATE, which holds the database write lock from the first
+    statement.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(text(
+            f"LOCK TABLE {PlatformWeekStat.__tablename__}, {ContestBookmarkCount.__tablename__} IN EXCLUSIVE MODE"
+        ))
+
+
+def check_stats(db: Session, repair: bool = False) -> Dict[str, Any]:
+    """
+    Rebuild the aggregates from scratch and diff them against the stored ones
+
+    With repair, tables that differ are replaced by the rebuilt values in a
+    single transaction, which holds off concurrent delta writes until it
+    ends. Without it the report may show drift from writes that landed
+    while it ran.
+
+    Returns:
+        Dict[str, Any]: Per table counts of missing, extra and mismatched rows
+    """
+    if repair:
+        _lock_aggregates(db)
+    weeks, counts = compute_stats(db)
+    stored_weeks = {
+        (row.platform, row.week_start): (row.contest_count, row.total_duration)
+        for row in db.query(PlatformWeekStat)
+    }
+    stored_counts = dict(db.query(ContestBookmarkCount.contest_id, ContestBookmarkCount.bookmark_count))
+
+    report = {
+        "platform_week_stats": _diff(weeks, stored_weeks),
+        "contest_bookmark_counts": _diff(counts, stored_counts),
+    }
+    consistent = all(not any(diff.values()) for diff in report.values())
+    report["consistent"] = consistent
+
+    if not consistent:
+        logger.warning(f"Contest statistics drifted from the base tables: {report}")
+        if repair:
+            if weeks != stored_weeks:
+                db.query(PlatformWeekStat).delete(synchronize_session=False)
+                db.add_all([
+                    PlatformWeekStat(platform=platform, week_start=week, contest_count=count, total_duration=duration)
+                    for (platform, week), (count, duration) in weeks.items()
+                ])
+            if counts != stored_counts:
+                db.query(ContestBookmarkCount).delete(synchronize_session=False)
+                db.add_all([
+                    ContestBookmarkCount(contest_id=contest_id, bookmark_count=count)
+                    for contest_id, count in counts.items()
+                ])
+            report["repaired"] = True
+    if repair:
+        # Also ends the transaction, and the lock, when nothing was repaired
+        db.commit()
+    return report
@@ -0,0 +1,61 @@
+# utils/upsert.py
+from typing import Any, Dict
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+
+def _dialect_insert(db: Session):
+    """Return the dialect's INSERT supporting ON CONFLICT, or None"""
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+        return insert
+    if dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+        return insert
+    return None
+
+
+def upsert(db: Session, model, key: Dict[str, Any], values: Dict[str, Any]) -> None:
+    """
+    Insert a row or update it when a row with the same unique key exists
+
+    Uses INSERT ... ON CONFLICT DO UPDATE on PostgreSQL and SQLite, so
+    concurrent callers cannot both insert; other dialects fall back to
+    UPDATE then INSERT.
+    """
+    insert = _dialect_insert(db)
+    if insert is not None:
+        statement = insert(model).values(**key, **values)
+        db.execute(statement.on_conflict_do_update(
+            index_elements=list(key),
+            set_={column: statement.excluded[column] for column in values}
+        ))
+        return
+
+    conditions = [getattr(model, column) == value for column, value in key.items()]
+    result = db.execute(update(model).where(*conditions).values(**values))
+    if result.rowcount == 0:
+        db.add(model(**key, **values))
+        db.flush()
+
+
+def upsert_increment(db: Session, model, key: Dict[str, Any], increments: Dict[str, int]) -> None:
+    """Add increments to the row identified by key, creating it when missing"""
+    insert = _dialect_insert(db)
+    if insert is not None:
+        statement = insert(model).values(**key, **increments)
+        db.execute(statement.on_conflict_do_update(
+            index_elements=list(key),
+            set_={column: getattr(model, column) + statement.excluded[column] for column in increments}
+        ))
+        return
+
+    conditions = [getattr(model, column) == value for column, value in key.items()]
+    result = db.execute(update(model).where(*conditions).values(
+        **{column: getattr(model, column) + delta for column, delta in increments.items()}
+    ))
+    if result.rowcount == 0:
+        db.add(model(**key, **increments))
+        db.flush()